@@ -91,6 +91,39 @@ class FilesConfigLoader:
                 "chunk_sizes": {
                     "read_buffer": 8192,
                 },
+                "read_pages": {
+                    "default_size": 65536,
+                    "max_size": 1048576,
+                    "max_follow_timeout": 60,
+                },
+            },
+            "search": {
+                "index": {
+                    "enabled": True,
+                    "cache_dir": str(Path.home() / ".cache" / "ami-files" / "search"),
+                    "max_file_size": 16777216,  # 16MB
+                    "save_interval": 30,
+                    "max_cached_indexes": 64,
+                    "max_age_days": 30,
+                },
+                "watch": {
+                    "enabled": True,
+                    "poll_interval": 2.0,
+                    "debounce": 0.1,
+                    "force_polling": False,
+                },
+                "engine": {
+                    "mode": "auto",
+                    "process_min_files": 2000,
+                    "workers": 8,
+                },
+                "classes": {
+                    "persist": True,
+                    "max_entries": 200000,
+                },
+                "result_cache": {
+                    "max_entries": 256,
+                },
             },
         }
 
@@ -134,6 +167,12 @@ class FilesConfigLoader:
             return cast(dict[str, Any], self._get_default_config()["filesystem"])
         return cast(dict[str, Any], self._config.get("filesystem", {}))
 
+    def get_search_config(self) -> dict[str, Any]:
+        """Get content search configuration."""
+        if self._config is None:
+            return cast(dict[str, Any], self._get_default_config()["search"])
+        return cast(dict[str, Any], self._config.get("search", {}))
+
     # Convenience methods for specific values
     def get_precommit_timeout(self, timeout_type: str) -> int:
         """Get specific pre-commit timeout value."""
@@ -160,6 +199,42 @@ class FilesConfigLoader:
         config = self.get_python_tools_config()
         return cast(dict[str, int], config.get("workers", {"min_workers": 1, "max_workers": 5}))
 
+    def get_read_page_config(self) -> dict[str, Any]:
+        """Get paginated read configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["filesystem"]["read_pages"])
+        config = self.get_filesystem_config().get("read_pages", {})
+        return {**defaults, **config}
+
+    def get_search_index_config(self) -> dict[str, Any]:
+        """Get trigram index configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["search"]["index"])
+        config = self.get_search_config().get("index", {})
+        return {**defaults, **config}
+
+    def get_search_watch_config(self) -> dict[str, Any]:
+        """Get tree watcher configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["search"]["watch"])
+        config = self.get_search_config().get("watch", {})
+        return {**defaults, **config}
+
+    def get_search_engine_config(self) -> dict[str, Any]:
+        """Get search engine selection configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["search"]["engine"])
+        config = self.get_search_config().get("engine", {})
+        return {**defaults, **config}
+
+    def get_search_result_cache_config(self) -> dict[str, Any]:
+        """Get ``find`` result cache configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["search"]["result_cache"])
+        config = self.get_search_config().get("result_cache", {})
+        return {**defaults, **config}
+
+    def get_search_classes_config(self) -> dict[str, Any]:
+        """Get text/binary classification cache configuration with defaults applied."""
+        defaults = cast(dict[str, Any], self._get_default_config()["search"]["classes"])
+        config = self.get_search_config().get("classes", {})
+        return {**defaults, **config}
+
 
 # Singleton instance
 files_config = FilesConfigLoader()
@@ -5,11 +5,17 @@ from typing import Any, Literal
 
 from base.backend.utils.standard_imports import setup_imports
 from base.backend.utils.uuid_utils import uuid7
+from files.backend.config.loader import files_config
 from files.backend.mcp.filesys.tools.facade.document import document_tool
 from files.backend.mcp.filesys.tools.facade.filesystem import filesystem_tool
 from files.backend.mcp.filesys.tools.facade.git import git_tool
 from files.backend.mcp.filesys.tools.facade.metadata import metadata_tool
 from files.backend.mcp.filesys.tools.facade.python import python_tool
+from files.backend.mcp.filesys.tools.filesystem_tools import create_searcher
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher, register_searcher, shutdown_search_processes, unregister_searcher
+from files.backend.mcp.filesys.utils.file_classes import save_file_class_cache
+from files.backend.mcp.filesys.utils.search_workspace import SearchWorkspace, register_workspace, unregister_workspace
+from files.backend.mcp.filesys.utils.trigram_index import evict_trigram_indexes, open_trigram_index
 from loguru import logger
 from mcp.server import FastMCP
 
@@ -43,6 +49,10 @@ class FilesysFastMCPServer:
         if not self.root_dir.is_dir():
             raise ValueError(f"Root path is not a directory: {self.root_dir}")
 
+        # Background search state is started by ``start`` (called from ``run``)
+        self.workspace: SearchWorkspace | None = None
+        self.searcher: FastFileSearcher | None = None
+
         # Create FastMCP server
         self.mcp = FastMCP(name="FilesysMCPServer")
 
@@ -51,6 +61,64 @@ class FilesysFastMCPServer:
 
         logger.info(f"Filesystem MCP server initialized with root: {self.root_dir}, session: {self.session_id}")
 
+    def start(self) -> None:
+        """Start background search maintenance and the shared searcher; a no-op once started.
+
+        Constructing a server starts no threads and writes no files; tools
+        work without this state, searching without the workspace's caches.
+        """
+        if self.searcher is not None:
+            return
+        # Keep search state for the root current in the background
+        self.workspace = self._create_workspace()
+
+        # One warm searcher (pool, extensions, compiled matchers) shared by every query
+        self.searcher = create_searcher()
+        register_searcher(self.searcher)
+
+    def _create_workspace(self) -> SearchWorkspace | None:
+        """Start the watched search workspace for the root when enabled."""
+        index_config = files_config.get_search_index_config()
+        watch_config = files_config.get_search_watch_config()
+        if not index_config["enabled"] and not watch_config["enabled"]:
+            return None
+
+        index = None
+        if index_config["enabled"]:
+            cache_dir = Path(index_config["cache_dir"])
+            try:
+                index = open_trigram_index(self.root_dir, cache_dir, int(index_config["max_file_size"]))
+                evict_trigram_indexes(cache_dir, int(index_config["max_cached_indexes"]), float(index_config["max_age_days"]) * 86400)
+            except OSError as e:
+                logger.warning(f"Trigram index unavailable for {self.root_dir}: {e}")
+
+        workspace = SearchWorkspace(
+            self.root_dir,
+            index=index,
+            watch=bool(watch_config["enabled"]),
+            poll_interval=float(watch_config["poll_interval"]),
+            debounce=float(watch_config["debounce"]),
+            force_polling=bool(watch_config["force_polling"]),
+            index_save_interval=float(index_config["save_interval"]),
+            result_cache_size=int(files_config.get_search_result_cache_config()["max_entries"]),
+        )
+        workspace.start()
+        register_workspace(workspace)
+        return workspace
+
+    def close(self) -> None:
+        """Stop background search maintenance and persist indexes."""
+        if self.workspace is not None:
+            unregister_workspace(self.workspace)
+            self.workspace.close()
+            self.workspace = None
+        if self.searcher is not None:
+            unregister_searcher(self.searcher)
+            self.searcher.close()
+            self.searcher = None
+        shutdown_search_processes()
+        save_file_class_cache()
+
     def _register_tools(self) -> None:
         """Register facade tools with FastMCP."""
 
@@ -65,13 +133,13 @@ class FilesysFastMCPServer:
 
         @self.mcp.tool(
             description=(
-                "Filesystem operations (list, create, find, read, write, delete, modify, replace). "
+                "Filesystem operations (list, create, find, read, write, delete, modify, replace, stats). "
                 "Write operations run LLM validation for Python files using scripts/automation validators. "
                 "Session-based validation with fail-open behavior."
             )
         )
         async def filesystem(
-            action: Literal["list", "create", "find", "read", "write", "delete", "modify", "replace"],
+            action: Literal["list", "create", "find", "read", "write", "delete", "modify", "replace", "stats"],
             path: str | None = None,
             paths: list[str] | None = None,
             content: str | None = None,
@@ -98,6 +166,27 @@ class FilesysFastMCPServer:
             new_content: str | None = None,
             old_content: str | None = None,
             is_regex: bool = False,
+            max_results: int | None = None,
+            context_lines: int | None = None,
+            max_matches_per_file: int = 20,
+            respect_gitignore: bool = False,
+            fuzzy_query: str | None = None,
+            query: str | None = None,
+            min_size: int | None = None,
+            max_size: int | None = None,
+            modified_after: float | str | None = None,
+            modified_before: float | str | None = None,
+            extensions: list[str] | None = None,
+            max_depth: int | None = None,
+            order: Literal["walk", "recent", "git"] = "walk",
+            ignore_case: bool = False,
+            whole_word: bool = False,
+            page_size: int | None = None,
+            cursor: str | None = None,
+            tail_lines: int | None = None,
+            follow: bool = False,
+            follow_timeout: float = 10.0,
+            prune_dirs: bool = False,
         ) -> dict[str, Any]:
             return await filesystem_tool(
                 self.root_dir,
@@ -129,6 +218,27 @@ class FilesysFastMCPServer:
                 new_content,
                 old_content,
                 is_regex,
+                max_results,
+                context_lines,
+                max_matches_per_file,
+                respect_gitignore,
+                fuzzy_query,
+                query,
+                min_size,
+                max_size,
+                modified_after,
+                modified_before,
+                extensions,
+                max_depth,
+                order,
+                ignore_case,
+                whole_word,
+                page_size,
+                cursor,
+                tail_lines,
+                follow,
+                follow_timeout,
+                prune_dirs,
             )
 
     def _register_git_tool(self) -> None:
@@ -295,4 +405,8 @@ class FilesysFastMCPServer:
         Args:
             transport: Transport type (stdio, sse, or streamable-http)
         """
-        self.mcp.run(transport=transport)
+        try:
+            self.start()
+            self.mcp.run(transport=transport)
+        finally:
+            self.close()
@@ -12,6 +12,7 @@ from files.backend.mcp.filesys.tools.filesystem_tools import (
     modify_file_tool,
     read_from_file_tool,
     replace_in_file_tool,
+    search_stats_tool,
     write_to_file_tool,
 )
 from loguru import logger
@@ -23,10 +24,12 @@ async def _handle_list(
     recursive: bool,
     pattern: str | None,
     limit: int,
+    respect_gitignore: bool,
+    prune_dirs: bool,
     **_kwargs: Any,
 ) -> dict[str, Any]:
     """Handle list action."""
-    return await list_dir_tool(root_dir, path or ".", recursive, pattern, limit)
+    return await list_dir_tool(root_dir, path or ".", recursive, pattern, limit, respect_gitignore, prune_dirs)
 
 
 async def _handle_create(root_dir: Path, paths: list[str] | None, **_kwargs: Any) -> dict[str, Any]:
@@ -46,6 +49,21 @@ async def _handle_find(
     use_fast_search: bool,
     max_workers: int,
     recursive: bool,
+    max_results: int | None,
+    context_lines: int | None,
+    max_matches_per_file: int,
+    respect_gitignore: bool,
+    fuzzy_query: str | None,
+    query: str | None,
+    min_size: int | None,
+    max_size: int | None,
+    modified_after: float | str | None,
+    modified_before: float | str | None,
+    extensions: list[str] | None,
+    max_depth: int | None,
+    order: str,
+    ignore_case: bool,
+    whole_word: bool,
     **_kwargs: Any,
 ) -> dict[str, Any]:
     """Handle find action."""
@@ -59,6 +77,21 @@ async def _handle_find(
         use_fast_search,
         max_workers,
         recursive,
+        max_results,
+        context_lines,
+        max_matches_per_file,
+        respect_gitignore,
+        fuzzy_query,
+        query,
+        min_size,
+        max_size,
+        modified_after,
+        modified_before,
+        extensions,
+        max_depth,
+        order,
+        ignore_case,
+        whole_word,
     )
 
 
@@ -73,6 +106,11 @@ async def _handle_read(
     output_format: str,
     file_encoding: str,
     add_line_numbers: bool | None,
+    page_size: int | None,
+    cursor: str | None,
+    tail_lines: int | None,
+    follow: bool,
+    follow_timeout: float,
     **_kwargs: Any,
 ) -> dict[str, Any]:
     """Handle read action."""
@@ -89,6 +127,11 @@ async def _handle_read(
         output_format,
         file_encoding,
         add_line_numbers,
+        page_size,
+        cursor,
+        tail_lines,
+        follow,
+        follow_timeout,
     )
 
 
@@ -169,6 +212,11 @@ async def _handle_replace(
     return await replace_in_file_tool(root_dir, path, old_content, new_content, is_regex)
 
 
+async def _handle_stats(root_dir: Path, **_kwargs: Any) -> dict[str, Any]:
+    """Handle stats action."""
+    return await search_stats_tool(root_dir)
+
+
 _ACTION_HANDLERS: dict[str, Callable[..., Awaitable[dict[str, Any]]]] = {
     "list": _handle_list,
     "create": _handle_create,
@@ -178,12 +226,13 @@ _ACTION_HANDLERS: dict[str, Callable[..., Awaitable[dict[str, Any]]]] = {
     "delete": _handle_delete,
     "modify": _handle_modify,
     "replace": _handle_replace,
+    "stats": _handle_stats,
 }
 
 
 async def filesystem_tool(
     root_dir: Path,
-    action: Literal["list", "create", "find", "read", "write", "delete", "modify", "replace"],
+    action: Literal["list", "create", "find", "read", "write", "delete", "modify", "replace", "stats"],
     path: str | None = None,
     paths: list[str] | None = None,
     content: str | None = None,
@@ -211,6 +260,27 @@ async def filesystem_tool(
     new_content: str | None = None,
     old_content: str | None = None,
     is_regex: bool = False,
+    max_results: int | None = None,
+    context_lines: int | None = None,
+    max_matches_per_file: int = 20,
+    respect_gitignore: bool = False,
+    fuzzy_query: str | None = None,
+    query: str | None = None,
+    min_size: int | None = None,
+    max_size: int | None = None,
+    modified_after: float | str | None = None,
+    modified_before: float | str | None = None,
+    extensions: list[str] | None = None,
+    max_depth: int | None = None,
+    order: str = "walk",
+    ignore_case: bool = False,
+    whole_word: bool = False,
+    page_size: int | None = None,
+    cursor: str | None = None,
+    tail_lines: int | None = None,
+    follow: bool = False,
+    follow_timeout: float = 10.0,
+    prune_dirs: bool = False,
 ) -> dict[str, Any]:
     """Filesystem operations facade.
 
@@ -244,6 +314,27 @@ async def filesystem_tool(
         new_content: New content
         old_content: Content to replace
         is_regex: Treat old_content as regex
+        max_results: Stop a keyword find after this many matches
+        context_lines: Return match locations with this many lines of context
+        max_matches_per_file: Maximum match locations returned per file
+        respect_gitignore: Skip paths ignored by .gitignore files when listing or finding
+        fuzzy_query: Rank files whose path contains these characters in order (fzf-style)
+        query: Boolean find query over path and content predicates (e.g. ``content:"TODO" AND NOT path:tests/ AND ext:py``)
+        min_size: Only find files of at least this many bytes
+        max_size: Only find files of at most this many bytes
+        modified_after: Only find files modified at or after this time (POSIX timestamp or ISO 8601)
+        modified_before: Only find files modified at or before this time (POSIX timestamp or ISO 8601)
+        extensions: Only find files with these extensions (case-insensitive, dot optional)
+        max_depth: Only find entries at most this many levels below the path (1 searches the path only)
+        order: Visiting order for keyword finds: walk, recent (newest first) or git (uncommitted changes first)
+        ignore_case: Match find keywords regardless of letter case (literals by Unicode lower case, regexes with IGNORECASE)
+        whole_word: Only match find keywords not adjoined by letters, digits or underscores
+        page_size: Read one page of at most this many bytes and return a cursor to the next
+        cursor: Continue a paginated read from the ``next_cursor`` of the previous page, with its page size unless ``page_size`` is given
+        tail_lines: Read the last this many lines of a text file
+        follow: Wait for data appended after ``cursor`` (or the current end) and return it
+        follow_timeout: Seconds a follow read waits for appended data
+        prune_dirs: Leave .git, node_modules, __pycache__ and .venv directories out of listings
 
     Returns:
         Dict with action-specific results
@@ -283,4 +374,25 @@ async def filesystem_tool(
         new_content=new_content,
         old_content=old_content,
         is_regex=is_regex,
+        max_results=max_results,
+        context_lines=context_lines,
+        max_matches_per_file=max_matches_per_file,
+        respect_gitignore=respect_gitignore,
+        fuzzy_query=fuzzy_query,
+        query=query,
+        min_size=min_size,
+        max_size=max_size,
+        modified_after=modified_after,
+        modified_before=modified_before,
+        extensions=extensions,
+        max_depth=max_depth,
+        order=order,
+        ignore_case=ignore_case,
+        whole_word=whole_word,
+        page_size=page_size,
+        cursor=cursor,
+        tail_lines=tail_lines,
+        follow=follow,
+        follow_timeout=follow_timeout,
+        prune_dirs=prune_dirs,
     )
@@ -1,24 +1,59 @@
 """Filesystem tool functions for Filesys MCP server."""
 
+import asyncio
+import contextlib
+import os
 import re
 import shutil
+import time
+from collections.abc import Iterator
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher
+from files.backend.config.loader import files_config
+from files.backend.mcp.filesys.utils.content_matches import FileMatches
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher, get_searcher
+from files.backend.mcp.filesys.utils.file_formatter import FileFormatter
 from files.backend.mcp.filesys.utils.file_utils import (
     FileUtils,
     InputFormat,
     OffsetType,
     OutputFormat,
 )
+from files.backend.mcp.filesys.utils.fuzzy_paths import DEFAULT_LIMIT, FuzzyMatch, rank_paths
+from files.backend.mcp.filesys.utils.gitignore import gitignore_matcher_for
+from files.backend.mcp.filesys.utils.line_index import forget_line_indexes, line_index_for, line_number_at, line_offset, supports_encoding
+from files.backend.mcp.filesys.utils.path_tree import TreeEntry
 from files.backend.mcp.filesys.utils.path_utils import validate_path
+from files.backend.mcp.filesys.utils.query_cache import QueryResultCache
+from files.backend.mcp.filesys.utils.read_cursor import ReadCursor, read_page
+from files.backend.mcp.filesys.utils.search_order import check_search_order
+from files.backend.mcp.filesys.utils.search_workspace import get_workspace
+from files.backend.mcp.filesys.utils.tree_walker import (
+    DEFAULT_PRUNED_DIRS,
+    EntryFilter,
+    FileFilter,
+    GlobSet,
+    compile_glob,
+    glob_depth,
+    relative_entry_path,
+    walk_entries,
+)
+from files.backend.mcp.filesys.utils.tree_watcher import wait_for_file_change
+from files.backend.mcp.filesys.utils.trigram_index import TrigramIndex, open_trigram_index
 from loguru import logger
 
 from scripts.automation.validators import validate_python_full
 
 LINE_BREAK = "\n"
 
+# Bytes read per step while scanning backwards for the start of a tail
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+# Entry yielded by a listing walk: from the workspace path tree or from the disk
+ListingEntry = TreeEntry | os.DirEntry[str]
+
 
 async def list_dir_tool(
     root_dir: Path,
@@ -26,8 +61,16 @@ async def list_dir_tool(
     recursive: bool = False,
     pattern: str | None = None,
     limit: int = 100,
+    respect_gitignore: bool = False,
+    prune_dirs: bool = False,
 ) -> dict[str, Any]:
-    """List directory contents."""
+    """List directory contents.
+
+    ``prune_dirs`` leaves VCS metadata, dependency and cache directories
+    (``DEFAULT_PRUNED_DIRS``) out of the listing. Pruned listings are served
+    from the root's search workspace tree when it follows changes below
+    ``path`` (and ignore rules are not requested); otherwise the disk is walked.
+    """
     logger.debug(f"Listing directory: path={path}, recursive={recursive}, pattern={pattern}, limit={limit}")
 
     try:
@@ -42,35 +85,17 @@ async def list_dir_tool(
 
         items = []
         count = 0
-
-        if recursive:
-            # Recursive listing
-            for item in safe_path.rglob(pattern or "*"):
-                if count >= limit:
-                    break
-                rel_path = item.relative_to(root_dir)
-                items.append(
-                    {
-                        "path": str(rel_path),
-                        "type": "dir" if item.is_dir() else "file",
-                        "size": item.stat().st_size if item.is_file() else None,
-                    }
-                )
-                count += 1
-        else:
-            # Non-recursive listing
-            for item in safe_path.glob(pattern or "*"):
-                if count >= limit:
-                    break
-                rel_path = item.relative_to(root_dir)
-                items.append(
-                    {
-                        "path": str(rel_path),
-                        "type": "dir" if item.is_dir() else "file",
-                        "size": item.stat().st_size if item.is_file() else None,
-                    }
-                )
-                count += 1
+        matcher, dirs_only = compile_glob(pattern, recursive) if pattern else (None, False)
+        # Anchored patterns such as ``src/*.py`` match below the listed directory, as with ``Path.glob``
+        walk_depth = None if recursive else glob_depth(pattern) if pattern else 1
+
+        for rel, item_path, is_dir, entry in _iter_listing(root_dir, safe_path, True, respect_gitignore, walk_depth, prune_dirs=prune_dirs):
+            if count >= limit:
+                break
+            if matcher is not None and (not matcher.fullmatch(rel) or (dirs_only and not is_dir)):
+                continue
+            items.append({"path": item_path, "type": "dir" if is_dir else "file", "size": None if is_dir else _entry_size(entry)})
+            count += 1
 
         return {
             "success": True,
@@ -90,11 +115,14 @@ async def create_dirs_tool(root_dir: Path, paths: list[str]) -> dict[str, Any]:
 
     try:
         created = []
+        created_paths = []
         for path_str in paths:
             safe_path = validate_path(root_dir, path_str, allow_write=False)
             safe_path.mkdir(parents=True, exist_ok=True)
             created.append(str(safe_path.relative_to(root_dir)))
+            created_paths.append(safe_path)
 
+        _record_created_dirs(root_dir, created_paths)
         return {"success": True, "created": created}
     except Exception as e:
         logger.error(f"Failed to create directories: {e}")
@@ -111,8 +139,58 @@ async def find_paths_tool(
     use_fast_search: bool = True,
     max_workers: int = 8,
     recursive: bool = True,
+    max_results: int | None = None,
+    context_lines: int | None = None,
+    max_matches_per_file: int = 20,
+    respect_gitignore: bool = False,
+    fuzzy_query: str | None = None,
+    query: str | None = None,
+    min_size: int | None = None,
+    max_size: int | None = None,
+    modified_after: float | str | None = None,
+    modified_before: float | str | None = None,
+    extensions: list[str] | None = None,
+    max_depth: int | None = None,
+    order: str = "walk",
+    ignore_case: bool = False,
+    whole_word: bool = False,
 ) -> dict[str, Any]:
-    """Find paths matching patterns or keywords."""
+    """Find paths matching patterns or keywords.
+
+    When ``max_results`` is given, the keyword search streams results and stops
+    walking as soon as that many matches are found. When ``context_lines`` is
+    given, content matches are returned with line numbers, byte offsets and a
+    context snippet per file (always using the fast searcher). A
+    ``fuzzy_query`` ranks files whose path contains its characters in order,
+    best match first, returning ``max_results`` (default 20) with the score and
+    matched character positions of each. A boolean ``query`` such as
+    ``content:"TODO" AND NOT path:tests/ AND ext:py`` selects files by path and
+    content predicates (see ``find_query``) and replaces the keyword lists.
+
+    ``min_size``/``max_size`` (bytes, inclusive), ``modified_after``/
+    ``modified_before`` (POSIX timestamps or ISO 8601 strings), ``extensions``
+    and ``max_depth`` (1 searches ``path`` only) restrict every kind of find.
+    They are checked during the walk from directory entry or cached stat data,
+    before any file is opened; with size, time or extension conditions, glob
+    patterns only match files.
+
+    ``order`` decides which files a keyword or query search visits first, and
+    so which matches a ``max_results`` limit keeps: ``walk`` (directory order),
+    ``recent`` (most recently modified first) or ``git`` (files with
+    uncommitted changes first, then by recency). Ranked orders return matches
+    in that order.
+
+    ``ignore_case`` and ``whole_word`` apply to keyword searches (always using
+    the fast searcher): the first matches keywords regardless of letter case,
+    the second only where no letter, digit or underscore adjoins the match.
+    Literal keywords compare by Unicode lower case (``str.lower``), for paths,
+    contents and reported match locations alike; regex keywords are compiled
+    with ``IGNORECASE``, which also matches case variants such as the long s.
+
+    Results are cached by the root's search workspace until anything below
+    ``path`` changes (except ``git`` ordered results, which also depend on the
+    repository index).
+    """
     logger.debug(f"Finding paths: patterns={patterns}, path={path}, recursive={recursive}")
 
     try:
@@ -120,29 +198,121 @@ async def find_paths_tool(
 
         if not validated_path.is_dir():
             return {"error": f"Path is not a directory: {path}"}
+        if max_depth is not None and max_depth < 1:
+            return {"error": f"max_depth must be at least 1: {max_depth}"}
+        file_filter = FileFilter.create(min_size, max_size, _parse_timestamp(modified_after), _parse_timestamp(modified_before), extensions)
+        check_search_order(order)
+
+        query_key = (
+            tuple(patterns or ()),
+            tuple(keywords_path_name or ()),
+            tuple(keywords_file_content or ()),
+            regex_keywords,
+            use_fast_search or context_lines is not None,
+            recursive,
+            max_results,
+            context_lines,
+            max_matches_per_file if context_lines is not None else None,
+            respect_gitignore,
+            fuzzy_query,
+            query,
+            file_filter,
+            max_depth,
+            order,
+            ignore_case,
+            whole_word,
+        )
+        cache, cache_key = _find_cache_entry(root_dir, validated_path, query_key) if order != "git" else (None, query_key)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         matches: list[str] = []
         if patterns:
-            matches.extend(_collect_pattern_matches(root_dir, validated_path, patterns, recursive))
+            matches.extend(_collect_pattern_matches(root_dir, validated_path, patterns, recursive, respect_gitignore, file_filter, max_depth))
 
-        if keywords_path_name or keywords_file_content:
+        located: list[FileMatches] | None = None
+        keywords: list[str] = []
+        searches_keywords = bool(keywords_path_name or keywords_file_content or query)
+        if searches_keywords and context_lines is not None:
+            located = await _collect_located_matches(
+                root_dir,
+                validated_path,
+                keywords_path_name,
+                keywords_file_content,
+                regex_keywords,
+                max_workers,
+                max_results,
+                context_lines,
+                max_matches_per_file,
+                respect_gitignore,
+                query,
+                file_filter,
+                max_depth,
+                order,
+                ignore_case,
+                whole_word,
+            )
+            keywords = [file_matches.path for file_matches in located]
+        elif searches_keywords:
             keywords = await _collect_keyword_matches(
                 root_dir,
                 validated_path,
                 keywords_path_name,
                 keywords_file_content,
                 regex_keywords,
-                use_fast_search,
+                use_fast_search or query is not None or order != "walk" or ignore_case or whole_word,
                 max_workers,
+                max_results,
+                respect_gitignore,
+                query,
+                file_filter,
+                max_depth,
+                order,
+                ignore_case,
+                whole_word,
             )
-            matches.extend(keywords)
+        matches.extend(keywords)
 
-        return {"success": True, "paths": matches, "total_found": len(matches)}
+        ranked: list[FuzzyMatch] | None = None
+        if fuzzy_query:
+            ranked = _collect_fuzzy_matches(
+                root_dir, validated_path, fuzzy_query, max_results if max_results is not None else DEFAULT_LIMIT, respect_gitignore, file_filter, max_depth
+            )
+            matches.extend(match.path for match in ranked)
+
+        result: dict[str, Any] = {"success": True, "paths": matches, "total_found": len(matches)}
+        if located is not None:
+            result["matches"] = [{**file_matches.to_dict(), "snippet": FileFormatter.format_search_results(file_matches)} for file_matches in located]
+        if ranked is not None:
+            result["fuzzy_matches"] = [match.to_dict() for match in ranked]
+        if max_results is not None:
+            result["limit_reached"] = len(keywords) >= max_results
+        if cache is not None:
+            cache.put(cache_key, result)
+        return result
     except Exception as e:
         logger.error(f"Failed to find paths: {e}")
         return {"error": str(e)}
 
 
+async def search_stats_tool(root_dir: Path) -> dict[str, Any]:
+    """Report the state of the root's search workspace and the hit/miss counters of its ``find`` result cache."""
+    try:
+        workspace = get_workspace(root_dir)
+        if workspace is None:
+            return {"success": True, "workspace": None, "result_cache": None}
+        return {
+            "success": True,
+            "workspace": {"ready": workspace.ready, "watching": workspace.watching},
+            "result_cache": workspace.results.stats() if workspace.results is not None else None,
+        }
+    except Exception as e:
+        logger.error(f"Failed to read search stats: {e}")
+        return {"error": str(e)}
+
+
 async def read_from_file_tool(
     root_dir: Path,
     path: str,
@@ -154,8 +324,30 @@ async def read_from_file_tool(
     output_format: str = "raw_utf8",
     file_encoding: str = "utf-8",
     add_line_numbers: bool | None = None,
+    page_size: int | None = None,
+    cursor: str | None = None,
+    tail_lines: int | None = None,
+    follow: bool = False,
+    follow_timeout: float = 10.0,
 ) -> dict[str, Any]:
-    """Read file contents with advanced options."""
+    """Read file contents with advanced options.
+
+    Passing ``page_size`` (bytes) or a ``cursor`` returns one bounded page of
+    the requested line or byte range, without the file size limit, together
+    with a ``next_cursor`` that resumes the read where the page ended (None
+    once the range is exhausted). Text pages end after a line break and are
+    returned undecoded by newline translation; ``start_line`` and
+    ``byte_offset`` locate the page in the file. A cursor keeps the page size
+    of the read it continues unless ``page_size`` is passed again, and fails
+    with an error if the file changed after it was issued.
+
+    ``tail_lines`` returns the last lines of a text file (at most one page),
+    found by reading backwards from the end. ``follow`` waits up to
+    ``follow_timeout`` seconds for data appended after ``cursor`` (or after the
+    current end) and returns it as one page, possibly empty; both return a
+    ``next_cursor`` to follow from. Their cost depends on the bytes returned,
+    not on the file size.
+    """
     logger.debug(f"Reading file: path={path}")
 
     try:
@@ -167,12 +359,30 @@ async def read_from_file_tool(
         if not safe_path.is_file():
             return {"error": f"Path is not a file: {path}"}
 
-        # Check file size
-        FileUtils.check_file_size(safe_path)
-
         is_binary = not FileUtils.is_text_file(safe_path)
         add_line_numbers = _resolve_line_number_hint(add_line_numbers, safe_path)
 
+        if tail_lines is not None or follow:
+            return await _read_file_end(safe_path, output_format, file_encoding, add_line_numbers, is_binary, page_size, cursor, tail_lines, follow_timeout)
+        if page_size is not None or cursor is not None:
+            return _read_page_result(
+                safe_path,
+                start_line,
+                end_line,
+                start_offset_inclusive,
+                end_offset_inclusive,
+                offset_type,
+                output_format,
+                file_encoding,
+                add_line_numbers,
+                is_binary,
+                page_size,
+                cursor,
+            )
+
+        # Check file size
+        FileUtils.check_file_size(safe_path)
+
         offset_enum, start_offset_inclusive, end_offset_inclusive = _resolve_offsets(
             offset_type,
             start_offset_inclusive,
@@ -210,14 +420,79 @@ def _collect_pattern_matches(
     validated_path: Path,
     patterns: list[str],
     recursive: bool,
+    respect_gitignore: bool = False,
+    file_filter: FileFilter | None = None,
+    max_depth: int | None = None,
 ) -> list[str]:
-    """Return pattern-based matches within the validated path."""
-    matches: list[str] = []
-    iterator = validated_path.rglob if recursive else validated_path.glob
-    for pattern in patterns:
-        for item in iterator(pattern):
-            matches.append(str(item.relative_to(root_dir)))
-    return matches
+    """Return pattern-based matches within the validated path, grouped by pattern.
+
+    All patterns are evaluated in one walk and each path is reported once,
+    under the first pattern matching it. Anchored patterns only walk the
+    subtrees below their literal directory prefixes, to the depth they can match.
+    """
+    globs = GlobSet(patterns, recursive)
+    buckets: list[list[str]] = [[] for _ in patterns]
+    for subdir, root_depth in globs.walk_roots(use_prefixes=not respect_gitignore):
+        depth = root_depth
+        if max_depth is not None:
+            # The caller's depth counts from the searched directory, above the walk root
+            remaining = max_depth - (subdir.count("/") + 1 if subdir else 0)
+            if remaining < 1:
+                continue
+            depth = remaining if depth is None else min(depth, remaining)
+        start = validated_path / subdir
+        if subdir and (not start.is_dir() or start.resolve() != start):
+            # A full walk never follows symlinked directories
+            continue
+        prefix = f"{subdir}/" if subdir else ""
+        for rel, path, is_dir, _entry in _iter_listing(root_dir, start, True, respect_gitignore, depth, file_filter):
+            if is_dir and file_filter is not None:
+                continue
+            index = globs.match(prefix + rel, is_dir)
+            if index is not None:
+                buckets[index].append(path)
+    return [match for bucket in buckets for match in bucket]
+
+
+def _iter_listing(
+    root_dir: Path,
+    directory: Path,
+    recursive: bool,
+    respect_gitignore: bool,
+    max_depth: int | None = None,
+    file_filter: FileFilter | None = None,
+    prune_dirs: bool = True,
+) -> Iterator[tuple[str, str, bool, ListingEntry]]:
+    """Yield ``(path relative to directory, path relative to root, is_dir, entry)`` for entries below ``directory``.
+
+    Entries come from the workspace's path tree when it follows changes below
+    ``directory``, and from a disk walk otherwise (or when ignore rules apply).
+    Files failing ``file_filter`` are skipped by either walk. The path tree
+    holds no pruned directories, so unpruned walks always read the disk.
+    """
+    workspace = get_workspace(root_dir) if not respect_gitignore and prune_dirs else None
+    entries = workspace.entries_under(directory, recursive, max_depth, file_filter) if workspace is not None else None
+    if workspace is not None and entries is not None:
+        root_key = _normalise_relative_path(root_dir, workspace.root)
+        directory_key = directory.relative_to(workspace.root).as_posix()
+        root_prefix = "" if root_key == "." else f"{root_key}/"
+        skip = 0 if directory_key == "." else len(directory_key) + 1
+        for entry in entries:
+            yield entry.path[skip:], root_prefix + entry.path, entry.is_dir, entry
+        return
+
+    walk_root = str(directory)
+    ignore = _gitignore_filter(directory, respect_gitignore)
+    pruned_dirs = DEFAULT_PRUNED_DIRS if prune_dirs else frozenset()
+    for disk_entry in walk_entries(
+        directory, recursive=recursive, include_dirs=True, pruned_dirs=pruned_dirs, ignore=ignore, max_depth=max_depth, file_filter=file_filter
+    ):
+        yield relative_entry_path(disk_entry, walk_root), _normalise_relative_path(root_dir, Path(disk_entry.path)), disk_entry.is_dir(), disk_entry
+
+
+def _entry_size(entry: ListingEntry) -> int:
+    """Return a listed file's size, from the path tree or by stat'ing the disk entry."""
+    return entry.size if isinstance(entry, TreeEntry) else entry.stat().st_size
 
 
 async def _collect_keyword_matches(
@@ -228,31 +503,234 @@ async def _collect_keyword_matches(
     regex_keywords: bool,
     use_fast_search: bool,
     max_workers: int,
+    max_results: int | None = None,
+    respect_gitignore: bool = False,
+    query: str | None = None,
+    file_filter: FileFilter | None = None,
+    max_depth: int | None = None,
+    order: str = "walk",
+    ignore_case: bool = False,
+    whole_word: bool = False,
 ) -> list[str]:
-    """Return keyword-based matches using the configured search strategy."""
+    """Return keyword-based matches using the configured search strategy (queries, ranked orders and match modes always use the fast searcher)."""
     if use_fast_search:
-        searcher = FastFileSearcher(max_workers=max_workers)
-        try:
+        index_config = files_config.get_search_index_config()
+        workspace = get_workspace(root_dir)
+        index = _open_search_index(root_dir, index_config) if workspace is None and (keywords_file_content or query) else None
+        with _searcher_for_query(max_workers) as searcher:
+            # Matches come back in walk order, so a limited find returns the same first matches every time
             results = await searcher.search_files(
                 validated_path,
                 keywords_path_name,
                 keywords_file_content,
                 regex_keywords,
-                max_results=10_000,
+                max_results=max_results if max_results is not None else 10_000,
+                index=index,
+                index_save_interval=float(index_config["save_interval"]),
+                workspace=workspace,
+                respect_gitignore=respect_gitignore,
+                max_workers=max_workers,
+                query=query,
+                file_filter=file_filter,
+                max_depth=max_depth,
+                order=order,
+                ignore_case=ignore_case,
+                whole_word=whole_word,
             )
-        finally:
-            searcher.close()
     else:
         results = FileUtils.find_files(
             validated_path,
             keywords_path_name,
             keywords_file_content,
             regex_keywords,
+            ignore=_gitignore_filter(validated_path, respect_gitignore),
+            max_depth=max_depth,
+            file_filter=file_filter,
         )
+        if max_results is not None:
+            results = results[:max_results]
 
     return [_normalise_relative_path(root_dir, Path(result)) for result in results]
 
 
+async def _collect_located_matches(
+    root_dir: Path,
+    validated_path: Path,
+    keywords_path_name: list[str] | None,
+    keywords_file_content: list[str] | None,
+    regex_keywords: bool,
+    max_workers: int,
+    max_results: int | None,
+    context_lines: int,
+    max_matches_per_file: int,
+    respect_gitignore: bool = False,
+    query: str | None = None,
+    file_filter: FileFilter | None = None,
+    max_depth: int | None = None,
+    order: str = "walk",
+    ignore_case: bool = False,
+    whole_word: bool = False,
+) -> list[FileMatches]:
+    """Return keyword matches with match locations, sorted by relative path (ranked orders keep their order)."""
+    index_config = files_config.get_search_index_config()
+    workspace = get_workspace(root_dir)
+    index = _open_search_index(root_dir, index_config) if workspace is None and (keywords_file_content or query) else None
+    located: list[FileMatches] = []
+    with _searcher_for_query(max_workers) as searcher:
+        stream = searcher.iter_matches(
+            validated_path,
+            keywords_path_name,
+            keywords_file_content,
+            regex_keywords,
+            max_results=max_results if max_results is not None else 10_000,
+            context_lines=max(0, context_lines),
+            max_matches_per_file=max(1, max_matches_per_file),
+            index=index,
+            index_save_interval=float(index_config["save_interval"]),
+            workspace=workspace,
+            respect_gitignore=respect_gitignore,
+            max_workers=max_workers,
+            query=query,
+            file_filter=file_filter,
+            max_depth=max_depth,
+            order=order,
+            ignore_case=ignore_case,
+            whole_word=whole_word,
+        )
+        async for file_matches in stream:
+            file_matches.path = _normalise_relative_path(root_dir, Path(file_matches.path))
+            located.append(file_matches)
+
+    return sorted(located, key=lambda file_matches: file_matches.path) if order == "walk" else located
+
+
+def _collect_fuzzy_matches(
+    root_dir: Path,
+    validated_path: Path,
+    query: str,
+    limit: int,
+    respect_gitignore: bool = False,
+    file_filter: FileFilter | None = None,
+    max_depth: int | None = None,
+) -> list[FuzzyMatch]:
+    """Return the best fuzzy matches of ``query`` among files below the validated path.
+
+    The workspace's path index answers unrestricted queries without touching
+    the disk. Otherwise the files passing the restrictions are listed (from the
+    path tree when possible) and ranked directly.
+    """
+    workspace = get_workspace(root_dir)
+    if workspace is not None and not respect_gitignore and file_filter is None and max_depth is None:
+        ranked = workspace.fuzzy_paths(validated_path, query, limit)
+        if ranked is not None:
+            return ranked
+    paths = (path for _rel, path, is_dir, _entry in _iter_listing(root_dir, validated_path, True, respect_gitignore, max_depth, file_filter) if not is_dir)
+    return rank_paths(paths, query, limit)
+
+
+def _parse_timestamp(value: float | str | None) -> float | None:
+    """Convert a POSIX timestamp or an ISO 8601 string (local time unless it has an offset) to a timestamp.
+
+    Raises:
+        ValueError: If a string is not a valid ISO 8601 date or datetime
+    """
+    if value is None or isinstance(value, int | float):
+        return value
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError as error:
+        raise ValueError(f"Invalid timestamp {value!r}: expected seconds since the epoch or an ISO 8601 date") from error
+
+
+def _gitignore_filter(directory: Path, respect_gitignore: bool) -> EntryFilter | None:
+    """Return a walker predicate for the repository's ignore rules when requested."""
+    return gitignore_matcher_for(directory).session().entry_filter() if respect_gitignore else None
+
+
+def create_searcher(max_workers: int | None = None) -> FastFileSearcher:
+    """Create a searcher using the configured engine selection and pool size."""
+    engine_config = files_config.get_search_engine_config()
+    return FastFileSearcher(
+        max_workers=int(engine_config["workers"]) if max_workers is None else max_workers,
+        engine=engine_config["mode"],
+        process_min_files=int(engine_config["process_min_files"]),
+    )
+
+
+@contextlib.contextmanager
+def _searcher_for_query(max_workers: int) -> Iterator[FastFileSearcher]:
+    """Yield the server's shared searcher, or a temporary one when none is registered."""
+    shared = get_searcher()
+    if shared is not None:
+        yield shared
+        return
+    searcher = create_searcher(max_workers)
+    try:
+        yield searcher
+    finally:
+        searcher.close()
+
+
+def _open_search_index(root_dir: Path, index_config: dict[str, Any]) -> TrigramIndex | None:
+    """Return the shared trigram index for the root when indexing is enabled."""
+    if not index_config["enabled"]:
+        return None
+    try:
+        return open_trigram_index(root_dir, Path(index_config["cache_dir"]), int(index_config["max_file_size"]))
+    except OSError as error:
+        logger.warning(f"Trigram index unavailable for {root_dir}: {error}")
+        return None
+
+
+def _find_cache_entry(root_dir: Path, validated_path: Path, query: tuple[Any, ...]) -> tuple[QueryResultCache | None, tuple[Any, ...]]:
+    """Return the result cache for a ``find`` below ``validated_path`` and the query's key.
+
+    The key includes the subtree's change generation, so no cache is returned
+    when the workspace is not following changes below the path.
+    """
+    workspace = get_workspace(root_dir)
+    if workspace is None or workspace.results is None:
+        return None, query
+    generation = workspace.generation(validated_path)
+    if generation is None:
+        return None, query
+    return workspace.results, (str(validated_path), generation, *query)
+
+
+def _record_written(root_dir: Path, paths: list[Path]) -> None:
+    """Bring the root's search workspace and line-offset indexes up to date with files the tools wrote."""
+    forget_line_indexes(paths)
+    workspace = get_workspace(root_dir)
+    if workspace is None:
+        return
+    try:
+        workspace.record_written(paths)
+    except Exception as e:
+        logger.warning(f"Failed to update search workspace after write: {e}")
+
+
+def _record_created_dirs(root_dir: Path, paths: list[Path]) -> None:
+    """Add directories the tools created to the root's search workspace."""
+    workspace = get_workspace(root_dir)
+    if workspace is None:
+        return
+    try:
+        workspace.record_dirs(paths)
+    except Exception as e:
+        logger.warning(f"Failed to update search workspace after mkdir: {e}")
+
+
+def _record_removed(root_dir: Path, paths: list[Path]) -> None:
+    """Drop deleted paths from the root's search workspace."""
+    workspace = get_workspace(root_dir)
+    if workspace is None:
+        return
+    try:
+        workspace.record_removed(paths)
+    except Exception as e:
+        logger.warning(f"Failed to update search workspace after delete: {e}")
+
+
 def _normalise_relative_path(root_dir: Path, candidate: Path) -> str:
     """Convert a candidate path to project-relative form when possible."""
     try:
@@ -261,6 +739,186 @@ def _normalise_relative_path(root_dir: Path, candidate: Path) -> str:
         return str(candidate)
 
 
+def _read_page_result(
+    safe_path: Path,
+    start_line: int | None,
+    end_line: int | None,
+    start_offset_inclusive: int,
+    end_offset_inclusive: int,
+    offset_type: str,
+    output_format: str,
+    file_encoding: str,
+    add_line_numbers: bool,
+    is_binary: bool,
+    page_size: int | None,
+    cursor: str | None,
+) -> dict[str, Any]:
+    """Read one page of a paginated read, starting at ``cursor`` or at the requested range."""
+    stat_result = safe_path.stat()
+    if cursor is not None:
+        read_cursor = _resume_cursor(cursor, page_size, file_encoding, is_binary)
+        read_cursor.check(stat_result)
+    else:
+        size = _page_size(page_size, file_encoding, is_binary)
+        read_cursor = _start_cursor(
+            safe_path, stat_result, start_line, end_line, start_offset_inclusive, end_offset_inclusive, offset_type, file_encoding, is_binary, size
+        )
+
+    page = read_page(safe_path, read_cursor)
+    return _page_response(page.data, read_cursor, page.next_cursor, output_format, file_encoding, add_line_numbers, is_binary)
+
+
+async def _read_file_end(
+    safe_path: Path,
+    output_format: str,
+    file_encoding: str,
+    add_line_numbers: bool,
+    is_binary: bool,
+    page_size: int | None,
+    cursor: str | None,
+    tail_lines: int | None,
+    follow_timeout: float,
+) -> dict[str, Any]:
+    """Read the last ``tail_lines`` lines of a file, or wait for data appended after ``cursor``."""
+    stat_result = safe_path.stat()
+    file_size = stat_result.st_size
+
+    if tail_lines is not None:
+        if tail_lines < 0:
+            raise ValueError(f"tail_lines must not be negative: {tail_lines}")
+        if is_binary:
+            raise ValueError("tail_lines needs a text file")
+        if cursor is not None:
+            raise ValueError("tail_lines reads from the end of the file; follow a tail with its next_cursor")
+        size = _page_size(page_size, file_encoding, is_binary)
+        offset = _tail_offset(safe_path, file_size, tail_lines, size)
+        read_cursor = ReadCursor.for_file(stat_result, offset, -1, file_size, text=True, page_size=size)
+        data = _read_binary_segment(safe_path, offset, file_size - 1) if offset < file_size else b""
+        return _page_response(data, read_cursor, read_cursor.advanced(data), output_format, file_encoding, add_line_numbers, is_binary)
+
+    if cursor is not None:
+        read_cursor = _resume_cursor(cursor, page_size, file_encoding, is_binary)
+    else:
+        read_cursor = ReadCursor.for_file(stat_result, file_size, -1, file_size, text=not is_binary, page_size=_page_size(page_size, file_encoding, is_binary))
+    read_cursor.check_appended(stat_result)
+    deadline = time.monotonic() + min(max(0.0, follow_timeout), float(files_config.get_read_page_config()["max_follow_timeout"]))
+    while stat_result.st_size <= read_cursor.offset and (remaining := deadline - time.monotonic()) > 0:
+        signature = (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+        await asyncio.to_thread(wait_for_file_change, safe_path, signature, remaining)
+        stat_result = safe_path.stat()
+        read_cursor.check_appended(stat_result)
+
+    read_cursor = read_cursor.following(stat_result)
+    page = read_page(safe_path, read_cursor)
+    return _page_response(page.data, read_cursor, read_cursor.advanced(page.data), output_format, file_encoding, add_line_numbers, is_binary)
+
+
+def _page_size(page_size: int | None, file_encoding: str, is_binary: bool) -> int:
+    """Return the byte size of one page, checking that the file can be read in pages."""
+    page_config = files_config.get_read_page_config()
+    if page_size is not None and page_size < 1:
+        raise ValueError(f"page_size must be at least 1: {page_size}")
+    if not is_binary and not supports_encoding(file_encoding):
+        raise ValueError(f"Paginated reads need an ASCII-compatible encoding: {file_encoding}")
+    return min(page_size or int(page_config["default_size"]), int(page_config["max_size"]))
+
+
+def _resume_cursor(cursor: str, page_size: int | None, file_encoding: str, is_binary: bool) -> ReadCursor:
+    """Decode ``cursor``, keeping the page size it was issued with unless ``page_size`` overrides it."""
+    read_cursor = ReadCursor.decode(cursor)
+    return read_cursor.resized(_page_size(page_size if page_size is not None else read_cursor.page_size, file_encoding, is_binary))
+
+
+def _page_response(
+    data: bytes,
+    read_cursor: ReadCursor,
+    next_cursor: ReadCursor | None,
+    output_format: str,
+    file_encoding: str,
+    add_line_numbers: bool,
+    is_binary: bool,
+) -> dict[str, Any]:
+    """Build the result of a paginated, tail or follow read of ``data`` from ``read_cursor``."""
+    content = data
+    if add_line_numbers and read_cursor.text and read_cursor.line >= 0:
+        text = content.decode(file_encoding, errors="replace")
+        *complete, last = text.split(LINE_BREAK)
+        content = _format_lines([line + LINE_BREAK for line in complete] + ([last] if last else []), read_cursor.line, True, file_encoding)
+
+    return {
+        "success": True,
+        "content": _encode_read_content(content, OutputFormat[output_format.replace("-", "_").upper()], is_binary, file_encoding),
+        "encoding": file_encoding if not is_binary else "binary",
+        "format": output_format,
+        "byte_offset": read_cursor.offset,
+        "start_line": read_cursor.line + 1 if read_cursor.line >= 0 else None,
+        "next_cursor": next_cursor.encode() if next_cursor is not None else None,
+    }
+
+
+def _tail_offset(path: Path, size: int, lines: int, limit: int) -> int:
+    """Return the byte offset of the last ``lines`` lines of ``path`` (``size`` bytes), reading back at most ``limit`` bytes.
+
+    When the lines are longer than ``limit`` in total, the tail starts at the
+    first line break within the limit, or else on a UTF-8 character boundary.
+    """
+    floor = max(0, size - limit)
+    # A final line break ends the last line instead of starting an empty one
+    remaining = lines + 1 if size and _read_binary_segment(path, size - 1, size - 1) == b"\n" else lines
+    position = size
+    first_break = -1
+    while remaining and position > floor:
+        start = max(floor, position - _TAIL_BLOCK_SIZE)
+        block = _read_binary_segment(path, start, position - 1)
+        count = block.count(b"\n")
+        if count >= remaining:
+            index = len(block)
+            for _ in range(remaining):
+                index = block.rindex(b"\n", 0, index)
+            return start + index + 1
+        remaining -= count
+        position = start
+        if count:
+            first_break = start + block.index(b"\n")
+    if not remaining or floor == 0:
+        return position
+    if first_break != -1 and first_break + 1 < size:
+        return first_break + 1
+    head = _read_binary_segment(path, floor, floor + 3)
+    return floor + next((index for index, byte in enumerate(head) if not 0x80 <= byte < 0xC0), len(head))
+
+
+def _start_cursor(
+    safe_path: Path,
+    stat_result: os.stat_result,
+    start_line: int | None,
+    end_line: int | None,
+    start_offset_inclusive: int,
+    end_offset_inclusive: int,
+    offset_type: str,
+    file_encoding: str,
+    is_binary: bool,
+    page_size: int,
+) -> ReadCursor:
+    """Return the cursor of the first page of a line or byte range."""
+    offset_enum, start, end = _resolve_offsets(offset_type, start_offset_inclusive, end_offset_inclusive, start_line, end_line, is_binary)
+    if offset_enum == OffsetType.CHAR:
+        raise ValueError("Paginated reads take line or byte offsets")
+    if start < 0 or end < -1:
+        raise ValueError(f"Paginated reads need a forward range: {start}..{end}")
+
+    file_size = stat_result.st_size
+    if offset_enum == OffsetType.LINE:
+        start_byte = line_offset(safe_path, start, file_encoding)
+        end_byte = file_size if end == -1 else max(start_byte, line_offset(safe_path, end + 1, file_encoding))
+        return ReadCursor.for_file(stat_result, start_byte, start, end_byte, text=True, page_size=page_size)
+
+    start_byte = min(start, file_size)
+    end_byte = file_size if end == -1 else max(start_byte, min(end + 1, file_size))
+    line = 0 if is_binary else line_number_at(safe_path, start_byte, file_encoding)
+    return ReadCursor.for_file(stat_result, start_byte, line, end_byte, text=not is_binary, page_size=page_size)
+
+
 def _resolve_line_number_hint(add_line_numbers: bool | None, safe_path: Path) -> bool:
     """Infer whether to display line numbers when parameter is not provided."""
     return FileUtils.is_source_code_file(safe_path) if add_line_numbers is None else add_line_numbers
@@ -294,10 +952,21 @@ def _read_file_segment(
     file_encoding: str,
     add_line_numbers: bool,
 ) -> bytes:
-    """Read the requested segment from disk."""
+    """Read the requested segment from disk.
+
+    Line and character ranges of large files seek to the range through the
+    file's line-offset index (see ``line_index``) instead of reading every line.
+    """
     if offset_enum == OffsetType.BYTE:
         return _read_binary_segment(safe_path, start_offset_inclusive, end_offset_inclusive)
 
+    index = line_index_for(safe_path, file_encoding) if start_offset_inclusive >= 0 and end_offset_inclusive >= -1 else None
+    if index is not None and offset_enum == OffsetType.LINE:
+        selected_lines = index.read_lines(safe_path, start_offset_inclusive, end_offset_inclusive)
+        return _format_lines(selected_lines, start_offset_inclusive, add_line_numbers, file_encoding)
+    if index is not None:
+        return index.read_chars(safe_path, start_offset_inclusive, end_offset_inclusive).encode(file_encoding)
+
     lines = _read_all_lines(safe_path, file_encoding)
     if offset_enum == OffsetType.LINE:
         return _read_line_segment(lines, start_offset_inclusive, end_offset_inclusive, add_line_numbers, file_encoding)
@@ -331,7 +1000,11 @@ def _read_line_segment(
 ) -> bytes:
     """Return selected lines encoded as bytes."""
     end_index = len(lines) if end == -1 else end + 1
-    selected_lines = lines[start:end_index]
+    return _format_lines(lines[start:end_index], start, add_line_numbers, encoding)
+
+
+def _format_lines(selected_lines: list[str], start: int, add_line_numbers: bool, encoding: str) -> bytes:
+    """Join lines read from 0-based line ``start`` onwards, optionally numbered, as bytes."""
     if add_line_numbers:
         formatted = [f"{start + index + 1}|{line.rstrip(LINE_BREAK)}" for index, line in enumerate(selected_lines)]
         return LINE_BREAK.join(formatted).encode(encoding)
@@ -493,6 +1166,7 @@ async def write_to_file_tool(
             return error_response
 
         _write_validated_content(safe_path, write_content, mode, file_encoding)
+        _record_written(root_dir, [safe_path])
 
         return {
             "success": True,
@@ -510,6 +1184,7 @@ async def delete_paths_tool(root_dir: Path, paths: list[str]) -> dict[str, Any]:
 
     try:
         deleted = []
+        deleted_paths: list[Path] = []
         errors = []
 
         for path_str in paths:
@@ -526,9 +1201,12 @@ async def delete_paths_tool(root_dir: Path, paths: list[str]) -> dict[str, Any]:
                     safe_path.unlink()
 
                 deleted.append(str(safe_path.relative_to(root_dir)))
+                deleted_paths.append(safe_path)
             except Exception as e:
                 errors.append(f"{path_str}: {e!s}")
 
+        _record_removed(root_dir, deleted_paths)
+
         result: dict[str, Any] = {"deleted": deleted}
         if errors:
             result["errors"] = errors
@@ -585,6 +1263,7 @@ async def modify_file_tool(
             return {"error": f"Invalid offset_type: {offset_type}"}
 
         safe_path.write_text(new_full_content, encoding="utf-8")
+        _record_written(root_dir, [safe_path])
 
         return {
             "success": True,
@@ -622,6 +1301,7 @@ async def replace_in_file_tool(
             new_file_content = content.replace(old_content, new_content)
 
         safe_path.write_text(new_file_content, encoding="utf-8")
+        _record_written(root_dir, [safe_path])
 
         return {
             "success": True,
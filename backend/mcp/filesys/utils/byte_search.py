@@ -0,0 +1,279 @@
+"""Search file content as raw bytes.
+
+Files are opened as ``bytes`` or, above ``MMAP_MIN_SIZE``, as read-only memory
+maps, so searching needs no decoded copy of the content. Literal keywords are matched as their
+UTF-8 encoding, which is exact on any content, and regexes use byte-compiled
+patterns (``RegexSet.search_bytes``), which agree with the text patterns on
+ASCII content. Text is only decoded when a non-ASCII file must be matched by
+regex or when match snippets are reported.
+
+Mapped files above ``WINDOW_MIN_SIZE`` are scanned in windows. Each window
+owns the match starts in ``[start, end)`` and is searched up to ``end`` plus an
+overlap of the longest possible match, so a match crossing a window boundary
+is seen whole by the window it starts in. Pages of finished windows are
+released, so a worker's resident memory is bounded by the window size however
+large the file is.
+"""
+
+import contextlib
+import mmap
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import ahocorasick
+from files.backend.mcp.filesys.utils.regex_set import AUTOMATON_MIN_LITERALS
+
+# Files at least this large are memory-mapped rather than read
+MMAP_MIN_SIZE = 64 * 1024
+
+# Mapped files at least this large are scanned in windows of SCAN_WINDOW bytes
+WINDOW_MIN_SIZE = 64 * 1024 * 1024
+SCAN_WINDOW = 16 * 1024 * 1024
+
+# Overlap used when the longest match is unbounded (e.g. ``\w+``) or unknown; longer
+# matches crossing a window boundary are not guaranteed to be found
+MAX_WINDOW_OVERLAP = 1024 * 1024
+
+# Slice of a mapped file checked for non-ASCII bytes at a time
+_ASCII_CHECK_CHUNK = 1 << 20
+
+_UNDERSCORE = ord("_")
+
+# UTF-8 of the Kelvin sign, the only non-ASCII character that lower-cases to an ASCII letter ("k")
+_KELVIN_SIGN = "\u212a".encode()
+
+# File content as read (small files) or mapped (large files)
+Content = bytes | mmap.mmap
+
+
+@contextlib.contextmanager
+def open_content(path: Path) -> Iterator[Content]:
+    """Yield the content of ``path`` without decoding it.
+
+    Mapped content is only valid inside the ``with`` block, and no match
+    object over it may outlive the block.
+    """
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        mapped = None
+        if size >= MMAP_MIN_SIZE:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+        if mapped is None:
+            yield handle.read()
+            return
+        with mapped:
+            yield mapped
+
+
+def build_automaton(keywords: list[str]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton over ``keywords`` whose values are ``(index, keyword)``."""
+    automaton = ahocorasick.Automaton()
+    for idx, key in enumerate(keywords):
+        automaton.add_word(key, (idx, key))
+    automaton.make_automaton()
+    return automaton
+
+
+def is_ascii(data: Content, start: int = 0, end: int | None = None) -> bool:
+    """Return whether ``data[start:end]`` holds only ASCII bytes."""
+    end = len(data) if end is None else end
+    if isinstance(data, bytes) and start == 0 and end == len(data):
+        return data.isascii()
+    return all(data[offset : min(end, offset + _ASCII_CHECK_CHUNK)].isascii() for offset in range(start, end, _ASCII_CHECK_CHUNK))
+
+
+def decode_content(data: Content) -> str:
+    """Decode ``data`` as UTF-8, dropping invalid bytes."""
+    return str(data, "utf-8", "ignore")
+
+
+def window_overlap(max_width: int | None) -> int:
+    """Return the overlap in bytes for matches of at most ``max_width`` characters."""
+    # A character takes up to four bytes in UTF-8
+    return MAX_WINDOW_OVERLAP if max_width is None else min(MAX_WINDOW_OVERLAP, 4 * max_width)
+
+
+def scan_windows(data: mmap.mmap, overlap: int, window: int | None = None) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(start, end, stop)`` windows over a mapped file.
+
+    Windows own the match starts in ``[start, end)`` and cover ``[start, stop)``,
+    ``stop`` reaching ``overlap`` bytes past ``end``. Every ``end`` falls on a
+    UTF-8 character boundary. Pages before the next window are released from
+    the mapping once a window has been consumed.
+
+    Args:
+        data: Mapped file
+        overlap: Bytes of lookahead past each window
+        window: Bytes of match starts per window (default ``SCAN_WINDOW``)
+    """
+    size = len(data)
+    step = max(1, window or SCAN_WINDOW)
+    start = 0
+    released = 0
+    while start < size:
+        end = utf8_boundary(data, min(size, start + step))
+        if end <= start:
+            end = min(size, start + step)
+        yield start, end, min(size, end + overlap)
+
+        # Keep the page holding ``end``, where the next window begins
+        page_end = end - end % mmap.PAGESIZE
+        if page_end > released and hasattr(mmap, "MADV_DONTNEED"):
+            data.madvise(mmap.MADV_DONTNEED, released, page_end - released)
+            released = page_end
+        start = end
+
+
+def utf8_boundary(data: Content, offset: int) -> int:
+    """Move ``offset`` back to the start of the UTF-8 character containing it."""
+    floor = max(0, offset - 3)
+    while offset > floor and offset < len(data) and 0x80 <= data[offset] < 0xC0:
+        offset -= 1
+    return offset
+
+
+class LiteralSet:
+    """Literal keywords matched against decoded text or raw bytes.
+
+    ``automaton`` (keyed by the keywords themselves) serves text matching and
+    match location. Raw content is searched for each keyword's UTF-8 bytes: one
+    substring search per keyword for small sets, or a single automaton scan
+    over a Latin-1 view of the bytes, where each character stands for one byte.
+
+    With ``ignore_case`` the automata are built over lower-cased keywords and
+    run over content lower-cased as ``fold_case`` does, for bytes and text alike:
+    ASCII keyword sets fold the content's ASCII letters in place of the bytes
+    (decoding only content with a Kelvin sign when a keyword has a "k"), other
+    sets are matched on decoded text. With
+    ``whole_word`` a hit only counts when no word character (letter, digit or
+    underscore) directly precedes or follows it, as in ``grep -w``. The scan
+    continues past rejected hits, so both modes stay single-pass and linear.
+    """
+
+    def __init__(
+        self,
+        keywords: list[str],
+        build_automaton: Callable[[list[str]], ahocorasick.Automaton],
+        ignore_case: bool = False,
+        whole_word: bool = False,
+    ) -> None:
+        """Compile ``keywords`` for text and byte matching.
+
+        Args:
+            keywords: Literal keywords
+            build_automaton: Builds an automaton with ``(index, keyword)`` values
+            ignore_case: Match regardless of letter case
+            whole_word: Only match keywords not adjoined by word characters
+        """
+        self.keywords = keywords
+        self.ignore_case = ignore_case
+        self.whole_word = whole_word
+        keys = [keyword.lower() for keyword in keywords] if ignore_case else keywords
+        self.automaton = build_automaton(keys)
+        self._needles = [needle for needle in dict.fromkeys(key.encode("utf-8") for key in keys) if needle]
+        # ``bytes.lower`` folds exactly the ASCII letters; other keywords need Unicode folding of decoded text
+        self._decode = ignore_case and not all(key.isascii() for key in keys)
+        self._kelvin = ignore_case and any("k" in key for key in keys)
+        self._byte_automaton: ahocorasick.Automaton | None = None
+        if len(self._needles) >= AUTOMATON_MIN_LITERALS and not self._decode:
+            if all(key.isascii() for key in keys):
+                self._byte_automaton = self.automaton
+            else:
+                self._byte_automaton = build_automaton([needle.decode("latin-1") for needle in self._needles])
+
+    def search(self, text: str) -> bool:
+        """Return whether any keyword occurs in decoded ``text``."""
+        for _ in self.iter_spans(text):
+            return True
+        return False
+
+    def iter_spans(self, text: str) -> Iterator[tuple[int, int, str]]:
+        """Yield ``(start, end, keyword)`` for every keyword occurrence in decoded ``text``, ordered by end."""
+        if self.automaton.kind != ahocorasick.AHOCORASICK:
+            # Only empty keywords, which the automaton does not hold
+            return
+        folded = fold_case(text) if self.ignore_case else text
+        for end_index, (index, key) in self.automaton.iter(folded):
+            start, end = end_index - len(key) + 1, end_index + 1
+            if not self.whole_word or (not _is_word_char(text, start - 1) and not _is_word_char(text, end)):
+                yield start, end, self.keywords[index]
+
+    @property
+    def max_length(self) -> int:
+        """Length in bytes of the longest keyword."""
+        return max((len(needle) for needle in self._needles), default=0)
+
+    def search_bytes(self, data: Content, start: int = 0, end: int | None = None) -> bool:
+        """Return whether any keyword occurs in undecoded ``data[start:end]``."""
+        end = len(data) if end is None else end
+        if self._decode:
+            return self.search(decode_content(data[start:end]))
+        plain = not self.ignore_case and not self.whole_word
+        if self._byte_automaton is None and plain:
+            return any(data.find(needle, start, end) != -1 for needle in self._needles)
+        view = data if start == 0 and end == len(data) else data[start:end]
+        if self.ignore_case:
+            view = bytes(view)
+            if self._kelvin and _KELVIN_SIGN in view:
+                return self.search(decode_content(view))
+            view = view.lower()
+        if self._byte_automaton is None:
+            if not self.whole_word:
+                return any(view.find(needle) != -1 for needle in self._needles)
+            return any(self._bounded_find(data, view, start, needle) for needle in self._needles)
+        for end_index, (_index, key) in self._byte_automaton.iter(str(view, "latin-1")):
+            # Keys are ASCII or Latin-1 views of the needles, so their length is the match length in bytes
+            if plain or _is_word_boundary(data, start + end_index - len(key) + 1, start + end_index + 1):
+                return True
+        return False
+
+    @staticmethod
+    def _bounded_find(data: Content, view: Content, offset: int, needle: bytes) -> bool:
+        """Return whether ``needle`` occurs in ``view`` (``data`` from ``offset``) between word boundaries."""
+        position = view.find(needle)
+        while position != -1:
+            if _is_word_boundary(data, offset + position, offset + position + len(needle)):
+                return True
+            position = view.find(needle, position + 1)
+        return False
+
+
+def fold_case(text: str) -> str:
+    """Lower-case ``text`` without changing its length, so offsets into it stay valid.
+
+    The few characters whose lower-case form is longer (such as ``İ``) are kept as they are.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(lowered if len(lowered := char.lower()) == 1 else char for char in text)
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    """Return whether ``text[index]`` exists and is a letter, digit or underscore."""
+    if index < 0 or index >= len(text):
+        return False
+    char = text[index]
+    return char == "_" or char.isalnum()
+
+
+def _is_word_boundary(data: Content, start: int, end: int) -> bool:
+    """Return whether the UTF-8 characters before ``start`` and at ``end`` in ``data`` are not word characters."""
+    if start > 0:
+        byte = data[start - 1]
+        if byte < 0x80:
+            if byte == _UNDERSCORE or chr(byte).isalnum():
+                return False
+        elif _is_word_char(decode_content(data[utf8_boundary(data, start - 1) : start]), 0):
+            return False
+    if end >= len(data):
+        return True
+    byte = data[end]
+    if byte < 0x80:
+        return byte != _UNDERSCORE and not chr(byte).isalnum()
+    # A character takes up to four bytes; a truncated one after it is dropped by decoding
+    return not _is_word_char(decode_content(data[end : end + 4]), 0)
@@ -0,0 +1,158 @@
+"""Locate keyword matches in file content with line numbers, offsets and context.
+
+Positions come straight from the matchers the searcher already runs
+(``automaton.iter`` end indices and ``regex.finditer`` spans). Line numbers and
+byte offsets are derived in a single forward pass over the text up to the last
+reported match, and only the lines needed for context are ever extracted.
+"""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import ahocorasick
+import regex
+
+# Longest matched text reported per match (regexes can span large regions)
+MAX_MATCH_TEXT = 200
+
+# Longest line reported in context (minified files can have enormous lines)
+MAX_CONTEXT_LINE = 500
+
+
+@dataclass(frozen=True)
+class ContentMatch:
+    """A single keyword occurrence.
+
+    ``line`` and ``column`` are 1-based; ``byte_offset`` is the 0-based UTF-8
+    offset of the match start within the file.
+    """
+
+    line: int
+    column: int
+    byte_offset: int
+    keyword: str
+    text: str
+
+
+@dataclass
+class FileMatches:
+    """Matches found in one file plus the context lines needed to display them."""
+
+    path: str
+    matches: list[ContentMatch] = field(default_factory=list)
+    context: dict[int, str] = field(default_factory=dict)
+    truncated: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable representation."""
+        return {
+            "path": self.path,
+            "matches": [asdict(match) for match in self.matches],
+            "truncated": self.truncated,
+        }
+
+
+def locate_matches(
+    path: str,
+    content: str,
+    automaton: ahocorasick.Automaton | None,
+    regex_patterns: Sequence[regex.Pattern] | None,
+    context_lines: int = 2,
+    max_matches: int = 20,
+    literal_spans: Iterator[tuple[int, int, str]] | None = None,
+) -> FileMatches:
+    """Find match locations in ``content`` for every keyword at once.
+
+    Args:
+        path: Path reported in the result
+        content: Decoded file content
+        automaton: Aho-Corasick automaton whose values are ``(index, keyword)``
+        regex_patterns: Compiled regex patterns
+        context_lines: Lines of context to collect around each matching line
+        max_matches: Maximum number of matches reported for the file
+        literal_spans: ``(start, end, keyword)`` literal hits in ``content`` (e.g. ``LiteralSet.iter_spans``), used instead of ``automaton``
+
+    Returns:
+        File matches ordered by position, with ``truncated`` set when more
+        matches exist than were reported
+    """
+    spans = _collect_spans(content, automaton, regex_patterns, max_matches, literal_spans)
+    spans.sort()
+    result = FileMatches(path, truncated=len(spans) > max_matches)
+
+    line = 1
+    line_start = 0
+    cursor = 0
+    byte_cursor = 0
+    expanded: set[int] = set()
+    for start, end, keyword in spans[:max_matches]:
+        newlines = content.count("\n", cursor, start)
+        if newlines:
+            line += newlines
+            line_start = content.rfind("\n", cursor, start) + 1
+        byte_cursor += len(content[cursor:start].encode("utf-8", "surrogatepass"))
+        cursor = start
+
+        text = content[start:end]
+        result.matches.append(ContentMatch(line, start - line_start + 1, byte_cursor, keyword, text[:MAX_MATCH_TEXT]))
+        if line not in expanded:
+            expanded.add(line)
+            _collect_context(content, line, line_start, context_lines, result.context)
+
+    return result
+
+
+def _collect_spans(
+    content: str,
+    automaton: ahocorasick.Automaton | None,
+    regex_patterns: Sequence[regex.Pattern] | None,
+    max_matches: int,
+    literal_spans: Iterator[tuple[int, int, str]] | None = None,
+) -> list[tuple[int, int, str]]:
+    """Gather up to ``max_matches + 1`` ``(start, end, keyword)`` spans per matcher."""
+    spans: list[tuple[int, int, str]] = []
+    if literal_spans is not None:
+        for span in literal_spans:
+            spans.append(span)
+            if len(spans) > max_matches:
+                break
+    elif automaton:
+        for end_index, (_idx, keyword) in automaton.iter(content):
+            spans.append((end_index - len(keyword) + 1, end_index + 1, keyword))
+            if len(spans) > max_matches:
+                break
+
+    for pattern in regex_patterns or []:
+        for count, found in enumerate(pattern.finditer(content)):
+            spans.append((found.start(), found.end(), pattern.pattern))
+            if count >= max_matches:
+                break
+    return spans
+
+
+def _collect_context(content: str, line: int, line_start: int, context_lines: int, into: dict[int, str]) -> None:
+    """Store ``line`` and up to ``context_lines`` lines either side of it in ``into``."""
+    start = line_start
+    for number in range(line, max(0, line - context_lines - 1), -1):
+        if number != line:
+            start = content.rfind("\n", 0, start - 1) + 1
+        if number not in into:
+            into[number] = _line_at(content, start)
+        if start == 0:
+            break
+
+    end = content.find("\n", line_start)
+    for number in range(line + 1, line + context_lines + 1):
+        if end == -1:
+            break
+        start = end + 1
+        end = content.find("\n", start)
+        if number not in into:
+            into[number] = _line_at(content, start)
+
+
+def _line_at(content: str, start: int) -> str:
+    end = content.find("\n", start)
+    text = content[start : end if end != -1 else len(content)].rstrip("\r")
+    return text if len(text) <= MAX_CONTEXT_LINE else f"{text[:MAX_CONTEXT_LINE]}..."
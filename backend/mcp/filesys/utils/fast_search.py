@@ -1,84 +1,247 @@
 """Fast multithreaded file search with pyahocorasick and regex optimization."""
 
 import asyncio
+import contextlib
+import dataclasses
+import functools
+import itertools
 import json
-from collections.abc import Iterable
-from concurrent.futures import ThreadPoolExecutor
+import mmap
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Literal
 
-import ahocorasick
 import regex
+from files.backend.mcp.filesys.utils.byte_search import (
+    WINDOW_MIN_SIZE,
+    Content,
+    LiteralSet,
+    build_automaton,
+    decode_content,
+    is_ascii,
+    open_content,
+    scan_windows,
+    window_overlap,
+)
+from files.backend.mcp.filesys.utils.content_matches import FileMatches, locate_matches
+from files.backend.mcp.filesys.utils.file_classes import file_class_cache
+from files.backend.mcp.filesys.utils.find_query import FindQuery
+from files.backend.mcp.filesys.utils.gitignore import gitignore_matcher_for
+from files.backend.mcp.filesys.utils.regex_literals import RequiredLiterals, extract_required_literals
+from files.backend.mcp.filesys.utils.regex_set import RegexSet
+from files.backend.mcp.filesys.utils.search_order import check_search_order, git_changed_files, order_by_recency, walk_mtimes
+from files.backend.mcp.filesys.utils.search_workspace import SearchWorkspace
+from files.backend.mcp.filesys.utils.tree_walker import EntryFilter, FileFilter, walk_files
+from files.backend.mcp.filesys.utils.trigram_index import TrigramIndex
 from loguru import logger
 
+REGEX_FLAGS = regex.MULTILINE | regex.DOTALL
+
+# Files in the first streaming batch; kept small so the first matches surface quickly
+STREAM_BATCH_SIZE = 64
+
+# Batches double in size (each time one completes without reaching the limit) up to this
+# many files, so long searches pay little per-batch overhead
+STREAM_MAX_BATCH_SIZE = 1024
+
+SearchEngine = Literal["auto", "thread", "process"]
+
+# In auto mode, regex searches move to worker processes once this many files are in play
+PROCESS_MIN_FILES = 2000
+
+# Compiled matcher sets kept per searcher
+MATCHER_CACHE_SIZE = 64
+
+Matchers = tuple[
+    LiteralSet | None,
+    RegexSet | None,
+    LiteralSet | None,
+    RegexSet | None,
+    FindQuery | None,
+]
+
+
+@dataclass(frozen=True)
+class _MatcherSpec:
+    """Picklable description of a search's matchers, rebuilt inside worker processes."""
+
+    path_keywords: tuple[str, ...]
+    content_keywords: tuple[str, ...]
+    regex_mode: bool
+    query: str = ""
+    ignore_case: bool = False
+    whole_word: bool = False
+    # The issuing searcher's setting, so worker processes build the same regex matchers
+    regex_prefilter: bool = True
+
+
+@dataclass(frozen=True)
+class _BatchJob:
+    """What a worker does with a batch: filter paths or locate matches."""
+
+    locate: bool = False
+    context_lines: int = 2
+    max_matches: int = 20
+    # Searched directory; find queries test paths relative to it
+    directory: str = ""
+
+
+@dataclass
+class _SearchPlan:
+    """State shared by the walker and workers of one search."""
+
+    files: Iterator[Path]
+    spec: _MatcherSpec
+    matchers: Matchers
+    file_count: int = 0
+    walked: int = 0
+    concurrency: int = 1
+    limiter: asyncio.Semaphore | None = None
+    index: TrigramIndex | None = None
+    candidates: set[int] | None = None
+    snapshot: tuple[int, int] = (0, 0)
+    stat_of: Callable[[Path], tuple[int, int] | None] | None = None
+    stale: list[Path] = field(default_factory=list)
+    batch_size: int = STREAM_BATCH_SIZE
+
+    @property
+    def check_content(self) -> bool:
+        return bool(self.spec.content_keywords) or (self.matchers[4] is not None and self.matchers[4].needs_content)
+
+    @property
+    def corpus_size(self) -> int:
+        """Known total file count, or the number walked so far when streaming."""
+        return max(self.file_count, self.walked)
+
+
+class _SearchProcessPools:
+    """Long-lived worker process pools shared by all searchers, keyed by size."""
+
+    def __init__(self) -> None:
+        self._pools: dict[int, ProcessPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, max_workers: int) -> ProcessPoolExecutor:
+        """Return the pool with ``max_workers`` processes, starting it if needed."""
+        with self._lock:
+            pool = self._pools.get(max_workers)
+            if pool is None:
+                # spawn avoids forking a parent that is already running threads
+                pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+                self._pools[max_workers] = pool
+            return pool
+
+    def discard(self, pool: ProcessPoolExecutor) -> None:
+        """Forget a broken pool so the next search starts a fresh one."""
+        with self._lock:
+            for size, existing in list(self._pools.items()):
+                if existing is pool:
+                    del self._pools[size]
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_PROCESS_POOLS = _SearchProcessPools()
+
+
+def shutdown_search_processes() -> None:
+    """Stop the worker processes used by the process search engine."""
+    _PROCESS_POOLS.shutdown()
+
+
+@functools.lru_cache(maxsize=1)
+def _read_text_extensions() -> frozenset[str]:
+    """Parse the text extension resource; cached because every searcher needs the same set."""
+    res_path = Path(__file__).resolve().parents[4] / "res" / "text_extensions_minimal.json"
+    if not res_path.exists():
+        raise FileNotFoundError("Required resource text_extensions_minimal.json is missing. Run the files module setup to regenerate managed resources.")
+
+    try:
+        with res_path.open(encoding="utf-8") as handle:
+            data = json.load(handle)
+    except json.JSONDecodeError as exc:
+        raise ValueError("Resource text_extensions_minimal.json contains invalid JSON. Validate the file and rerun the files module bootstrap.") from exc
+    except OSError as exc:
+        raise RuntimeError("Unable to load text_extensions_minimal.json due to an IO error.") from exc
+
+    extensions = data.get("text_extensions")
+    if not isinstance(extensions, list) or not extensions:
+        raise ValueError("Resource text_extensions_minimal.json must define a non-empty 'text_extensions' list.")
+
+    normalised = []
+    for ext in extensions:
+        if not isinstance(ext, str) or not ext:
+            raise ValueError("All text extensions must be non-empty strings.")
+        normalised.append(ext if ext.startswith(".") else f".{ext}")
+
+    return frozenset(normalised)
+
 
 class FastFileSearcher:
     """Optimized file searcher using multithreading and fast pattern matching."""
 
-    def __init__(self, max_workers: int = 8):
+    def __init__(
+        self,
+        max_workers: int = 8,
+        engine: SearchEngine = "thread",
+        process_min_files: int = PROCESS_MIN_FILES,
+        regex_prefilter: bool = True,
+    ):
         """Initialize the fast searcher.
 
+        A searcher is meant to be long-lived: its thread pool stays warm and
+        compiled matchers are kept in an LRU keyed by keyword set, so repeated
+        queries skip automaton and regex compilation.
+
         Args:
-            max_workers: Maximum number of worker threads
+            max_workers: Size of the worker pool; queries may use fewer
+            engine: Where file batches are matched: ``thread`` (in-process pool),
+                ``process`` (shared long-lived worker processes) or ``auto``
+            process_min_files: Corpus size at which ``auto`` moves regex searches to processes
+            regex_prefilter: Skip content regexes whose required literals are absent from a file
         """
         self.max_workers = max_workers
+        self.engine = engine
+        self.process_min_files = process_min_files
+        self.regex_prefilter = regex_prefilter
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._matcher_cache: OrderedDict[_MatcherSpec, Matchers] = OrderedDict()
+        self._matcher_lock = threading.Lock()
         self._load_text_extensions()
 
     def _load_text_extensions(self) -> None:
-        """Load text file extensions from resource file."""
-        res_path = Path(__file__).resolve().parents[4] / "res" / "text_extensions_minimal.json"
-        if not res_path.exists():
-            raise FileNotFoundError("Required resource text_extensions_minimal.json is missing. Run the files module setup to regenerate managed resources.")
-
-        try:
-            with res_path.open(encoding="utf-8") as handle:
-                data = json.load(handle)
-        except json.JSONDecodeError as exc:
-            raise ValueError("Resource text_extensions_minimal.json contains invalid JSON. Validate the file and rerun the files module bootstrap.") from exc
-        except OSError as exc:
-            raise RuntimeError("Unable to load text_extensions_minimal.json due to an IO error.") from exc
-
-        extensions = data.get("text_extensions")
-        if not isinstance(extensions, list) or not extensions:
-            raise ValueError("Resource text_extensions_minimal.json must define a non-empty 'text_extensions' list.")
-
-        normalised = []
-        for ext in extensions:
-            if not isinstance(ext, str) or not ext:
-                raise ValueError("All text extensions must be non-empty strings.")
-            normalised.append(ext if ext.startswith(".") else f".{ext}")
-
-        self.text_extensions = set(normalised)
+        """Load text file extensions from resource file (parsed once per process)."""
+        self.text_extensions = _read_text_extensions()
 
-    def _build_aho_corasick(self, keywords: list[str]) -> ahocorasick.Automaton:
-        """Build Aho-Corasick automaton for exact string matching.
-
-        Args:
-            keywords: List of keywords to search for
-
-        Returns:
-            Built automaton for fast multi-pattern matching
-        """
-        automaton = ahocorasick.Automaton()
-        for idx, key in enumerate(keywords):
-            automaton.add_word(key, (idx, key))
-        automaton.make_automaton()
-        return automaton
-
-    def _compile_regex_patterns(self, patterns: list[str]) -> list[regex.Pattern]:
+    def _compile_regex_patterns(self, patterns: list[str], ignore_case: bool = False, whole_word: bool = False) -> list[regex.Pattern]:
         """Compile regex patterns using the faster 'regex' library.
 
         Args:
             patterns: List of regex patterns
+            ignore_case: Compile with ``IGNORECASE``
+            whole_word: Reject matches adjoined by word characters
 
         Returns:
             List of compiled regex patterns
         """
+        flags = REGEX_FLAGS | regex.IGNORECASE if ignore_case else REGEX_FLAGS
         compiled = []
         for pattern in patterns:
             try:
                 # Use regex library which is faster than re for complex patterns
-                compiled.append(regex.compile(pattern, regex.MULTILINE | regex.DOTALL))
+                compiled.append(regex.compile(rf"(?<!\w)(?:{pattern})(?!\w)" if whole_word else pattern, flags))
             except regex.error as e:
                 logger.warning(f"Invalid regex pattern '{pattern}': {e}")
         return compiled
@@ -86,51 +249,110 @@ class FastFileSearcher:
     def _search_file_content(
         self,
         file_path: Path,
-        automaton: ahocorasick.Automaton | None,
-        regex_patterns: list[regex.Pattern] | None,
+        literals: LiteralSet | None,
+        regex_patterns: RegexSet | None,
     ) -> bool:
-        """Search file content using Aho-Corasick or regex.
+        """Search file content using Aho-Corasick or regex, without decoding it where possible.
 
         Args:
             file_path: Path to file to search
-            automaton: Aho-Corasick automaton for exact matching
+            literals: Literal keywords for exact matching
             regex_patterns: Compiled regex patterns
 
         Returns:
             True if any pattern matches
         """
         try:
-            # Read file content
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
+            with open_content(file_path) as data:
+                return self._content_matches(data, literals, regex_patterns)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Error reading file {file_path}: {e}")
+            return False
+
+    @staticmethod
+    def _content_matches(data: Content, literals: LiteralSet | None, regex_patterns: RegexSet | None) -> bool:
+        """Match raw content; only non-ASCII content searched by regex is decoded.
 
-            # Check with Aho-Corasick (exact matching)
-            if automaton:
-                for _ in automaton.iter(content):
-                    return True
+        Large mapped files are matched window by window, so the memory a
+        worker touches stays bounded by the window size.
+        """
+        size = len(data)
+        if not isinstance(data, mmap.mmap) or size < WINDOW_MIN_SIZE:
+            return FastFileSearcher._range_matches(data, 0, size, size, literals, regex_patterns)
 
-            # Check with regex patterns
-            if regex_patterns:
-                for pattern in regex_patterns:
-                    if pattern.search(content):
-                        return True
+        overlap = max(
+            literals.max_length if literals is not None else 0,
+            window_overlap(regex_patterns.max_width) if regex_patterns is not None else 0,
+        )
+        return any(FastFileSearcher._range_matches(data, start, end, stop, literals, regex_patterns) for start, end, stop in scan_windows(data, overlap))
 
+    @staticmethod
+    def _range_matches(
+        data: Content,
+        start: int,
+        end: int,
+        stop: int,
+        literals: LiteralSet | None,
+        regex_patterns: RegexSet | None,
+    ) -> bool:
+        """Match content in ``[start, stop)``, accepting regex matches that start before ``end``."""
+        if literals is not None and literals.search_bytes(data, start, stop):
+            return True
+        if regex_patterns is None:
             return False
+        if regex_patterns.supports_bytes and is_ascii(data, start, stop):
+            return regex_patterns.search_bytes(data, start, stop, start_before=end) is not None
+        if start == 0 and stop == len(data):
+            return regex_patterns.search(decode_content(data)) is not None
+        # Decode the owned part and the lookahead separately to know where the owned text ends
+        head = decode_content(data[start:end])
+        return regex_patterns.search(head + decode_content(data[end:stop]), start_before=len(head)) is not None
+
+    def _locate_file_content(
+        self,
+        file_path: Path,
+        literals: LiteralSet | None,
+        regex_patterns: RegexSet | None,
+        context_lines: int,
+        max_matches: int,
+    ) -> FileMatches | None:
+        """Locate every match in a file, or None when nothing matches.
+
+        Args:
+            file_path: Path to file to search
+            literals: Literal keywords for exact matching
+            regex_patterns: Compiled regex patterns
+            context_lines: Lines of context to collect around each match
+            max_matches: Maximum matches reported for the file
 
-        except (OSError, UnicodeDecodeError) as e:
+        Returns:
+            Match locations with context, or None
+        """
+        try:
+            with open_content(file_path) as data:
+                # Most files do not match: reject them on raw bytes and decode only the rest
+                if not self._content_matches(data, literals, regex_patterns):
+                    return None
+                content = decode_content(data)
+        except (OSError, ValueError) as e:
             logger.debug(f"Error reading file {file_path}: {e}")
-            return False
+            return None
+
+        spans = literals.iter_spans(content) if literals is not None else None
+        found = locate_matches(str(file_path), content, None, regex_patterns, context_lines, max_matches, spans)
+        return found if found.matches else None
 
     def _search_file_path(
         self,
         file_path: Path,
-        automaton: ahocorasick.Automaton | None,
-        regex_patterns: list[regex.Pattern] | None,
+        literals: LiteralSet | None,
+        regex_patterns: RegexSet | None,
     ) -> bool:
         """Search file path using Aho-Corasick or regex.
 
         Args:
             file_path: Path to check
-            automaton: Aho-Corasick automaton for exact matching
+            literals: Literal keywords for exact matching
             regex_patterns: Compiled regex patterns
 
         Returns:
@@ -139,34 +361,28 @@ class FastFileSearcher:
         path_str = str(file_path)
 
         # Check with Aho-Corasick (exact matching)
-        if automaton:
-            for _ in automaton.iter(path_str):
-                return True
-
-        # Check with regex patterns
-        if regex_patterns:
-            for pattern in regex_patterns:
-                if pattern.search(path_str):
-                    return True
+        if literals is not None and literals.search(path_str):
+            return True
 
-        return False
+        # Check every regex pattern in one pass
+        return regex_patterns is not None and regex_patterns.search(path_str) is not None
 
     def _process_file_batch(
         self,
         files: list[Path],
-        path_automaton: ahocorasick.Automaton | None,
-        path_regex: list[regex.Pattern] | None,
-        content_automaton: ahocorasick.Automaton | None,
-        content_regex: list[regex.Pattern] | None,
+        path_literals: LiteralSet | None,
+        path_regex: RegexSet | None,
+        content_literals: LiteralSet | None,
+        content_regex: RegexSet | None,
         check_content: bool,
     ) -> list[str]:
         """Process a batch of files in a worker thread.
 
         Args:
             files: Batch of files to process
-            path_automaton: Automaton for path matching
+            path_literals: Literal keywords for path matching
             path_regex: Regex patterns for path matching
-            content_automaton: Automaton for content matching
+            content_literals: Literal keywords for content matching
             content_regex: Regex patterns for content matching
             check_content: Whether to check file content
 
@@ -178,15 +394,15 @@ class FastFileSearcher:
         for file_path in files:
             # Check path match
             path_match = False
-            if path_automaton or path_regex:
-                path_match = self._search_file_path(file_path, path_automaton, path_regex)
+            if path_literals or path_regex:
+                path_match = self._search_file_path(file_path, path_literals, path_regex)
                 if not path_match and not check_content:
                     continue
 
             # Check content match
             content_match = False
-            if check_content and (not (path_automaton or path_regex) or path_match) and self._is_text_file(file_path):
-                content_match = self._search_file_content(file_path, content_automaton, content_regex)
+            if check_content and (not (path_literals or path_regex) or path_match) and self._is_text_file(file_path):
+                content_match = self._search_file_content(file_path, content_literals, content_regex)
 
             # Add to results if matched
             if path_match or content_match:
@@ -194,6 +410,64 @@ class FastFileSearcher:
 
         return results
 
+    def _locate_file_batch(
+        self,
+        files: list[Path],
+        path_literals: LiteralSet | None,
+        path_regex: RegexSet | None,
+        content_literals: LiteralSet | None,
+        content_regex: RegexSet | None,
+        check_content: bool,
+        context_lines: int,
+        max_matches: int,
+    ) -> list[FileMatches]:
+        """Process a batch like ``_process_file_batch`` but report match locations.
+
+        Files matched by path alone are reported with an empty match list.
+        """
+        results = []
+
+        for file_path in files:
+            path_match = False
+            if path_literals or path_regex:
+                path_match = self._search_file_path(file_path, path_literals, path_regex)
+                if not path_match and not check_content:
+                    continue
+
+            located = None
+            if check_content and (not (path_literals or path_regex) or path_match) and self._is_text_file(file_path):
+                located = self._locate_file_content(file_path, content_literals, content_regex, context_lines, max_matches)
+
+            if located is not None:
+                results.append(located)
+            elif path_match:
+                results.append(FileMatches(str(file_path)))
+
+        return results
+
+    def _query_file_batch(self, files: list[Path], query: FindQuery, job: _BatchJob) -> list[Any]:
+        """Process a batch against a boolean find query.
+
+        Files are decided by their path whenever the query allows; otherwise
+        each file's content is read once for all of the query's content
+        predicates. When locating, matching files are read again to report
+        where the query's (non-negated) content terms occur.
+        """
+        results: list[Any] = []
+        prefix_length = len(job.directory.rstrip(os.sep)) + 1
+        for file_path in files:
+            relative = str(file_path)[prefix_length:].replace(os.sep, "/")
+            if not query.matches(file_path, relative, self._is_text_file):
+                continue
+            if not job.locate:
+                results.append(str(file_path))
+                continue
+            located = None
+            if query.locate_literals is not None or query.locate_regexes is not None:
+                located = self._locate_file_content(file_path, query.locate_literals, query.locate_regexes, job.context_lines, job.max_matches)
+            results.append(located if located is not None else FileMatches(str(file_path)))
+        return results
+
     def _is_text_file(self, file_path: Path) -> bool:
         """Check if file is likely a text file.
 
@@ -206,91 +480,167 @@ class FastFileSearcher:
         if file_path.suffix.lower() in self.text_extensions:
             return True
 
-        # Check by reading first few bytes
         try:
-            with file_path.open("rb") as file_handle:
-                chunk = file_handle.read(512)
-                # Check for null bytes (binary indicator)
-                if b"\x00" in chunk:
-                    return False
-                # Try to decode as UTF-8
-                try:
-                    chunk.decode("utf-8")
-                    return True
-                except UnicodeDecodeError:
-                    return False
+            return file_class_cache().is_text(file_path)
         except OSError:
             return False
 
-    def _collect_candidate_files(self, directory: Path, max_results: int) -> list[Path]:
-        """Collect candidate files up to the configured search limit."""
-
-        all_files: list[Path] = []
-        try:
-            for file_path in directory.rglob("*"):
-                # Skip .venv directories
-                if ".venv" in file_path.parts:
-                    continue
-                if file_path.is_file():
-                    all_files.append(file_path)
-                    if len(all_files) >= max_results * 2:
-                        break
-        except (OSError, PermissionError) as error:
-            logger.warning(f"Error scanning directory {directory}: {error}")
-
-        return all_files
+    def _iter_candidate_files(
+        self, directory: Path, ignore: EntryFilter | None = None, max_depth: int | None = None, file_filter: FileFilter | None = None
+    ) -> Iterator[Path]:
+        """Lazily yield candidate files so streaming searches can stop walking early."""
+        for entry in walk_files(directory, ignore=ignore, max_depth=max_depth, file_filter=file_filter):
+            yield Path(entry.path)
 
     def _prepare_matchers(
         self,
         path_keywords: list[str] | None,
         content_keywords: list[str] | None,
         regex_mode: bool,
-    ) -> tuple[
-        ahocorasick.Automaton | None,
-        list[regex.Pattern] | None,
-        ahocorasick.Automaton | None,
-        list[regex.Pattern] | None,
-    ]:
-        """Build matcher structures for path and content searches."""
-
-        path_automaton = None
-        path_regex: list[regex.Pattern] | None = None
-        content_automaton = None
-        content_regex: list[regex.Pattern] | None = None
+        query: str = "",
+        ignore_case: bool = False,
+        whole_word: bool = False,
+        regex_prefilter: bool | None = None,
+    ) -> Matchers:
+        """Build matcher structures for path and content searches, or for a boolean find query.
+
+        Literal keywords stay on the Aho-Corasick path in every mode: case
+        folding and word boundaries are handled by ``LiteralSet``. Regex
+        keywords get ``IGNORECASE`` and word-boundary guards instead.
+        ``regex_prefilter`` defaults to the searcher's own setting.
+
+        Raises:
+            ValueError: If ``query`` is malformed
+        """
+        if query:
+            return None, None, None, None, FindQuery(query, build_automaton, REGEX_FLAGS)
+
+        path_literals = None
+        path_regex: RegexSet | None = None
+        content_literals = None
+        content_regex: RegexSet | None = None
 
         if path_keywords:
             if regex_mode:
-                path_regex = self._compile_regex_patterns(path_keywords)
+                path_regex = RegexSet(self._compile_regex_patterns(path_keywords, ignore_case, whole_word))
             else:
-                path_automaton = self._build_aho_corasick(path_keywords)
+                path_literals = LiteralSet(path_keywords, build_automaton, ignore_case, whole_word)
 
         if content_keywords:
             if regex_mode:
-                content_regex = self._compile_regex_patterns(content_keywords)
+                use_prefilter = self.regex_prefilter if regex_prefilter is None else regex_prefilter
+                prefilter = build_automaton if use_prefilter else None
+                content_regex = RegexSet(self._compile_regex_patterns(content_keywords, ignore_case, whole_word), prefilter)
             else:
-                content_automaton = self._build_aho_corasick(content_keywords)
+                content_literals = LiteralSet(content_keywords, build_automaton, ignore_case, whole_word)
+
+        return path_literals, path_regex, content_literals, content_regex, None
+
+    def _matchers_for(self, spec: _MatcherSpec) -> Matchers:
+        """Return compiled matchers for ``spec`` from the LRU, compiling on a miss."""
+        with self._matcher_lock:
+            matchers = self._matcher_cache.get(spec)
+            if matchers is not None:
+                self._matcher_cache.move_to_end(spec)
+                return matchers
+
+        matchers = self._prepare_matchers(
+            list(spec.path_keywords), list(spec.content_keywords), spec.regex_mode, spec.query, spec.ignore_case, spec.whole_word, spec.regex_prefilter
+        )
+        with self._matcher_lock:
+            self._matcher_cache[spec] = matchers
+            self._matcher_cache.move_to_end(spec)
+            while len(self._matcher_cache) > MATCHER_CACHE_SIZE:
+                self._matcher_cache.popitem(last=False)
+        return matchers
+
+    @staticmethod
+    def _content_query(content_keywords: list[str], regex_mode: bool, ignore_case: bool = False) -> list[RequiredLiterals] | None:
+        """Describe content keywords as literal requirements for index lookups.
+
+        Returns None when any keyword lacks a usable literal, since that keyword
+        could match files the index would otherwise prune.
+        """
+        if not regex_mode:
+            if ignore_case:
+                return [RequiredLiterals((frozenset({keyword.lower()}),), ignore_case=True) for keyword in content_keywords]
+            return [RequiredLiterals((frozenset({keyword}),)) for keyword in content_keywords]
+
+        query: list[RequiredLiterals] = []
+        for pattern in content_keywords:
+            required = extract_required_literals(pattern, REGEX_FLAGS | regex.IGNORECASE if ignore_case else REGEX_FLAGS)
+            if required is None:
+                return None
+            query.append(required)
+        return query
 
-        return path_automaton, path_regex, content_automaton, content_regex
+    @staticmethod
+    def _stat_signature(file_path: Path) -> tuple[int, int] | None:
+        """Return ``(size, mtime_ns)`` straight from the filesystem."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _narrow_with_index(
+        self,
+        index: TrigramIndex,
+        files: list[Path],
+        candidates: set[int] | None,
+        snapshot: tuple[int, int],
+        stat_of: Callable[[Path], tuple[int, int] | None] | None = None,
+    ) -> tuple[list[Path], list[Path]]:
+        """Drop files the index proves cannot match.
 
-    def _split_batches(self, files: list[Path]) -> list[list[Path]]:
-        """Split collected files into thread-friendly batches."""
+        Args:
+            index: Trigram index for a root containing the files
+            files: Candidate files
+            candidates: Entry ids that may match, or None when the query cannot be narrowed
+            snapshot: ``index.snapshot()`` taken before the candidates were computed
+            stat_of: Source of ``(size, mtime_ns)`` signatures, defaulting to ``stat()``
 
-        if not files:
-            return []
+        Returns:
+            Tuple of (files still to scan, files whose index entries are missing or stale)
+        """
+        stat_of = stat_of or self._stat_signature
+        kept: list[Path] = []
+        stale: list[Path] = []
+        for file_path in files:
+            signature = stat_of(file_path)
+            if signature is None:
+                continue
+            entry_id = index.lookup(file_path, *signature)
+            if entry_id is None:
+                stale.append(file_path)
+                kept.append(file_path)
+            elif candidates is None or entry_id in candidates or index.added_since(entry_id, snapshot):
+                # Entries indexed after the candidates were computed are unknown to them
+                kept.append(file_path)
 
-        batch_size = max(1, len(files) // (self.max_workers * 4))
-        return [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+        logger.debug(f"Trigram index narrowed {len(files)} files to {len(kept)} ({len(stale)} unindexed)")
+        return kept, stale
 
     @staticmethod
-    def _flatten_results(batch_results: Iterable[list[str]], max_results: int) -> list[str]:
-        """Flatten batched search results while respecting the limit."""
+    def _refresh_index(index: TrigramIndex, stale: list[Path], save_interval: float) -> None:
+        """Index files that were scanned without a current entry."""
+        try:
+            index.update(stale)
+            index.save_if_due(save_interval)
+        except Exception as error:
+            logger.warning(f"Trigram index refresh failed for {index.root}: {error}")
 
-        results: list[str] = []
-        for batch in batch_results:
-            results.extend(batch)
-            if len(results) >= max_results:
-                break
-        return results[:max_results]
+    def _schedule_cache_saves(self, index: TrigramIndex | None, stale: list[Path], save_interval: float) -> None:
+        """Queue index refreshes and cache writes after a search so they never delay results."""
+        if index is not None and stale:
+            self.executor.submit(self._refresh_index, index, stale, save_interval)
+        classes = file_class_cache()
+        if classes.dirty:
+            self.executor.submit(classes.save_if_due, save_interval)
+
+    def _concurrency(self, max_workers: int | None) -> int:
+        """Resolve a per-query worker cap against the pool size."""
+        return self.max_workers if max_workers is None else max(1, min(max_workers, self.max_workers))
 
     async def search_files(
         self,
@@ -299,52 +649,490 @@ class FastFileSearcher:
         content_keywords: list[str] | None = None,
         regex_mode: bool = False,
         max_results: int = 10000,
+        index: TrigramIndex | None = None,
+        index_save_interval: float = 30.0,
+        workspace: SearchWorkspace | None = None,
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+        query: str | None = None,
+        file_filter: FileFilter | None = None,
+        max_depth: int | None = None,
+        order: str = "walk",
+        ignore_case: bool = False,
+        whole_word: bool = False,
     ) -> list[str]:
         """Search files using multithreading and optimized pattern matching.
 
+        Runs the same bounded walk/match pipeline as ``iter_search``, but
+        returns matches in walk order: only matches count toward
+        ``max_results``, and walking stops once that many are found.
+
         Args:
             directory: Directory to search in
             path_keywords: Keywords to match in file paths
             content_keywords: Keywords to match in file content
             regex_mode: Whether keywords are regex patterns
             max_results: Maximum number of results
+            index: Trigram index used to skip files that cannot match content keywords
+            index_save_interval: Minimum seconds between index and classification cache writes
+            workspace: Watched workspace supplying cached file listings, stats and index
+            respect_gitignore: Skip files ignored by the repository's ``.gitignore`` files
+            max_workers: Cap on pool workers this query may occupy (defaults to the whole pool)
+            query: Boolean find query (see ``find_query``), used instead of keyword lists
+            file_filter: Size, modification time and extension conditions checked while walking, before files are opened
+            max_depth: Only search files at most this many levels below ``directory`` (1 searches ``directory`` only)
+            order: Candidate visiting order (see ``search_order``): ``walk``, ``recent`` or ``git``
+            ignore_case: Match keywords regardless of letter case
+            whole_word: Only match keywords not adjoined by letters, digits or underscores
 
         Returns:
             List of matching file paths
         """
-        all_files = self._collect_candidate_files(directory, max_results)
-        if not all_files:
-            return []
+        results: list[str] = []
+        stream = self._stream(
+            directory,
+            path_keywords,
+            content_keywords,
+            regex_mode,
+            max_results,
+            index,
+            index_save_interval,
+            workspace,
+            _BatchJob(),
+            respect_gitignore,
+            max_workers,
+            ordered=True,
+            query=query,
+            file_filter=file_filter,
+            max_depth=max_depth,
+            order=order,
+            ignore_case=ignore_case,
+            whole_word=whole_word,
+        )
+        async with contextlib.aclosing(stream):
+            async for match in stream:
+                results.append(match)
+        return results
+
+    def _choose_engine(self, spec: _MatcherSpec, file_count: int) -> str:
+        """Pick the engine for a batch given the search type and corpus size seen so far.
+
+        Regex matching and UTF-8 decoding run under the GIL, so large regex
+        searches only scale across processes. Literal searches stay on threads:
+        they are dominated by I/O and the C automaton, and process hand-off
+        costs more than it saves.
+        """
+        if self.engine != "auto":
+            return self.engine
+        if spec.regex_mode and spec.content_keywords and file_count >= self.process_min_files and self.max_workers > 1 and (os.cpu_count() or 1) > 1:
+            return "process"
+        return "thread"
+
+    def _run_batch(self, matchers: Matchers, check_content: bool, job: _BatchJob, files: list[Path]) -> list[Any]:
+        """Execute ``job`` over one batch in the current process."""
+        path_literals, path_regex, content_literals, content_regex, query = matchers
+        if query is not None:
+            return self._query_file_batch(files, query, job)
+        if job.locate:
+            return self._locate_file_batch(files, path_literals, path_regex, content_literals, content_regex, check_content, job.context_lines, job.max_matches)
+        return self._process_file_batch(files, path_literals, path_regex, content_literals, content_regex, check_content)
+
+    async def _run_job(self, plan: _SearchPlan, job: _BatchJob, batch: list[Path]) -> list[Any]:
+        """Run one batch on the engine chosen for the plan, within the query's concurrency cap."""
+        if plan.limiter is None:
+            plan.limiter = asyncio.Semaphore(plan.concurrency)
+        async with plan.limiter:
+            return await self._execute_job(plan, job, batch)
+
+    async def _execute_job(self, plan: _SearchPlan, job: _BatchJob, batch: list[Path]) -> list[Any]:
+        loop = asyncio.get_running_loop()
+        if self._choose_engine(plan.spec, plan.corpus_size) == "process":
+            pool = _PROCESS_POOLS.get(max(1, min(self.max_workers, os.cpu_count() or 1)))
+            try:
+                return await loop.run_in_executor(pool, _run_batch_in_process, plan.spec, job, [str(path) for path in batch])
+            except BrokenProcessPool as error:
+                logger.warning(f"Search worker processes failed ({error}); retrying batch on threads")
+                _PROCESS_POOLS.discard(pool)
+        return await loop.run_in_executor(self.executor, self._run_batch, plan.matchers, plan.check_content, job, batch)
+
+    def _plan_stream(
+        self,
+        directory: Path,
+        path_keywords: list[str],
+        content_keywords: list[str],
+        regex_mode: bool,
+        index: TrigramIndex | None,
+        workspace: SearchWorkspace | None,
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+        query: str = "",
+        file_filter: FileFilter | None = None,
+        max_depth: int | None = None,
+        order: str = "walk",
+        ignore_case: bool = False,
+        whole_word: bool = False,
+    ) -> _SearchPlan:
+        """Resolve the file source, matchers and index narrowing for a streaming search.
+
+        Raises:
+            ValueError: If ``query`` is malformed or combined with keyword lists, or ``order`` is unknown
+        """
+        check_search_order(order)
+        if query and (path_keywords or content_keywords):
+            raise ValueError("A find query cannot be combined with path or content keywords")
+        session = gitignore_matcher_for(directory).session() if respect_gitignore else None
+        ignore = session.entry_filter() if session is not None else None
+        if index is None and workspace is not None:
+            index = workspace.index
+
+        files: Iterator[Path]
+        if order != "walk":
+            # Ranking needs every candidate's mtime up front: from the workspace tree, or stat data gathered by the walk
+            stats = workspace.file_mtimes_under(directory, max_depth, file_filter) if workspace is not None else None
+            from_workspace = stats is not None
+            if stats is None:
+                stats = walk_mtimes(directory, ignore, max_depth, file_filter)
+            elif session is not None:
+                stats = [(file_path, mtime_ns) for file_path, mtime_ns in stats if not session.is_ignored(file_path)]
+            ranked = order_by_recency(stats, git_changed_files(directory) if order == "git" else None)
+            cached_files: list[Path] | None = ranked
+            files = iter(ranked)
+        else:
+            cached_files = workspace.files_under(directory, max_depth, file_filter) if workspace is not None else None
+            from_workspace = cached_files is not None
+            if cached_files is None:
+                files = self._iter_candidate_files(directory, ignore, max_depth, file_filter)
+            elif session is not None:
+                files = (file_path for file_path in cached_files if not session.is_ignored(file_path))
+            else:
+                files = iter(cached_files)
+
+        spec = _MatcherSpec(tuple(path_keywords), tuple(content_keywords), regex_mode, query, ignore_case, whole_word, self.regex_prefilter)
+        plan = _SearchPlan(
+            files=files,
+            spec=spec,
+            matchers=self._matchers_for(spec),
+            file_count=len(cached_files) if cached_files is not None else 0,
+            concurrency=self._concurrency(max_workers),
+        )
+
+        find_query = plan.matchers[4]
+        if find_query is not None:
+            content_query = find_query.index_query() if index is not None else None
+        else:
+            content_query = (
+                self._content_query(content_keywords, regex_mode, ignore_case) if index is not None and content_keywords and not path_keywords else None
+            )
+        if index is not None and content_query is not None:
+            plan.index = index
+            plan.snapshot = index.snapshot()
+            plan.candidates = index.candidate_ids(content_query)
+            plan.stat_of = workspace.cached_stat if workspace is not None and from_workspace else None
+        return plan
+
+    def _next_stream_batch(self, plan: _SearchPlan) -> list[Path] | None:
+        """Pull the next batch from the walker; None once the tree is exhausted."""
+        batch = list(itertools.islice(plan.files, plan.batch_size))
+        if not batch:
+            return None
+        plan.walked += len(batch)
+        if plan.index is None:
+            return batch
+        kept, stale = self._narrow_with_index(plan.index, batch, plan.candidates, plan.snapshot, plan.stat_of)
+        plan.stale.extend(stale)
+        return kept
+
+    async def iter_search(
+        self,
+        directory: Path,
+        path_keywords: list[str] | None = None,
+        content_keywords: list[str] | None = None,
+        regex_mode: bool = False,
+        max_results: int = 10000,
+        index: TrigramIndex | None = None,
+        index_save_interval: float = 30.0,
+        workspace: SearchWorkspace | None = None,
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+        query: str | None = None,
+        file_filter: FileFilter | None = None,
+        max_depth: int | None = None,
+        order: str = "walk",
+        ignore_case: bool = False,
+        whole_word: bool = False,
+    ) -> AsyncIterator[str]:
+        """Yield matching file paths as workers find them.
+
+        Walking and matching overlap: the walker feeds small batches to the pool
+        with a bounded number in flight, and both stop as soon as ``max_results``
+        matches have been yielded (or the consumer stops iterating). Matches are
+        yielded in completion order rather than walk order.
+
+        Args:
+            directory: Directory to search in
+            path_keywords: Keywords to match in file paths
+            content_keywords: Keywords to match in file content
+            regex_mode: Whether keywords are regex patterns
+            max_results: Stop after yielding this many matches
+            index: Trigram index used to skip files that cannot match content keywords
+            index_save_interval: Minimum seconds between index and classification cache writes
+            workspace: Watched workspace supplying cached file listings, stats and index
+            respect_gitignore: Skip files ignored by the repository's ``.gitignore`` files
+            max_workers: Cap on pool workers this query may occupy (defaults to the whole pool)
+            query: Boolean find query (see ``find_query``), used instead of keyword lists
+            file_filter: Size, modification time and extension conditions checked while walking, before files are opened
+            max_depth: Only search files at most this many levels below ``directory`` (1 searches ``directory`` only)
+            order: Candidate visiting order (see ``search_order``): ``walk``, ``recent`` or ``git``
+            ignore_case: Match keywords regardless of letter case
+            whole_word: Only match keywords not adjoined by letters, digits or underscores
 
-        path_automaton, path_regex, content_automaton, content_regex = self._prepare_matchers(
+        Yields:
+            Matching file paths
+        """
+        stream = self._stream(
+            directory,
+            path_keywords,
+            content_keywords,
+            regex_mode,
+            max_results,
+            index,
+            index_save_interval,
+            workspace,
+            _BatchJob(),
+            respect_gitignore,
+            max_workers,
+            query=query,
+            file_filter=file_filter,
+            max_depth=max_depth,
+            order=order,
+            ignore_case=ignore_case,
+            whole_word=whole_word,
+        )
+        async with contextlib.aclosing(stream):
+            async for match in stream:
+                yield match
+
+    async def iter_matches(
+        self,
+        directory: Path,
+        path_keywords: list[str] | None = None,
+        content_keywords: list[str] | None = None,
+        regex_mode: bool = False,
+        max_results: int = 10000,
+        context_lines: int = 2,
+        max_matches_per_file: int = 20,
+        index: TrigramIndex | None = None,
+        index_save_interval: float = 30.0,
+        workspace: SearchWorkspace | None = None,
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+        query: str | None = None,
+        file_filter: FileFilter | None = None,
+        max_depth: int | None = None,
+        order: str = "walk",
+        ignore_case: bool = False,
+        whole_word: bool = False,
+    ) -> AsyncIterator[FileMatches]:
+        """Yield matching files with match locations and context lines.
+
+        Behaves like ``iter_search`` (``max_results`` counts files), but content
+        matches are reported with line numbers, byte offsets and context taken
+        from the same matcher pass that decides whether the file matches.
+
+        Args:
+            directory: Directory to search in
+            path_keywords: Keywords to match in file paths
+            content_keywords: Keywords to match in file content
+            regex_mode: Whether keywords are regex patterns
+            max_results: Stop after yielding this many files
+            context_lines: Lines of context to collect around each match
+            max_matches_per_file: Maximum matches reported per file
+            index: Trigram index used to skip files that cannot match content keywords
+            index_save_interval: Minimum seconds between index and classification cache writes
+            workspace: Watched workspace supplying cached file listings, stats and index
+            respect_gitignore: Skip files ignored by the repository's ``.gitignore`` files
+            max_workers: Cap on pool workers this query may occupy (defaults to the whole pool)
+            query: Boolean find query (see ``find_query``), used instead of keyword lists
+            file_filter: Size, modification time and extension conditions checked while walking, before files are opened
+            max_depth: Only search files at most this many levels below ``directory`` (1 searches ``directory`` only)
+            order: Candidate visiting order (see ``search_order``): ``walk``, ``recent`` or ``git``
+            ignore_case: Match keywords regardless of letter case
+            whole_word: Only match keywords not adjoined by letters, digits or underscores
+
+        Yields:
+            Match locations per file
+        """
+        job = _BatchJob(locate=True, context_lines=context_lines, max_matches=max_matches_per_file)
+        stream = self._stream(
+            directory,
+            path_keywords,
+            content_keywords,
+            regex_mode,
+            max_results,
+            index,
+            index_save_interval,
+            workspace,
+            job,
+            respect_gitignore,
+            max_workers,
+            query=query,
+            file_filter=file_filter,
+            max_depth=max_depth,
+            order=order,
+            ignore_case=ignore_case,
+            whole_word=whole_word,
+        )
+        async with contextlib.aclosing(stream):
+            async for file_matches in stream:
+                yield file_matches
+
+    async def _stream(
+        self,
+        directory: Path,
+        path_keywords: list[str] | None,
+        content_keywords: list[str] | None,
+        regex_mode: bool,
+        max_results: int,
+        index: TrigramIndex | None,
+        index_save_interval: float,
+        workspace: SearchWorkspace | None,
+        job: _BatchJob,
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+        ordered: bool = False,
+        query: str | None = None,
+        file_filter: FileFilter | None = None,
+        max_depth: int | None = None,
+        order: str = "walk",
+        ignore_case: bool = False,
+        whole_word: bool = False,
+    ) -> AsyncGenerator[Any, None]:
+        """Run ``job`` over lazily walked batches, yielding results until ``max_results``.
+
+        At most twice the query's concurrency of batches are in flight, so the
+        walker never runs far ahead of matching. With ``ordered`` results are
+        yielded in walk order (batches finishing early wait for the ones before
+        them); otherwise in completion order. Ranked orders (``recent``, ``git``)
+        are always yielded in visiting order, so a limit keeps the top-ranked matches.
+        """
+        if max_results <= 0:
+            return
+        ordered = ordered or order != "walk"
+
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(
+            self.executor,
+            self._plan_stream,
+            directory,
             path_keywords or [],
             content_keywords or [],
             regex_mode,
+            index,
+            workspace,
+            respect_gitignore,
+            max_workers,
+            query or "",
+            file_filter,
+            max_depth,
+            order,
+            ignore_case,
+            whole_word,
         )
+        if query:
+            job = dataclasses.replace(job, directory=str(directory))
+        max_in_flight = plan.concurrency * 2
+        pending: deque[asyncio.Future[list[Any]]] = deque()
+        produced = 0
+        exhausted = False
 
-        batches = self._split_batches(all_files)
-        if not batches:
-            return []
-
-        loop = asyncio.get_event_loop()
-        tasks = [
-            loop.run_in_executor(
-                self.executor,
-                self._process_file_batch,
-                batch,
-                path_automaton,
-                path_regex,
-                content_automaton,
-                content_regex,
-                bool(content_keywords),
-            )
-            for batch in batches
-        ]
-
-        batch_results = await asyncio.gather(*tasks)
+        try:
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    batch = await loop.run_in_executor(self.executor, self._next_stream_batch, plan)
+                    if batch is None:
+                        exhausted = True
+                    elif batch:
+                        pending.append(asyncio.ensure_future(self._run_job(plan, job, batch)))
+                if not pending:
+                    return
 
-        return self._flatten_results(batch_results, max_results)
+                if ordered:
+                    await asyncio.wait([pending[0]])
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    done = [future for future in pending if future in finished]
+                    pending = deque(future for future in pending if future not in finished)
+                for future in done:
+                    for result in future.result():
+                        yield result
+                        produced += 1
+                        if produced >= max_results:
+                            return
+                    # The limit was not reached by this batch, so walk further ahead with larger batches
+                    plan.batch_size = min(plan.batch_size * 2, STREAM_MAX_BATCH_SIZE)
+        finally:
+            for future in pending:
+                future.cancel()
+            self._schedule_cache_saves(plan.index, plan.stale, index_save_interval)
 
     def close(self) -> None:
-        """Clean up the thread pool."""
+        """Clean up the thread pool (shared worker processes stay alive for reuse)."""
         self.executor.shutdown(wait=False)
+
+
+class _SearcherRegistry:
+    """Hold the long-lived searcher owned by the running server."""
+
+    def __init__(self) -> None:
+        self._searcher: FastFileSearcher | None = None
+        self._lock = threading.Lock()
+
+    def register(self, searcher: FastFileSearcher) -> None:
+        with self._lock:
+            self._searcher = searcher
+
+    def unregister(self, searcher: FastFileSearcher) -> None:
+        with self._lock:
+            if self._searcher is searcher:
+                self._searcher = None
+
+    def get(self) -> FastFileSearcher | None:
+        with self._lock:
+            return self._searcher
+
+
+_SEARCHER_REGISTRY = _SearcherRegistry()
+
+
+def register_searcher(searcher: FastFileSearcher) -> None:
+    """Make ``searcher`` the shared engine used by the search tools."""
+    _SEARCHER_REGISTRY.register(searcher)
+
+
+def unregister_searcher(searcher: FastFileSearcher) -> None:
+    """Remove ``searcher`` from the registry if it is still the shared one."""
+    _SEARCHER_REGISTRY.unregister(searcher)
+
+
+def get_searcher() -> FastFileSearcher | None:
+    """Return the shared searcher, if a server registered one."""
+    return _SEARCHER_REGISTRY.get()
+
+
+_WORKER_SEARCHER: FastFileSearcher | None = None
+
+
+def _worker_searcher() -> FastFileSearcher:
+    """Return the searcher used inside a worker process."""
+    global _WORKER_SEARCHER
+    if _WORKER_SEARCHER is None:
+        _WORKER_SEARCHER = FastFileSearcher(max_workers=1)
+    return _WORKER_SEARCHER
+
+
+def _run_batch_in_process(spec: _MatcherSpec, job: _BatchJob, files: list[str]) -> list[Any]:
+    """Worker process entry point for one batch; matchers are compiled once per process."""
+    searcher = _worker_searcher()
+    matchers = searcher._matchers_for(spec)
+    return searcher._run_batch(matchers, bool(spec.content_keywords), job, [Path(file) for file in files])
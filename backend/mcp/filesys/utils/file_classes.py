@@ -0,0 +1,216 @@
+"""Cached binary/text classification of files.
+
+A file is classified as text by opening it and sniffing its first bytes. The
+result is cached under ``(st_dev, st_ino, st_size, st_mtime_ns)``: a file that
+has not changed keeps its key and is classified by a single ``stat``, while any
+write changes the size or modification time and so misses the cache. The
+cache is shared by the process and persisted next to the trigram indexes, so
+a restarted server does not re-sniff an unchanged tree either.
+
+Common binary formats are recognised by their leading signature before the
+sample is scanned for NUL bytes or trial-decoded as UTF-8.
+"""
+
+import codecs
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from files.backend.config.loader import files_config
+from loguru import logger
+
+CLASS_CACHE_FORMAT_VERSION = 1
+
+# Bytes read from the start of a file to classify it
+SNIFF_SIZE = 8192
+
+# Leading bytes of binary formats that need no further inspection
+BINARY_SIGNATURES: tuple[bytes, ...] = (
+    b"\x7fELF",  # ELF executables and shared objects
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"PK\x03\x04",  # ZIP (and jar, docx, xlsx, wheel, ...)
+    b"PK\x05\x06",  # Empty ZIP
+    b"PK\x07\x08",  # Spanned ZIP
+    b"%PDF-",  # PDF
+    b"GIF87a",
+    b"GIF89a",
+    b"\xff\xd8\xff",  # JPEG
+    b"\x1f\x8b",  # gzip
+)
+
+# Cache key: (st_dev, st_ino, st_size, st_mtime_ns)
+ClassKey = tuple[int, int, int, int]
+
+
+def has_binary_signature(head: bytes) -> bool:
+    """Return whether ``head`` starts with the signature of a known binary format."""
+    return head.startswith(BINARY_SIGNATURES)
+
+
+def classify_head(head: bytes, complete: bool) -> bool:
+    """Return whether a file starting with ``head`` looks like text.
+
+    Args:
+        head: First bytes of the file (up to ``SNIFF_SIZE``)
+        complete: Whether ``head`` is the whole file; otherwise a UTF-8
+            character cut off at the end of the sample is not an error
+
+    Returns:
+        True if the content appears to be text, False if binary
+    """
+    if not head:
+        return True
+    if has_binary_signature(head) or b"\x00" in head:
+        return False
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=complete)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_is_text(path: Path) -> bool:
+    """Classify ``path`` by reading its first ``SNIFF_SIZE`` bytes (no caching).
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with path.open("rb") as handle:
+        head = handle.read(SNIFF_SIZE)
+        complete = len(head) < SNIFF_SIZE or not handle.read(1)
+    return classify_head(head, complete)
+
+
+def class_key(stat_result: os.stat_result) -> ClassKey:
+    """Return the cache key identifying one version of a file."""
+    return stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+class FileClassCache:
+    """Text/binary classifications keyed by file identity and version."""
+
+    def __init__(self, cache_path: Path | None = None, max_entries: int = 200_000) -> None:
+        """Initialise the cache and load any persisted state.
+
+        Args:
+            cache_path: File the cache is persisted to, or None to keep it in memory
+            max_entries: Oldest classifications are dropped beyond this many
+        """
+        self.cache_path = cache_path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[ClassKey, bool] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = float("-inf")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether in-memory classifications differ from the persisted cache."""
+        return self._dirty
+
+    def is_text(self, path: Path, stat_result: os.stat_result | None = None) -> bool:
+        """Return whether ``path`` looks like text, sniffing it only when unknown.
+
+        Args:
+            path: File to classify
+            stat_result: ``path.stat()`` if the caller already has it
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read
+        """
+        key = class_key(stat_result if stat_result is not None else path.stat())
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = sniff_is_text(path)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._dirty = True
+        return result
+
+    def clear(self) -> None:
+        """Forget every classification."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def save_if_due(self, min_interval: float) -> None:
+        """Persist new classifications unless the cache was written recently."""
+        if self._dirty and time.monotonic() - self._last_save >= min_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Persist the cache atomically if it has unsaved changes."""
+        if self.cache_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._last_save = time.monotonic()
+            keys = np.array(list(self._entries), dtype=np.uint64).reshape(-1, 4)
+            texts = np.fromiter(self._entries.values(), dtype=np.bool_, count=len(self._entries))
+            self._dirty = False
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+            with tmp_path.open("wb") as handle:
+                np.savez(handle, version=np.array([CLASS_CACHE_FORMAT_VERSION]), keys=keys, texts=texts)
+            tmp_path.replace(self.cache_path)
+        except OSError as error:
+            logger.warning(f"Unable to persist file classification cache {self.cache_path}: {error}")
+            with self._lock:
+                self._dirty = True
+
+    def _load(self) -> None:
+        """Load persisted classifications, discarding them when unreadable or incompatible."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if int(data["version"][0]) != CLASS_CACHE_FORMAT_VERSION:
+                    logger.info(f"Discarding incompatible file classification cache {self.cache_path}")
+                    return
+                keys = data["keys"].reshape(-1, 4).tolist()
+                texts = data["texts"].tolist()
+        except (OSError, ValueError, KeyError, IndexError) as error:
+            logger.warning(f"Discarding unreadable file classification cache {self.cache_path}: {error}")
+            return
+        self._entries = {tuple(key): bool(text) for key, text in zip(keys[-self.max_entries :], texts[-self.max_entries :], strict=True)}
+
+
+_SHARED_CACHE: FileClassCache | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def file_class_cache() -> FileClassCache:
+    """Return the process-wide classification cache, loading it on first use."""
+    global _SHARED_CACHE
+    with _SHARED_LOCK:
+        if _SHARED_CACHE is None:
+            config = files_config.get_search_classes_config()
+            cache_path = Path(files_config.get_search_index_config()["cache_dir"]) / "file-classes.npz" if config["persist"] else None
+            _SHARED_CACHE = FileClassCache(cache_path, int(config["max_entries"]))
+        return _SHARED_CACHE
+
+
+def save_file_class_cache() -> None:
+    """Persist the process-wide cache if it has been loaded."""
+    with _SHARED_LOCK:
+        cache = _SHARED_CACHE
+    if cache is not None:
+        cache.save()
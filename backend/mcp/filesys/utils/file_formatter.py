@@ -1,5 +1,7 @@
 """Enhanced file content formatter with line numbers and better display."""
 
+from files.backend.mcp.filesys.utils.content_matches import FileMatches
+
 
 class FileFormatter:
     """Format file content for better readability in MCP responses."""
@@ -72,42 +74,33 @@ class FileFormatter:
         return "\n".join(formatted)
 
     @staticmethod
-    def format_search_results(file_path: str, content: str, search_term: str, context_lines: int = 2) -> str:
-        """Format search results with context.
+    def format_search_results(file_matches: FileMatches) -> str:
+        """Format located matches with their context.
+
+        Overlapping context windows are merged, every matching line is marked,
+        and gaps between windows are shown as ``...``.
 
         Args:
-            file_path: Path to the file
-            content: File content
-            search_term: Term that was searched
-            context_lines: Number of context lines to show
+            file_matches: Matches and context lines collected for one file
 
         Returns:
             Formatted search results with context
         """
-        lines = content.split("\n")
-        results = []
-        results.append(f"=== {file_path} ===")
-
-        for i, line in enumerate(lines):
-            if search_term.lower() in line.lower():
-                # Show context
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-
-                if start > 0:
-                    results.append("  ...")
-
-                for j in range(start, end):
-                    line_num = j + 1
-                    if j == i:
-                        # Highlight the matching line
-                        results.append(f"> {line_num:4} | {lines[j]}")
-                    else:
-                        results.append(f"  {line_num:4} | {lines[j]}")
-
-                if end < len(lines):
-                    results.append("  ...")
-
-                results.append("")  # Empty line between matches
-
+        results = [f"=== {file_matches.path} ==="]
+        numbers = sorted(file_matches.context)
+        if not numbers:
+            return results[0]
+
+        match_lines = {match.line for match in file_matches.matches}
+        padding = max(4, len(str(numbers[-1])))
+        previous = 0
+        for line_num in numbers:
+            if line_num != previous + 1:
+                results.append("  ...")
+            marker = ">" if line_num in match_lines else " "
+            results.append(f"{marker} {line_num:{padding}} | {file_matches.context[line_num]}")
+            previous = line_num
+
+        if file_matches.truncated:
+            results.append(f"  ... (showing first {len(file_matches.matches)} matches)")
         return "\n".join(results)
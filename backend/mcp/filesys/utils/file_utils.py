@@ -12,6 +12,8 @@ from pathlib import Path
 from quopri import decodestring, encodestring
 
 from files.backend.config.loader import files_config
+from files.backend.mcp.filesys.utils.file_classes import file_class_cache
+from files.backend.mcp.filesys.utils.tree_walker import EntryFilter, FileFilter, walk_files
 from loguru import logger
 
 
@@ -161,26 +163,10 @@ class FileUtils:
         Returns:
             True if file appears to be text, False if binary
         """
-        if not file_path.exists():
-            return True  # Assume new files are text
-
         try:
-            # Read first 8192 bytes to check if it's text
-            with Path(file_path).open("rb") as f:
-                chunk = f.read(8192)
-                if not chunk:
-                    return True
-
-                # Check for null bytes (common in binary files)
-                if b"\x00" in chunk:
-                    return False
-
-                # Try to decode as UTF-8
-                try:
-                    chunk.decode("utf-8")
-                    return True
-                except UnicodeDecodeError:
-                    return False
+            return file_class_cache().is_text(file_path)
+        except FileNotFoundError:
+            return True  # Assume new files are text
         except OSError as e:
             logger.warning(f"Error checking if file is text: {e}")
             return True  # Default to text if unsure
@@ -448,6 +434,9 @@ class FileUtils:
         content_keywords: list[str] | None = None,
         regex_mode: bool = False,
         max_results: int = 1000,
+        ignore: EntryFilter | None = None,
+        max_depth: int | None = None,
+        file_filter: FileFilter | None = None,
     ) -> list[str]:
         """Find files matching keywords in path or content."""
 
@@ -457,11 +446,10 @@ class FileUtils:
         content_matcher = FileUtils._make_content_matcher(content_keywords, regex_mode)
 
         results: list[str] = []
-        for file_path in directory_path.rglob("*"):
+        for entry in walk_files(directory_path, ignore=ignore, max_depth=max_depth, file_filter=file_filter):
             if len(results) >= max_results:
                 break
-            if not file_path.is_file():
-                continue
+            file_path = Path(entry.path)
 
             path_match = path_matcher(file_path) if path_matcher else False
             content_match = False
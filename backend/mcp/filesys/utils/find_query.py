@@ -0,0 +1,363 @@
+"""Boolean find queries over file paths and content.
+
+A query combines predicates with ``AND``, ``OR``, ``NOT`` and parentheses;
+adjacent terms are joined by ``AND``::
+
+    content:"TODO" AND NOT path:tests/ AND ext:py
+
+Predicates:
+
+- ``path:TEXT``: substring of the path relative to the searched directory
+- ``name:GLOB``: glob matched against the file name (case-sensitive)
+- ``ext:EXT``: file extension, case-insensitive, with or without the dot
+- ``content:TEXT``: literal text in the file content
+- ``regex:PATTERN``: regular expression searched in the file content
+
+Values are bare words or double-quoted strings (where ``\\"`` and ``\\\\``
+escape); values containing spaces or parentheses must be quoted. Operators are
+case-insensitive.
+
+Compiling a query orders the operands of every ``AND``/``OR`` so that path
+predicates run before content predicates, and evaluation uses three-valued
+logic: a file is decided from its path alone whenever possible. Otherwise its
+content is read once, every literal predicate is checked in the same pass, and
+regexes run only as far as the expression still needs them.
+"""
+
+import fnmatch
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import ahocorasick
+import regex
+from files.backend.mcp.filesys.utils.byte_search import Content, LiteralSet, decode_content, open_content
+from files.backend.mcp.filesys.utils.regex_literals import RequiredLiterals, extract_required_literals
+from files.backend.mcp.filesys.utils.regex_set import AUTOMATON_MIN_LITERALS, RegexSet
+
+PATH_FIELDS = frozenset({"path", "name", "ext"})
+CONTENT_FIELDS = frozenset({"content", "regex"})
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<open>\()
+        | (?P<close>\))
+        | (?P<field>[A-Za-z]+):(?:"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<bare>[^\s()"]+))
+        | (?P<word>[^\s()]+)
+    )""",
+    re.VERBOSE,
+)
+_ESCAPE = re.compile(r'\\([\\"])')
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """A single ``field:value`` test."""
+
+    field: str
+    value: str
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of an expression."""
+
+    operand: "QueryNode"
+
+
+@dataclass(frozen=True)
+class And:
+    """Conjunction of expressions."""
+
+    operands: tuple["QueryNode", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    """Disjunction of expressions."""
+
+    operands: tuple["QueryNode", ...]
+
+
+QueryNode = Predicate | Not | And | Or
+
+
+def parse_query(text: str) -> QueryNode:
+    """Parse query ``text`` into an expression tree.
+
+    Raises:
+        ValueError: If the query is empty or malformed
+    """
+    parser = _Parser(text)
+    node = parser.expression()
+    if parser.peek() is not None:
+        raise parser.error("unexpected token")
+    return node
+
+
+class _Parser:
+    """Recursive-descent parser: ``or := and (OR and)*``, ``and := not (AND? not)*``, ``not := NOT not | atom``."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens: list[tuple[str, str, int]] = []
+        position = 0
+        while text[position:].strip():
+            found = _TOKEN.match(text, position)
+            if found is None:
+                raise ValueError(f"Invalid find query at position {position}: {text!r}")
+            kind = found.lastgroup or ""
+            if kind == "open" or kind == "close":
+                self.tokens.append((kind, "", found.start(kind)))
+            elif kind == "word":
+                self.tokens.append(("word", found.group("word"), found.start("word")))
+            else:
+                field = found.group("field").lower()
+                if field not in PATH_FIELDS | CONTENT_FIELDS:
+                    raise ValueError(f"Unknown find query field {field!r}; expected one of {', '.join(sorted(PATH_FIELDS | CONTENT_FIELDS))}")
+                quoted = found.group("quoted")
+                value = _ESCAPE.sub(r"\1", quoted) if quoted is not None else found.group("bare")
+                self.tokens.append(("predicate", f"{field}:{value}", found.start("field")))
+            position = found.end()
+        self.position = 0
+
+    def peek(self) -> tuple[str, str, int] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def error(self, message: str) -> ValueError:
+        token = self.peek()
+        where = f"position {token[2]}" if token is not None else "end of query"
+        return ValueError(f"Invalid find query ({message} at {where}): {self.text!r}")
+
+    def operator(self, name: str) -> bool:
+        token = self.peek()
+        if token is not None and token[0] == "word" and token[1].upper() == name:
+            self.position += 1
+            return True
+        return False
+
+    def expression(self) -> QueryNode:
+        operands = [self.conjunction()]
+        while self.operator("OR"):
+            operands.append(self.conjunction())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def conjunction(self) -> QueryNode:
+        operands = [self.negation()]
+        while True:
+            token = self.peek()
+            if self.operator("AND") or (token is not None and token[0] != "close" and not (token[0] == "word" and token[1].upper() == "OR")):
+                operands.append(self.negation())
+            else:
+                break
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def negation(self) -> QueryNode:
+        if self.operator("NOT"):
+            return Not(self.negation())
+        token = self.peek()
+        if token is None:
+            raise self.error("expected a predicate")
+        self.position += 1
+        if token[0] == "open":
+            node = self.expression()
+            closing = self.peek()
+            if closing is None or closing[0] != "close":
+                raise self.error("expected ')'")
+            self.position += 1
+            return node
+        if token[0] == "predicate":
+            field, _, value = token[1].partition(":")
+            return Predicate(field, value)
+        self.position -= 1
+        raise self.error("expected field:value")
+
+
+def _cost(node: QueryNode) -> int:
+    """Relative cost of evaluating ``node``: path tests, then content literals, then regexes."""
+    if isinstance(node, Predicate):
+        return 0 if node.field in PATH_FIELDS else 1 if node.field == "content" else 2
+    if isinstance(node, Not):
+        return _cost(node.operand)
+    return max(_cost(operand) for operand in node.operands)
+
+
+def _order(node: QueryNode) -> QueryNode:
+    """Sort the operands of every AND/OR cheapest first (evaluation is short-circuited)."""
+    if isinstance(node, Not):
+        return Not(_order(node.operand))
+    if isinstance(node, And | Or):
+        return type(node)(tuple(sorted((_order(operand) for operand in node.operands), key=_cost)))
+    return node
+
+
+def _predicates(node: QueryNode, negated: bool = False) -> Iterator[tuple[Predicate, bool]]:
+    """Yield every predicate with whether it appears under an odd number of NOTs."""
+    if isinstance(node, Predicate):
+        yield node, negated
+    elif isinstance(node, Not):
+        yield from _predicates(node.operand, not negated)
+    else:
+        for operand in node.operands:
+            yield from _predicates(operand, negated)
+
+
+class _FileState:
+    """Per-file evaluation state; content predicates stay unknown until content is loaded."""
+
+    def __init__(self, relative: str) -> None:
+        self.relative = relative
+        self.name = relative.rpartition("/")[2]
+        self.content: Content | None = None
+        self.binary = False
+        self.found_literals: set[str] | None = None
+        self.text: str | None = None
+
+
+class FindQuery:
+    """A parsed query compiled for evaluation against files."""
+
+    def __init__(self, text: str, build_automaton: Callable[[list[str]], ahocorasick.Automaton], regex_flags: int) -> None:
+        """Parse and compile ``text``.
+
+        Args:
+            text: Query text
+            build_automaton: Builds an automaton with ``(index, keyword)`` values
+            regex_flags: Flags ``regex:`` patterns are compiled with
+
+        Raises:
+            ValueError: If the query is malformed or a regex does not compile
+        """
+        self.text = text
+        self.root = _order(parse_query(text))
+        self.regex_flags = regex_flags
+        predicates = list(_predicates(self.root))
+        self.needs_content = any(predicate.field in CONTENT_FIELDS for predicate, _negated in predicates)
+
+        self._literals = list(dict.fromkeys(predicate.value for predicate, _negated in predicates if predicate.field == "content" and predicate.value))
+        self._needles = [literal.encode("utf-8") for literal in self._literals]
+        self._literal_automaton = (
+            build_automaton([needle.decode("latin-1") for needle in self._needles]) if len(self._needles) >= AUTOMATON_MIN_LITERALS else None
+        )
+        self._regexes: dict[str, regex.Pattern] = {}
+        for predicate, _negated in predicates:
+            if predicate.field == "regex" and predicate.value not in self._regexes:
+                try:
+                    self._regexes[predicate.value] = regex.compile(predicate.value, regex_flags)
+                except regex.error as error:
+                    raise ValueError(f"Invalid regex in find query {predicate.value!r}: {error}") from error
+
+        # Terms reported as match locations: the content predicates a match satisfies
+        positive = [predicate for predicate, negated in predicates if not negated]
+        literals = list(dict.fromkeys(predicate.value for predicate in positive if predicate.field == "content" and predicate.value))
+        patterns = list(dict.fromkeys(self._regexes[predicate.value] for predicate in positive if predicate.field == "regex"))
+        self.locate_literals = LiteralSet(literals, build_automaton) if literals else None
+        self.locate_regexes = RegexSet(patterns) if patterns else None
+
+    def matches(self, file_path: Path, relative: str, is_text: Callable[[Path], bool]) -> bool:
+        """Return whether a file satisfies the query.
+
+        Args:
+            file_path: File to test
+            relative: Its POSIX path relative to the searched directory
+            is_text: Classifier deciding whether content predicates can hold (binary files never match them)
+        """
+        state = _FileState(relative)
+        decided = self._evaluate(self.root, state)
+        if decided is not None:
+            return decided
+        if not is_text(file_path):
+            state.binary = True
+            return bool(self._evaluate(self.root, state))
+        try:
+            with open_content(file_path) as data:
+                state.content = data
+                try:
+                    return bool(self._evaluate(self.root, state))
+                finally:
+                    state.content = None
+        except (OSError, ValueError):
+            return False
+
+    def index_query(self) -> list[RequiredLiterals] | None:
+        """Describe the content every matching file must contain, for trigram index narrowing.
+
+        Returns:
+            Requirements of which any one must hold, or None when matches need no particular content
+        """
+        return self._requirements(self.root)
+
+    def _requirements(self, node: QueryNode) -> list[RequiredLiterals] | None:
+        if isinstance(node, Predicate):
+            if node.field == "content":
+                return [RequiredLiterals((frozenset({node.value}),))] if node.value else None
+            if node.field == "regex":
+                required = extract_required_literals(node.value, self.regex_flags)
+                return [required] if required is not None and required.clauses else None
+            return None
+        if isinstance(node, Not):
+            return None
+        parts = [self._requirements(operand) for operand in node.operands]
+        if isinstance(node, Or):
+            if any(part is None for part in parts):
+                return None
+            return [required for part in parts if part is not None for required in part]
+        constrained = [part for part in parts if part is not None]
+        if not constrained:
+            return None
+        # Conjoin single requirements with the same case handling; otherwise any one conjunct suffices
+        singles = [part[0] for part in constrained if len(part) == 1 and not part[0].ignore_case]
+        if len(singles) > 1:
+            return [RequiredLiterals(tuple(clause for required in singles for clause in required.clauses))]
+        return constrained[0]
+
+    def _evaluate(self, node: QueryNode, state: _FileState) -> bool | None:
+        """Evaluate with three-valued logic; None means content is needed to decide."""
+        if isinstance(node, Predicate):
+            return self._test(node, state)
+        if isinstance(node, Not):
+            result = self._evaluate(node.operand, state)
+            return None if result is None else not result
+        short_circuit = isinstance(node, Or)
+        unknown = False
+        for operand in node.operands:
+            result = self._evaluate(operand, state)
+            if result is None:
+                unknown = True
+            elif result == short_circuit:
+                return short_circuit
+        return None if unknown else not short_circuit
+
+    def _test(self, predicate: Predicate, state: _FileState) -> bool | None:
+        field, value = predicate.field, predicate.value
+        if field == "path":
+            return value in state.relative
+        if field == "name":
+            return fnmatch.fnmatchcase(state.name, value)
+        if field == "ext":
+            return state.name.lower().endswith("." + value.lower().lstrip("."))
+        content = state.content
+        if state.binary:
+            return False
+        if content is None:
+            return None
+        if field == "content":
+            return not value or value in self._found_literals(state, content)
+        if state.text is None:
+            state.text = decode_content(content)
+        return self._regexes[value].search(state.text) is not None
+
+    def _found_literals(self, state: _FileState, data: Content) -> set[str]:
+        """Find every content literal present in the file in one pass."""
+        if state.found_literals is None:
+            if self._literal_automaton is None:
+                state.found_literals = {literal for literal, needle in zip(self._literals, self._needles, strict=True) if data.find(needle) != -1}
+            else:
+                found: set[str] = set()
+                for _end, (index, _needle) in self._literal_automaton.iter(str(data, "latin-1")):
+                    found.add(self._literals[index])
+                    if len(found) == len(self._literals):
+                        break
+                state.found_literals = found
+        return state.found_literals
@@ -0,0 +1,314 @@
+"""Fuzzy, ranked path search over an in-memory path index.
+
+A query matches a path when its characters occur in the path in order
+(case-insensitively), as in fzf. Matches are ranked with fzf-style scoring:
+every matched character scores, characters at the start of a path component or
+word (after ``/``, ``_``, ``-``, ``.`` or a camelCase hump) earn a boundary
+bonus, runs of consecutive characters keep the bonus of the run's first
+character, and gaps between matched characters are penalised. Matches that fit
+entirely in the basename get an extra bonus, so ``srchws`` ranks
+``utils/search_workspace.py`` above a path that only matches across directories.
+
+The index keeps 64-bit character-set masks per path in numpy arrays (for the
+whole path, for the basename, and for the characters that start a word), so a
+query discards every path lacking one of its characters in one vectorised pass
+and only scores the survivors. Basename matches are scored first; paths that
+only match across directories are considered when there are fewer than
+``limit`` basename matches. Very broad queries (a few common characters) are
+bounded by ``SCORE_BUDGET``: candidates are scored in order of how many query
+characters start a word in them, then by length, which keeps the best matches
+in the budget without scoring hundreds of thousands of paths.
+"""
+
+import heapq
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_PATH_SEPARATOR = 9
+BONUS_BOUNDARY = 8
+BONUS_CAMEL = 7
+BONUS_CONSECUTIVE = 4
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+BONUS_BASENAME = 16
+
+# Matches returned when the caller sets no limit
+DEFAULT_LIMIT = 20
+
+# Most candidates scored per tier; beyond this, the most promising candidates are scored
+SCORE_BUDGET = 8192
+
+_WORD_DELIMITERS = frozenset("_-. ")
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A path ranked against a fuzzy query."""
+
+    path: str
+    score: int
+    positions: tuple[int, ...]
+
+    def to_dict(self) -> dict[str, object]:
+        return {"path": self.path, "score": self.score, "positions": list(self.positions)}
+
+
+def _byte_bit(byte: int) -> int:
+    """Map a lower-cased UTF-8 byte to one of 64 mask bits."""
+    if 97 <= byte <= 122:
+        return byte - 97
+    if 48 <= byte <= 57:
+        return byte - 48 + 26
+    return 36 + byte % 28
+
+
+# Mask bit per byte of lower-cased text; newline separates paths and sets no bit
+_BYTE_BITS = np.array([0 if byte == 10 else 1 << _byte_bit(byte) for byte in range(256)], dtype=np.uint64)
+
+# Mask bit per byte of original text, folding ASCII upper case onto lower case
+_FOLDED_BYTE_BITS = _BYTE_BITS[[byte + 32 if 65 <= byte <= 90 else byte for byte in range(256)]]
+
+_DELIMITER_BYTES = np.array([byte in b"/_-. \n" for byte in range(256)])
+
+# Paths whose masks are computed per vectorised pass (bounds temporary memory)
+_MASK_CHUNK = 65536
+
+
+def char_mask(text: str) -> int:
+    """Return the character-set mask of lower-cased ``text``."""
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return int(np.bitwise_or.reduce(_BYTE_BITS[data])) if data.size else 0
+
+
+def path_masks(paths: list[str]) -> np.ndarray:
+    """Return ``(path, basename, word-start)`` masks for each path as a ``(3, n)`` array.
+
+    The word-start mask holds the characters that earn a boundary bonus: the
+    first character of every component and word, camelCase humps and the
+    first digit of a number.
+    """
+    result = np.zeros((3, len(paths)), dtype=np.uint64)
+    for offset in range(0, len(paths), _MASK_CHUNK):
+        chunk = [path.replace("\n", " ") for path in paths[offset : offset + _MASK_CHUNK]]
+        lowered = np.frombuffer("\n".join(chunk).lower().encode("utf-8"), dtype=np.uint8)
+        starts = _segment_starts(lowered)
+        result[0, offset : offset + len(chunk)] = np.bitwise_or.reduceat(_BYTE_BITS[lowered], starts)
+
+        # Interleave basename starts with path starts and keep the basename segments
+        separators = np.where((lowered == 47) | (lowered == 10), np.arange(1, lowered.size + 1), 0)
+        after_separator = np.maximum.accumulate(separators)
+        ends = np.append(starts[1:] - 1, lowered.size)
+        base_starts = np.maximum(after_separator[ends - 1], starts)
+        bounds = np.empty(2 * starts.size, dtype=np.int64)
+        bounds[0::2] = base_starts
+        bounds[1::2] = np.append(starts[1:], lowered.size - 1)
+        result[1, offset : offset + len(chunk)] = np.bitwise_or.reduceat(np.append(_BYTE_BITS[lowered], np.uint64(0)), bounds)[0::2]
+
+        original = np.frombuffer("\n".join(chunk).encode("utf-8"), dtype=np.uint8)
+        previous = np.concatenate(([10], original[:-1]))
+        digit = (original >= 48) & (original <= 57)
+        word_start = (
+            (_DELIMITER_BYTES[previous] & ~_DELIMITER_BYTES[original])
+            | ((original >= 65) & (original <= 90))
+            | (digit & ~((previous >= 48) & (previous <= 57)))
+        )
+        bits = np.where(word_start, _FOLDED_BYTE_BITS[original], np.uint64(0))
+        result[2, offset : offset + len(chunk)] = np.bitwise_or.reduceat(bits, _segment_starts(original))
+    return result
+
+
+def _segment_starts(data: np.ndarray) -> np.ndarray:
+    """Offsets where each newline-separated path begins."""
+    return np.concatenate(([0], np.flatnonzero(data == 10) + 1))
+
+
+def _position_bonus(text: str, index: int) -> int:
+    """Bonus for a match at ``text[index]`` by what precedes it."""
+    if index == 0:
+        return BONUS_PATH_SEPARATOR
+    previous = text[index - 1]
+    if previous == "/":
+        return BONUS_PATH_SEPARATOR
+    if previous in _WORD_DELIMITERS:
+        return BONUS_BOUNDARY
+    current = text[index]
+    if (previous.islower() and current.isupper()) or (current.isdigit() and not previous.isdigit()):
+        return BONUS_CAMEL
+    return 0
+
+
+def _tight_positions(lowered: str, query: str, start: int) -> list[int] | None:
+    """Find the shortest window after ``start`` holding ``query`` in order (fzf v1).
+
+    A forward scan finds where the earliest match ends; a backward scan from
+    there pulls every earlier character as far right as possible.
+    """
+    end = start - 1
+    for char in query:
+        end = lowered.find(char, end + 1)
+        if end < 0:
+            return None
+    positions = [end]
+    cursor = end
+    for char in reversed(query[:-1]):
+        cursor = lowered.rfind(char, start, cursor)
+        positions.append(cursor)
+    positions.reverse()
+    return positions
+
+
+def _score_positions(text: str, positions: list[int]) -> int:
+    score = 0
+    previous = -2
+    run_bonus = 0
+    for order, index in enumerate(positions):
+        bonus = _position_bonus(text, index)
+        if index == previous + 1:
+            run_bonus = max(run_bonus, bonus, BONUS_CONSECUTIVE)
+            bonus = run_bonus
+        else:
+            if order:
+                score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (index - previous - 2)
+            run_bonus = bonus
+        if order == 0:
+            bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+        score += SCORE_MATCH + bonus
+        previous = index
+    return score
+
+
+def fuzzy_score(path: str, query: str, basename_only: bool = False) -> tuple[int, list[int]] | None:
+    """Score ``path`` against a lower-cased ``query``.
+
+    Args:
+        path: Path to score
+        query: Lower-cased query
+        basename_only: Only accept matches that lie entirely in the basename
+
+    Returns:
+        ``(score, positions)``, or None when the query is not a subsequence of the path
+    """
+    lowered = path.lower()
+    base_start = path.rfind("/") + 1
+    positions = _tight_positions(lowered, query, base_start)
+    if positions is not None:
+        return _score_positions(path, positions) + BONUS_BASENAME, positions
+    if basename_only:
+        return None
+    positions = _tight_positions(lowered, query, 0)
+    if positions is None:
+        return None
+    return _score_positions(path, positions), positions
+
+
+def rank_paths(paths: Iterable[str], query: str, limit: int, basename_only: bool = False) -> list[FuzzyMatch]:
+    """Return the ``limit`` best fuzzy matches of ``query`` among ``paths``.
+
+    Ties are broken by shorter path, then alphabetically.
+    """
+    query = query.lower()
+    if not query or limit <= 0:
+        return []
+    scored = []
+    for path in paths:
+        result = fuzzy_score(path, query, basename_only)
+        if result is not None:
+            scored.append((-result[0], len(path), path, result[1]))
+    return [FuzzyMatch(path, -negative, tuple(positions)) for negative, _length, path, positions in heapq.nsmallest(limit, scored)]
+
+
+class FuzzyPathIndex:
+    """Root-relative paths with character-set masks, updated incrementally."""
+
+    def __init__(self, paths: Iterable[str] = ()) -> None:
+        """Build the index from root-relative POSIX paths."""
+        self._paths: list[str | None] = []
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        # Per slot: [path mask, basename mask, word-start mask, length]
+        self._columns = np.zeros((4, 1024), dtype=np.uint64)
+        self._lock = threading.Lock()
+        self.add(paths)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._slots
+
+    def add(self, paths: Iterable[str]) -> None:
+        """Insert paths that are not indexed yet."""
+        with self._lock:
+            slots: list[int] = []
+            added: list[str] = []
+            for path in paths:
+                if path in self._slots:
+                    continue
+                if self._free:
+                    slot = self._free.pop()
+                    self._paths[slot] = path
+                else:
+                    slot = len(self._paths)
+                    self._paths.append(path)
+                self._slots[path] = slot
+                slots.append(slot)
+                added.append(path)
+            if not added:
+                return
+            capacity = self._columns.shape[1]
+            if len(self._paths) > capacity:
+                grown = np.zeros((self._columns.shape[0], max(len(self._paths), 2 * capacity)), dtype=np.uint64)
+                grown[:, :capacity] = self._columns
+                self._columns = grown
+            self._columns[:3, slots] = path_masks(added)
+            self._columns[3, slots] = [len(path) for path in added]
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """Drop indexed paths; unknown paths are ignored."""
+        with self._lock:
+            for path in paths:
+                slot = self._slots.pop(path, None)
+                if slot is None:
+                    continue
+                self._paths[slot] = None
+                self._columns[:, slot] = 0
+                self._free.append(slot)
+
+    def search(self, query: str, limit: int = 20, prefix: str = "") -> list[FuzzyMatch]:
+        """Return the ``limit`` best matches of ``query`` among indexed paths.
+
+        Args:
+            query: Characters to match in order, case-insensitively
+            limit: Number of ranked matches to return
+            prefix: Only consider paths below this root-relative directory (with trailing ``/``)
+        """
+        lowered = query.lower()
+        if not lowered or limit <= 0:
+            return []
+        wanted = np.uint64(char_mask(lowered))
+        with self._lock:
+            columns = self._columns[:, : len(self._paths)]
+            in_path = (columns[0] & wanted) == wanted
+            in_basename = (columns[1] & wanted) == wanted
+            matches = self._rank(columns, np.flatnonzero(in_basename), wanted, lowered, limit, prefix, basename_only=True)
+            if len(matches) < limit:
+                across = self._rank(columns, np.flatnonzero(in_path & ~in_basename), wanted, lowered, limit - len(matches), prefix, basename_only=False)
+                matches = sorted(matches + across, key=lambda match: (-match.score, len(match.path), match.path))
+        return matches
+
+    def _rank(self, columns: np.ndarray, slots: np.ndarray, wanted: np.uint64, query: str, limit: int, prefix: str, basename_only: bool) -> list[FuzzyMatch]:
+        """Score candidate slots, keeping the most promising ``SCORE_BUDGET`` when there are more."""
+        if slots.size > SCORE_BUDGET and not prefix:
+            word_starts = np.bitwise_count(columns[2, slots] & wanted)
+            slots = slots[np.lexsort((columns[3, slots], -word_starts.astype(np.int64)))[:SCORE_BUDGET]]
+        paths = [self._paths[slot] for slot in slots.tolist()]
+        if prefix:
+            paths = [path for path in paths if path is not None and path.startswith(prefix)]
+            if len(paths) > SCORE_BUDGET:
+                paths = sorted(paths, key=len)[:SCORE_BUDGET]
+        return rank_paths((path for path in paths if path is not None), query, limit, basename_only)
@@ -0,0 +1,327 @@
+"""Compiled, hierarchical ``.gitignore`` matching.
+
+Each ignore file is parsed once and compiled into a handful of combined regexes:
+consecutive patterns with the same polarity share one alternation, so matching a
+path costs one regex per polarity switch instead of one per pattern. Compiled
+files are cached by mtime and shared by every traversal of the same repository.
+
+Semantics follow git: patterns without a separator match at any depth, a
+leading or inner ``/`` anchors the pattern to its file's directory, a trailing
+``/`` matches directories only, ``**`` spans directories, ``!`` re-includes, and
+deeper ignore files take precedence over shallower ones. Files inside an
+ignored directory stay ignored.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from files.backend.mcp.filesys.utils.tree_walker import EntryFilter
+from loguru import logger
+
+IGNORE_FILE = ".gitignore"
+
+
+@dataclass(frozen=True)
+class _RuleGroup:
+    """Consecutive patterns sharing a polarity, compiled into combined regexes."""
+
+    negated: bool
+    any_type: re.Pattern[str] | None
+    dirs_only: re.Pattern[str] | None
+
+    def matches(self, rel: str, is_dir: bool) -> bool:
+        if self.any_type is not None and self.any_type.fullmatch(rel):
+            return True
+        return is_dir and self.dirs_only is not None and self.dirs_only.fullmatch(rel) is not None
+
+
+@dataclass(frozen=True)
+class _IgnoreRules:
+    """Compiled rules of one ignore file, applying to paths below ``base``."""
+
+    base: str
+    groups: tuple[_RuleGroup, ...]
+
+    def verdict(self, rel: str, is_dir: bool) -> bool | None:
+        """Return True (ignored), False (re-included) or None (no pattern applies)."""
+        if self.base:
+            if not rel.startswith(self.base) or rel[len(self.base) : len(self.base) + 1] != "/":
+                return None
+            rel = rel[len(self.base) + 1 :]
+        # The last matching pattern wins, so scan groups back to front
+        for group in reversed(self.groups):
+            if group.matches(rel, is_dir):
+                return not group.negated
+        return None
+
+
+def compile_ignore_rules(lines: list[str], base: str = "") -> _IgnoreRules:
+    """Compile ignore-file lines for the directory ``base`` (relative, POSIX).
+
+    Args:
+        lines: Lines of an ignore file
+        base: Directory of the ignore file relative to the matcher root
+
+    Returns:
+        Compiled rules
+    """
+    groups: list[_RuleGroup] = []
+    run: list[tuple[bool, str]] = []
+    run_negated = False
+
+    def flush() -> None:
+        if not run:
+            return
+        any_type = [source for dirs_only, source in run if not dirs_only]
+        dirs = [source for _dirs_only, source in run]
+        groups.append(_RuleGroup(run_negated, _combine(any_type), _combine(dirs)))
+        run.clear()
+
+    for line in lines:
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        negated, dirs_only, source = parsed
+        if negated != run_negated:
+            flush()
+            run_negated = negated
+        run.append((dirs_only, source))
+    flush()
+    return _IgnoreRules(base, tuple(groups))
+
+
+def _combine(sources: list[str]) -> re.Pattern[str] | None:
+    if not sources:
+        return None
+    return re.compile("|".join(f"(?:{source})" for source in sources), re.DOTALL)
+
+
+def _parse_line(line: str) -> tuple[bool, bool, str] | None:
+    """Parse one line into (negated, dirs_only, regex source), or None for no pattern."""
+    line = line.rstrip("\n").rstrip("\r")
+    if not line or line.startswith("#"):
+        return None
+    # Trailing spaces are dropped unless escaped
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+
+    negated = line.startswith("!")
+    if negated or line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    dirs_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    anchored = "/" in line
+    segments = line.lstrip("/").split("/")
+    body = ""
+    for position, segment in enumerate(segments):
+        last = position == len(segments) - 1
+        if segment == "**":
+            body += ".*" if last else "(?:.*/)?"
+        else:
+            body += _translate_segment(segment) + ("" if last else "/")
+    return negated, dirs_only, body if anchored else f"(?:.*/)?{body}"
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one gitignore path segment; wildcards never cross ``/``."""
+    out: list[str] = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "\\" and i < len(segment):
+            out.append(re.escape(segment[i]))
+            i += 1
+        elif char == "*":
+            # Collapse runs of ``*`` inside a segment
+            while i < len(segment) and segment[i] == "*":
+                i += 1
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", i + 1 if i < len(segment) and segment[i] in "!^]" else i)
+            if end == -1:
+                out.append(re.escape(char))
+                continue
+            body = segment[i:end].replace("\\", "\\\\")
+            i = end + 1
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
+
+
+def _mtime_or_none(path: str) -> int | None:
+    """Return the modification time of ``path`` in nanoseconds, or None when it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class GitignoreMatcher:
+    """Answer ignore queries for paths below one repository root."""
+
+    def __init__(self, root: Path) -> None:
+        """Initialise the matcher.
+
+        Args:
+            root: Repository root; ignore files above it are not consulted
+        """
+        self.root = root
+        self._root_str = os.fspath(root)
+        self._info_exclude_path = os.path.join(self._root_str, ".git", "info", "exclude")
+        self._cache: dict[str, tuple[tuple[int | None, int | None], _IgnoreRules | None]] = {}
+        self._lock = threading.Lock()
+
+    def _rules(self, directory: str) -> _IgnoreRules | None:
+        """Return the compiled ignore file of ``directory``, reloading it when its mtime (or the root's exclude file's) changes."""
+        base_path = os.path.join(self._root_str, directory) if directory else self._root_str
+        ignore_path = os.path.join(base_path, IGNORE_FILE)
+        mtime = _mtime_or_none(ignore_path)
+        signature = (mtime, None if directory else _mtime_or_none(self._info_exclude_path))
+
+        with self._lock:
+            cached = self._cache.get(directory)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        rules = None
+        if mtime is not None:
+            try:
+                with open(ignore_path, encoding="utf-8", errors="replace") as handle:
+                    lines = handle.readlines()
+                if not directory:
+                    lines = self._info_exclude() + lines
+                rules = compile_ignore_rules(lines, directory)
+            except OSError as error:
+                logger.debug(f"Cannot read {ignore_path}: {error}")
+        elif not directory:
+            exclude = self._info_exclude()
+            rules = compile_ignore_rules(exclude) if exclude else None
+
+        with self._lock:
+            self._cache[directory] = (signature, rules)
+        return rules
+
+    def _info_exclude(self) -> list[str]:
+        """Return ``.git/info/exclude`` lines, which rank below the root ``.gitignore``."""
+        try:
+            with open(self._info_exclude_path, encoding="utf-8", errors="replace") as handle:
+                return handle.readlines()
+        except OSError:
+            return []
+
+    def session(self) -> "GitignoreSession":
+        """Start a query session that memoises per-directory rule chains."""
+        return GitignoreSession(self)
+
+    def is_ignored(self, path: Path, is_dir: bool = False) -> bool:
+        """Return whether ``path`` (or one of its parent directories) is ignored."""
+        return self.session().is_ignored(path, is_dir)
+
+
+class GitignoreSession:
+    """Per-traversal view of a matcher.
+
+    Rule chains and directory verdicts are memoised for the lifetime of the
+    session, so each ignore file is checked at most once per traversal.
+    """
+
+    def __init__(self, matcher: GitignoreMatcher) -> None:
+        self._matcher = matcher
+        self._prefix = matcher._root_str.rstrip(os.sep) + os.sep
+        self._chains: dict[str, tuple[_IgnoreRules, ...]] = {}
+        self._dir_verdicts: dict[str, bool] = {"": False}
+
+    def _relative(self, path: str) -> str | None:
+        if not path.startswith(self._prefix):
+            return None
+        rel = path[len(self._prefix) :]
+        return rel if os.sep == "/" else rel.replace(os.sep, "/")
+
+    def _chain(self, directory: str) -> tuple[_IgnoreRules, ...]:
+        """Rules applying inside ``directory``, deepest ignore file first."""
+        chain = self._chains.get(directory)
+        if chain is None:
+            parent = self._chain(directory.rpartition("/")[0]) if directory else ()
+            own = self._matcher._rules(directory)
+            chain = (own, *parent) if own is not None else parent
+            self._chains[directory] = chain
+        return chain
+
+    def _matches(self, rel: str, is_dir: bool) -> bool:
+        for rules in self._chain(rel.rpartition("/")[0]):
+            verdict = rules.verdict(rel, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def _directory_ignored(self, directory: str) -> bool:
+        verdict = self._dir_verdicts.get(directory)
+        if verdict is None:
+            verdict = self._directory_ignored(directory.rpartition("/")[0]) or self._matches(directory, True)
+            self._dir_verdicts[directory] = verdict
+        return verdict
+
+    def is_ignored(self, path: Path | str, is_dir: bool = False) -> bool:
+        """Return whether ``path`` or any of its parent directories is ignored."""
+        rel = self._relative(os.fspath(path))
+        if not rel:
+            return False
+        if self._directory_ignored(rel.rpartition("/")[0]):
+            return True
+        return self._directory_ignored(rel) if is_dir else self._matches(rel, False)
+
+    def entry_filter(self) -> EntryFilter:
+        """Return a walker predicate; parents are assumed already pruned by the walk."""
+
+        def ignore(entry: os.DirEntry[str]) -> bool:
+            rel = self._relative(entry.path)
+            return rel is not None and rel != "" and self._matches(rel, entry.is_dir())
+
+        return ignore
+
+
+class _GitignoreRegistry:
+    """Share one matcher (and its compiled-file cache) per repository root."""
+
+    def __init__(self) -> None:
+        self._matchers: dict[Path, GitignoreMatcher] = {}
+        self._lock = threading.Lock()
+
+    def get(self, root: Path) -> GitignoreMatcher:
+        with self._lock:
+            matcher = self._matchers.get(root)
+            if matcher is None:
+                matcher = GitignoreMatcher(root)
+                self._matchers[root] = matcher
+            return matcher
+
+
+_GITIGNORE_REGISTRY = _GitignoreRegistry()
+
+
+def find_repository_root(path: Path) -> Path:
+    """Return the nearest ancestor of ``path`` containing ``.git``, or ``path`` itself."""
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return path
+
+
+def gitignore_matcher_for(path: Path) -> GitignoreMatcher:
+    """Return the shared matcher for the repository containing ``path``."""
+    return _GITIGNORE_REGISTRY.get(find_repository_root(path))
@@ -0,0 +1,295 @@
+"""Sparse line-offset index for ranged reads of large text files.
+
+A ``LineIndex`` records the byte offset (and decoded character offset) of
+every ``CHECKPOINT_LINES``-th line start, built by one pass over the file on
+first access. A ranged read seeks to the nearest checkpoint at or before the
+requested line or character and scans at most one checkpoint interval before
+it reaches the range, whatever its position in the file.
+
+Indexes are cached per file identity ``(st_dev, st_ino)`` and validated by size
+and modification time. A file that only grew (a log being appended to) keeps
+its head and the bytes before the indexed end, and is indexed incrementally
+from there; any other change rebuilds the index.
+
+Offsets are found by scanning for ``\\n`` bytes, which is only sound for
+ASCII-compatible encodings and files without lone ``\\r`` line breaks;
+``line_index_for`` returns None for anything else, and for files below
+``LINE_INDEX_MIN_SIZE``, and callers read those the plain way. Reads decode
+with universal newlines, exactly as ``open(path, encoding=...)`` does.
+"""
+
+import codecs
+import io
+import itertools
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+# Files smaller than this are read whole; indexing them would not pay off
+LINE_INDEX_MIN_SIZE = 1 << 20
+
+# Lines between checkpoints; a ranged read scans at most this many lines to reach its start
+CHECKPOINT_LINES = 1024
+
+# Indexes kept by the process-wide cache
+MAX_LINE_INDEXES = 64
+
+_BLOCK_SIZE = 1 << 20
+_SEEK_BLOCK_SIZE = 1 << 16
+
+# Bytes compared at the head and before the indexed end to tell appends from rewrites
+_FINGERPRINT_SIZE = 4096
+
+_ASCII = bytes(range(128))
+
+
+def supports_encoding(encoding: str) -> bool:
+    """Return whether ``encoding`` maps ASCII to itself byte for byte (so ``\\n`` bytes are line breaks)."""
+    try:
+        return _ASCII.decode("ascii").encode(encoding) == _ASCII
+    except (LookupError, UnicodeError):
+        return False
+
+
+class LineIndex:
+    """Checkpointed line and character offsets of one version of a file.
+
+    Not thread-safe; ``line_index_for`` serialises access to cached indexes.
+    """
+
+    def __init__(self, encoding: str, interval: int = CHECKPOINT_LINES) -> None:
+        """Create an empty index; ``extend`` scans the file into it.
+
+        Args:
+            encoding: Encoding character offsets are counted in
+            interval: Lines between checkpoints
+        """
+        self.encoding = encoding
+        self.interval = max(1, interval)
+        # Byte and character offsets of lines 0, interval, 2 * interval, ...
+        self.byte_offsets = array("q", [0])
+        self.char_offsets = array("q", [0])
+        self.size = 0  # Bytes indexed
+        self.mtime_ns = 0
+        self.lines = 0  # Line breaks seen
+        self.chars = 0  # Characters decoded, after newline translation
+        self.lone_cr = False
+        self._pending_cr = False
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._head = b""
+        self._tail = b""
+
+    def extend(self, handle: BinaryIO, stat_result: os.stat_result) -> None:
+        """Index the bytes of ``handle`` past the indexed end.
+
+        Raises:
+            UnicodeDecodeError: If the file is not valid in the index's encoding
+        """
+        handle.seek(self.size)
+        while block := handle.read(_BLOCK_SIZE):
+            self._scan_block(block)
+            self._tail = (self._tail + block)[-_FINGERPRINT_SIZE:]
+            if len(self._head) < _FINGERPRINT_SIZE:
+                self._head = (self._head + block)[:_FINGERPRINT_SIZE]
+        self.mtime_ns = stat_result.st_mtime_ns
+
+    def is_prefix_of(self, handle: BinaryIO, size: int) -> bool:
+        """Return whether the indexed bytes look unchanged in a file grown to ``size`` bytes (it was only appended to)."""
+        if size <= self.size:
+            return False
+        handle.seek(0)
+        if handle.read(len(self._head)) != self._head:
+            return False
+        handle.seek(self.size - len(self._tail))
+        if handle.read(len(self._tail)) != self._tail:
+            return False
+        # Each checkpoint follows a line break
+        last = self.byte_offsets[-1]
+        if last:
+            handle.seek(last - 1)
+            return handle.read(1) == b"\n"
+        return True
+
+    def read_lines(self, path: Path, start: int, end: int) -> list[str]:
+        """Return lines ``start``..``end`` (0-based, inclusive; ``end`` -1 reads to the end of the file)."""
+        with path.open("rb") as raw:
+            raw.seek(self.line_start(raw, start))
+            with io.TextIOWrapper(raw, encoding=self.encoding, newline=None) as text:
+                if end == -1:
+                    return text.readlines()
+                return list(itertools.islice(text, max(0, end - start + 1)))
+
+    def read_chars(self, path: Path, start: int, end: int) -> str:
+        """Return characters ``start``..``end`` (0-based, inclusive; ``end`` -1 reads to the end of the file)."""
+        checkpoint = bisect_right(self.char_offsets, start) - 1
+        skip = start - self.char_offsets[checkpoint]
+        with path.open("rb") as raw:
+            raw.seek(self.byte_offsets[checkpoint])
+            with io.TextIOWrapper(raw, encoding=self.encoding, newline=None) as text:
+                while skip > 0:
+                    skipped = len(text.read(min(skip, _BLOCK_SIZE)))
+                    if not skipped:
+                        return ""
+                    skip -= skipped
+                return text.read() if end == -1 else text.read(max(0, end - start + 1))
+
+    def line_start(self, raw: BinaryIO, line: int) -> int:
+        """Return the byte offset where 0-based ``line`` starts (the end of the file if it has fewer lines)."""
+        checkpoint = min(line // self.interval, len(self.byte_offsets) - 1)
+        return _skip_lines(raw, self.byte_offsets[checkpoint], line - checkpoint * self.interval)
+
+    def line_at(self, raw: BinaryIO, offset: int) -> int:
+        """Return the 0-based line containing byte ``offset`` (the number of line breaks before it)."""
+        checkpoint = bisect_right(self.byte_offsets, offset) - 1
+        return checkpoint * self.interval + _count_lines(raw, self.byte_offsets[checkpoint], offset)
+
+    def _scan_block(self, block: bytes) -> None:
+        """Count lines and characters in ``block``, recording the checkpoints it contains."""
+        newlines = block.count(b"\n")
+        next_checkpoint = len(self.byte_offsets) * self.interval
+        if self.lines + newlines < next_checkpoint:
+            self._count(block)
+            self.lines += newlines
+            self.size += len(block)
+            return
+
+        # Offsets just past each line break in the block
+        ends = list(itertools.accumulate(len(line) + 1 for line in block.split(b"\n")))
+        base, lines, start = self.size, self.lines, 0
+        while lines + newlines >= next_checkpoint:
+            cut = ends[next_checkpoint - lines - 1]
+            self._count(block[start:cut])
+            start = cut
+            self.byte_offsets.append(base + cut)
+            self.char_offsets.append(self.chars)
+            next_checkpoint += self.interval
+        self._count(block[start:])
+        self.lines += newlines
+        self.size += len(block)
+
+    def _count(self, piece: bytes) -> None:
+        """Add the characters of ``piece`` as universal-newline reading yields them."""
+        if not piece:
+            return
+        crlf = piece.count(b"\r\n")
+        joined = self._pending_cr and piece.startswith(b"\n")
+        # A ``\r`` is a line break of its own unless ``\n`` follows, possibly in the next piece
+        lone = piece.count(b"\r") - crlf - piece.endswith(b"\r") + (self._pending_cr and not joined)
+        if lone:
+            self.lone_cr = True
+        self.chars += len(self._decoder.decode(piece)) - crlf - joined
+        self._pending_cr = piece.endswith(b"\r")
+
+
+def _skip_lines(raw: BinaryIO, offset: int, lines: int) -> int:
+    """Return the byte offset ``lines`` line breaks past ``offset`` (the end of the file if it has fewer)."""
+    raw.seek(offset)
+    while lines:
+        block = raw.read(_SEEK_BLOCK_SIZE)
+        if not block:
+            break
+        count = block.count(b"\n")
+        if count < lines:
+            lines -= count
+            offset += len(block)
+            continue
+        position = -1
+        for _ in range(lines):
+            position = block.index(b"\n", position + 1)
+        return offset + position + 1
+    return offset
+
+
+def _count_lines(raw: BinaryIO, start: int, end: int) -> int:
+    """Return the number of line breaks between byte offsets ``start`` and ``end``."""
+    raw.seek(start)
+    count = 0
+    while start < end and (block := raw.read(min(_BLOCK_SIZE, end - start))):
+        count += block.count(b"\n")
+        start += len(block)
+    return count
+
+
+_INDEXES: OrderedDict[tuple[int, int, str], LineIndex] = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def line_index_for(path: Path, encoding: str, stat_result: os.stat_result | None = None) -> LineIndex | None:
+    """Return an up-to-date index of ``path``, building or extending it as needed.
+
+    Args:
+        path: Text file to index
+        encoding: Encoding the file is read with
+        stat_result: ``path.stat()`` if the caller already has it
+
+    Returns:
+        The index, or None when ``path`` is small, its encoding is not
+        ASCII-compatible or it has lone ``\\r`` line breaks
+
+    Raises:
+        OSError: If the file cannot be read
+        UnicodeDecodeError: If the file is not valid in ``encoding``
+    """
+    stat_result = stat_result if stat_result is not None else path.stat()
+    if stat_result.st_size < LINE_INDEX_MIN_SIZE or not supports_encoding(encoding):
+        return None
+    key = (stat_result.st_dev, stat_result.st_ino, encoding)
+    with _LOCK:
+        index = _INDEXES.pop(key, None)
+        if index is not None and index.size == stat_result.st_size and index.mtime_ns == stat_result.st_mtime_ns:
+            _INDEXES[key] = index
+            return None if index.lone_cr else index
+
+        with path.open("rb") as handle:
+            if index is None or not index.is_prefix_of(handle, stat_result.st_size):
+                index = LineIndex(encoding, CHECKPOINT_LINES)
+            index.extend(handle, stat_result)
+        _INDEXES[key] = index
+        while len(_INDEXES) > MAX_LINE_INDEXES:
+            _INDEXES.popitem(last=False)
+        return None if index.lone_cr else index
+
+
+def forget_line_indexes(paths: list[Path]) -> None:
+    """Drop cached indexes of ``paths`` (after the tools rewrote them in place)."""
+    identities = set()
+    for path in paths:
+        try:
+            stat_result = path.stat()
+        except OSError:
+            continue
+        identities.add((stat_result.st_dev, stat_result.st_ino))
+    if not identities:
+        return
+    with _LOCK:
+        for key in [key for key in _INDEXES if key[:2] in identities]:
+            del _INDEXES[key]
+
+
+def line_offset(path: Path, line: int, encoding: str) -> int:
+    """Return the byte offset where 0-based ``line`` of ``path`` starts, counting ``\\n`` line breaks.
+
+    Large files are located through their index; others are scanned from the start.
+    """
+    index = _cached_index(path, encoding)
+    with path.open("rb") as raw:
+        return index.line_start(raw, line) if index is not None else _skip_lines(raw, 0, line)
+
+
+def line_number_at(path: Path, offset: int, encoding: str) -> int:
+    """Return the number of ``\\n`` line breaks in ``path`` before byte ``offset``; see ``line_offset``."""
+    index = _cached_index(path, encoding)
+    with path.open("rb") as raw:
+        return index.line_at(raw, offset) if index is not None else _count_lines(raw, 0, offset)
+
+
+def _cached_index(path: Path, encoding: str) -> LineIndex | None:
+    """Return the index of ``path``, or None when it has none or does not decode (its bytes are scanned instead)."""
+    try:
+        return line_index_for(path, encoding)
+    except UnicodeDecodeError:
+        return None
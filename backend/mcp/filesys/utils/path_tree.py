@@ -0,0 +1,251 @@
+"""Array-backed tree of the directories and files below a root.
+
+A ``PathTree`` answers listings and glob finds from memory. Every node is an
+index into parallel arrays of parent node, name, kind, size and modification
+time, and names are interned in a component table, so a component shared by
+many paths (``src``, ``__init__.py``, ``tests``) is stored once. Directory nodes map component ids
+to child nodes, which gives path lookups without hashing whole paths.
+
+The tree is built by ``SearchWorkspace`` from one scan and then kept current
+from the watcher and the tools' own writes; walks over it yield entries in the
+same order as ``walk_entries`` over the directories it was built from.
+"""
+
+from array import array
+from collections.abc import Callable, Iterator
+from typing import NamedTuple
+
+# Node kinds
+FILE = 0
+DIRECTORY = 1
+
+_ROOT = 0
+
+# Predicate over a file's ``(name, size, mtime_ns)`` deciding whether a walk yields it
+StatFilter = Callable[[str, int, int], bool]
+
+
+class TreeEntry(NamedTuple):
+    """A file or directory found by a tree walk."""
+
+    path: str  # Root-relative POSIX path
+    is_dir: bool
+    size: int  # Size in bytes (0 for directories)
+
+
+class PathTree:
+    """Directories and files as interned components with parent links.
+
+    Not thread-safe for concurrent updates; callers serialise writes. Walks
+    copy each directory's children before yielding from it, so updates made
+    while a walk is suspended never break it (the walk may see either version
+    of the entries they change, as a disk walk would).
+    """
+
+    def __init__(self) -> None:
+        self._component_ids: dict[str, int] = {}
+        self._components: list[str] = []
+        self._parents = array("q", [-1])
+        self._names = array("q", [self._intern("")])
+        self._kinds = array("b", [DIRECTORY])
+        self._sizes = array("q", [0])
+        self._mtimes = array("q", [0])
+        self._children: list[dict[int, int] | None] = [{}]
+        self._free: list[int] = []
+        self._file_count = 0
+
+    def __len__(self) -> int:
+        """Number of files in the tree."""
+        return self._file_count
+
+    @property
+    def node_count(self) -> int:
+        """Number of files and directories in the tree (excluding the root)."""
+        return len(self._parents) - len(self._free) - 1
+
+    def set_file(self, key: str, size: int, mtime_ns: int) -> None:
+        """Record a file and its stat data, creating parent directories as needed."""
+        parent_key, _, name = key.rpartition("/")
+        node = self._child(self._directory(parent_key), name, FILE)
+        self._sizes[node] = size
+        self._mtimes[node] = mtime_ns
+
+    def add_dir(self, key: str) -> None:
+        """Record a directory and its parents."""
+        self._directory(key)
+
+    def remove(self, key: str) -> list[str]:
+        """Drop a file or a directory with everything below it.
+
+        Returns:
+            Root-relative paths of the files that were removed
+        """
+        node = self._lookup(key)
+        if node is None:
+            return []
+        removed = [entry.path for entry in self._walk_node(node, self._prefix(key), None) if not entry.is_dir]
+        if node == _ROOT:
+            for child in list((self._children[_ROOT] or {}).values()):
+                self._release(child)
+            return removed
+        if self._kinds[node] == FILE:
+            removed.append(key)
+        self._release(node)
+        return removed
+
+    def stat(self, key: str) -> tuple[int, int] | None:
+        """Return ``(size, mtime_ns)`` of a file, or None if it is not a known file."""
+        node = self._lookup(key)
+        if node is None or self._kinds[node] != FILE:
+            return None
+        return self._sizes[node], self._mtimes[node]
+
+    def is_dir(self, key: str) -> bool:
+        """Return whether ``key`` is a known directory (``"."`` is the root)."""
+        node = self._lookup(key)
+        return node is not None and self._kinds[node] == DIRECTORY
+
+    def walk(self, key: str = ".", recursive: bool = True, max_depth: int | None = None, file_filter: StatFilter | None = None) -> Iterator[TreeEntry]:
+        """Yield the entries below directory ``key`` in scan order.
+
+        Args:
+            key: Root-relative directory (``"."`` for the root)
+            recursive: Descend into subdirectories
+            max_depth: Yield entries at most this many levels below ``key`` (1 lists ``key`` only)
+            file_filter: Yield only files whose name, size and mtime it accepts (directories are unaffected)
+        """
+        node = self._lookup(key)
+        if node is None or self._kinds[node] != DIRECTORY:
+            return iter(())
+        return self._walk_node(node, self._prefix(key), max_depth if recursive else 1, file_filter)
+
+    def files(self, key: str = ".", max_depth: int | None = None, file_filter: StatFilter | None = None) -> Iterator[str]:
+        """Yield the root-relative paths of the files below directory ``key``; see ``walk``."""
+        return (entry.path for entry in self.walk(key, max_depth=max_depth, file_filter=file_filter) if not entry.is_dir)
+
+    def file_mtimes(self, key: str = ".", max_depth: int | None = None, file_filter: StatFilter | None = None) -> Iterator[tuple[str, int]]:
+        """Yield ``(root-relative path, mtime_ns)`` for the files below directory ``key``; see ``walk``."""
+        node = self._lookup(key)
+        if node is None or self._kinds[node] != DIRECTORY:
+            return iter(())
+        return ((path, self._mtimes[child]) for path, child in self._walk_nodes(node, self._prefix(key), max_depth, file_filter) if self._kinds[child] == FILE)
+
+    def path_of(self, node: int) -> str:
+        """Rebuild the root-relative path of ``node`` from its parent links."""
+        parts = []
+        while node != _ROOT:
+            parts.append(self._components[self._names[node]])
+            node = self._parents[node]
+        return "/".join(reversed(parts)) or "."
+
+    def _walk_node(self, node: int, prefix: str, max_depth: int | None, file_filter: StatFilter | None = None) -> Iterator[TreeEntry]:
+        for path, child in self._walk_nodes(node, prefix, max_depth, file_filter):
+            kind = self._kinds[child]
+            yield TreeEntry(path, kind == DIRECTORY, self._sizes[child] if kind == FILE else 0)
+
+    def _walk_nodes(self, node: int, prefix: str, max_depth: int | None, file_filter: StatFilter | None) -> Iterator[tuple[str, int]]:
+        """Yield ``(path, node)`` for the entries below ``node`` in scan order."""
+        stack = [(node, prefix, 1)]
+        while stack:
+            directory, directory_prefix, depth = stack.pop()
+            descend = max_depth is None or depth < max_depth
+            subdirs: list[tuple[int, str, int]] = []
+            for component, child in list((self._children[directory] or {}).items()):
+                name = self._components[component]
+                if self._kinds[child] == DIRECTORY:
+                    path = directory_prefix + name
+                    if descend:
+                        subdirs.append((child, f"{path}/", depth + 1))
+                    yield path, child
+                elif file_filter is None or file_filter(name, self._sizes[child], self._mtimes[child]):
+                    yield directory_prefix + name, child
+            # Reverse so directories are visited in the order they were recorded
+            stack.extend(reversed(subdirs))
+
+    def _lookup(self, key: str) -> int | None:
+        node = _ROOT
+        if key in ("", "."):
+            return node
+        for part in key.split("/"):
+            children = self._children[node]
+            component = self._component_ids.get(part)
+            if children is None or component is None:
+                return None
+            child = children.get(component)
+            if child is None:
+                return None
+            node = child
+        return node
+
+    def _directory(self, key: str) -> int:
+        node = _ROOT
+        if key in ("", "."):
+            return node
+        for part in key.split("/"):
+            node = self._child(node, part, DIRECTORY)
+        return node
+
+    def _child(self, parent: int, name: str, kind: int) -> int:
+        """Return the child ``name`` of ``parent`` with ``kind``, replacing a child of another kind."""
+        component = self._intern(name)
+        children = self._children[parent]
+        if children is None:
+            raise ValueError(f"Not a directory: {self.path_of(parent)}")
+        node = children.get(component)
+        if node is not None:
+            if self._kinds[node] == kind:
+                return node
+            self._release(node)
+        node = self._allocate(parent, component, kind)
+        children[component] = node
+        if kind == FILE:
+            self._file_count += 1
+        return node
+
+    def _allocate(self, parent: int, component: int, kind: int) -> int:
+        children: dict[int, int] | None = {} if kind == DIRECTORY else None
+        if self._free:
+            node = self._free.pop()
+            self._parents[node] = parent
+            self._names[node] = component
+            self._kinds[node] = kind
+            self._sizes[node] = 0
+            self._mtimes[node] = 0
+            self._children[node] = children
+            return node
+        self._parents.append(parent)
+        self._names.append(component)
+        self._kinds.append(kind)
+        self._sizes.append(0)
+        self._mtimes.append(0)
+        self._children.append(children)
+        return len(self._parents) - 1
+
+    def _release(self, node: int) -> None:
+        """Unlink ``node`` from its parent and free it with its whole subtree."""
+        siblings = self._children[self._parents[node]]
+        if siblings is not None:
+            siblings.pop(self._names[node], None)
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            children = self._children[current]
+            if children is not None:
+                stack.extend(children.values())
+            elif self._kinds[current] == FILE:
+                self._file_count -= 1
+            self._children[current] = None
+            self._parents[current] = -1
+            self._free.append(current)
+
+    def _intern(self, name: str) -> int:
+        component = self._component_ids.get(name)
+        if component is None:
+            component = len(self._components)
+            self._components.append(name)
+            self._component_ids[name] = component
+        return component
+
+    @staticmethod
+    def _prefix(key: str) -> str:
+        return "" if key in ("", ".") else f"{key}/"
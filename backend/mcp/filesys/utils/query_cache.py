@@ -0,0 +1,61 @@
+"""LRU cache of search results validated by tree generations.
+
+Agents often repeat the same ``find`` call within a session. Results are cached
+under the normalised query together with the change generation of the searched
+subtree (see ``SearchWorkspace.generation``). Any write by the tools or watcher
+event below that subtree advances its generation, so a stale entry is simply
+never looked up again and ages out of the LRU.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class QueryResultCache:
+    """Bounded LRU mapping of query keys to tool results, with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Initialise an empty cache.
+
+        Args:
+            max_entries: Least recently used results are dropped beyond this many
+        """
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        """Return a shallow copy of the cached result for ``key``, or None on a miss."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(result)
+
+    def put(self, key: Hashable, result: dict[str, Any]) -> None:
+        """Cache ``result`` under ``key``, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,129 @@
+"""Opaque cursors for paginated reads of large files.
+
+A paginated read returns at most one page of bytes plus a cursor naming where
+the next page starts: its byte offset, the 0-based line number there, the byte
+offset the read stops at, the page size, and the identity of the file version
+it was issued for (device, inode, size and modification time). Resuming is a
+seek, and a cursor for a file that has changed since is rejected instead of
+returning content at an offset computed from the old version.
+
+Text pages end after their last line break (or, for a line longer than the
+page, on a UTF-8 character boundary), so every page starts at a line or
+character boundary. Followed reads of growing files (see ``check_appended``)
+accept cursors for earlier, shorter versions of the same file. Cursors are
+URL-safe base64 of a small versioned JSON array; callers should treat them as
+opaque.
+"""
+
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import NamedTuple
+
+from files.backend.mcp.filesys.utils.byte_search import utf8_boundary
+
+CURSOR_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ReadCursor:
+    """Position of the next page of a paginated read."""
+
+    device: int
+    inode: int
+    size: int
+    mtime_ns: int
+    offset: int  # Byte offset the next page starts at
+    line: int  # 0-based line number at ``offset`` (-1 when not known, as after a tail read)
+    end: int  # Byte offset the read stops at (exclusive)
+    text: bool  # Whether pages are cut at line breaks
+    page_size: int  # Maximum bytes per page
+
+    @classmethod
+    def for_file(cls, stat_result: os.stat_result, offset: int, line: int, end: int, text: bool, page_size: int) -> "ReadCursor":
+        """Create a cursor into the file version described by ``stat_result``."""
+        return cls(stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns, offset, line, end, text, page_size)
+
+    def encode(self) -> str:
+        """Return the opaque token handed to callers."""
+        fields = [CURSOR_VERSION, self.device, self.inode, self.size, self.mtime_ns, self.offset, self.line, self.end, int(self.text), self.page_size]
+        return base64.urlsafe_b64encode(json.dumps(fields, separators=(",", ":")).encode("ascii")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "ReadCursor":
+        """Parse a token produced by ``encode``.
+
+        Raises:
+            ValueError: If ``token`` is not a cursor of this version
+        """
+        try:
+            fields = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+            raise ValueError(f"Invalid read cursor: {token!r}") from error
+        if not isinstance(fields, list) or len(fields) != 10 or fields[0] != CURSOR_VERSION or not all(isinstance(field, int) for field in fields):
+            raise ValueError(f"Invalid read cursor: {token!r}")
+        device, inode, size, mtime_ns, offset, line, end, text, page_size = fields[1:]
+        if not 0 <= offset <= end <= size or line < -1 or page_size < 1:
+            raise ValueError(f"Invalid read cursor: {token!r}")
+        return cls(device, inode, size, mtime_ns, offset, line, end, bool(text), page_size)
+
+    def check(self, stat_result: os.stat_result) -> None:
+        """Reject the cursor unless ``stat_result`` describes the version it was issued for.
+
+        Raises:
+            ValueError: If the file was replaced or modified
+        """
+        if (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns) != (self.device, self.inode, self.size, self.mtime_ns):
+            raise ValueError("File changed since the read cursor was issued; start a new read")
+
+    def check_appended(self, stat_result: os.stat_result) -> None:
+        """Reject the cursor unless ``stat_result`` describes the same file, possibly grown since.
+
+        Raises:
+            ValueError: If the file was replaced or truncated
+        """
+        if (stat_result.st_dev, stat_result.st_ino) != (self.device, self.inode) or stat_result.st_size < self.size:
+            raise ValueError("File was replaced or truncated since the read cursor was issued; start a new read")
+
+    def following(self, stat_result: os.stat_result) -> "ReadCursor":
+        """Return the cursor extended to the end of the grown file version ``stat_result``."""
+        return replace(self, size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns, end=stat_result.st_size)
+
+    def resized(self, page_size: int) -> "ReadCursor":
+        """Return the cursor with pages of ``page_size`` bytes from here on."""
+        return replace(self, page_size=page_size)
+
+    def advanced(self, data: bytes) -> "ReadCursor":
+        """Return the cursor moved past ``data``, read from its offset."""
+        line = self.line + data.count(b"\n") if self.text and self.line >= 0 else self.line
+        return replace(self, offset=self.offset + len(data), line=line)
+
+
+class ReadPage(NamedTuple):
+    """One page of a paginated read."""
+
+    data: bytes
+    offset: int  # Byte offset of ``data`` in the file
+    line: int  # 0-based line number at ``offset``
+    next_cursor: ReadCursor | None  # None once the read is complete
+
+
+def read_page(path: Path, cursor: ReadCursor) -> ReadPage:
+    """Read the page starting at ``cursor``, at most ``cursor.page_size`` bytes long."""
+    length = min(cursor.page_size, cursor.end - cursor.offset)
+    with path.open("rb") as handle:
+        handle.seek(cursor.offset)
+        # One byte of lookahead tells whether the page would end inside a character
+        data = handle.read(length + 1 if cursor.offset + length < cursor.end else length)
+
+    if len(data) > length:
+        cut = data.rfind(b"\n", 0, length) + 1 if cursor.text else length
+        if not cut:
+            cut = utf8_boundary(data, length) or length
+        data = data[:cut]
+
+    next_cursor = cursor.advanced(data)
+    return ReadPage(data, cursor.offset, cursor.line, next_cursor if data and next_cursor.offset < cursor.end else None)
@@ -0,0 +1,235 @@
+"""Extract required literal fragments from regular expressions.
+
+The search engine uses these fragments to narrow candidate files before running
+the full pattern (trigram index lookups, Aho-Corasick prefilters). Extraction is
+conservative: whenever a construct cannot be reasoned about, it contributes no
+requirement rather than a wrong one.
+"""
+
+import re
+from dataclasses import dataclass
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parse  # type: ignore[attr-defined]
+from typing import Any
+
+# Upper bound on the repeat count expanded into a literal (``a{3}`` -> ``aaa``)
+_MAX_LITERAL_REPEAT = 8
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+# ASCII letters that case-insensitive matching also finds outside ASCII (the dotted capital I, the long s, the Kelvin sign)
+_NON_ASCII_FOLDS = frozenset("iIkKsS")
+
+# Body of a ``{m,n}`` repeat; other braces are literal text to the standard library parser
+_REPEAT_BODY = re.compile(r"\d*(?:,\d*)?")
+
+# Letters naming error types in the ``regex`` module's fuzzy constraints (``{e<=1}``, ``{i<=1,d<=2}``)
+_FUZZY_ERRORS = frozenset("eisd")
+
+
+@dataclass(frozen=True)
+class RequiredLiterals:
+    """Literal requirements of a single regex.
+
+    ``clauses`` is a conjunction of disjunctions: every clause must be satisfied
+    by a match, and a clause is satisfied when at least one of its literals
+    occurs in the text. ``ignore_case`` marks patterns compiled with case folding,
+    in which case all literals are lower-cased.
+    """
+
+    clauses: tuple[frozenset[str], ...]
+    ignore_case: bool = False
+
+    def best_clause(self) -> frozenset[str] | None:
+        """Return the most selective clause (longest shortest literal)."""
+        if not self.clauses:
+            return None
+        return max(self.clauses, key=lambda clause: (min(len(lit) for lit in clause), -len(clause)))
+
+
+@dataclass
+class _Analysis:
+    """Intermediate result for a parsed (sub)pattern."""
+
+    clauses: list[frozenset[str]]
+    exact: str | None = None
+
+
+def extract_required_literals(pattern: str, flags: int = 0) -> RequiredLiterals | None:
+    """Return literal requirements for ``pattern`` or None if none can be derived.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern will be compiled with
+
+    Returns:
+        Required literals, or None when the pattern has no usable literal, uses
+        syntax outside the standard library dialect, or folds case and has a
+        literal that case folding matches outside ASCII
+    """
+    if _uses_regex_only_syntax(pattern):
+        return None
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError, OverflowError, ValueError):
+        return None
+
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE) or _has_local_ignorecase(parsed.data)
+    analysis = _analyse_sequence(parsed.data)
+    clauses = [clause for clause in analysis.clauses if all(clause)]
+    if not clauses:
+        return None
+    if ignore_case:
+        if not all(lit.isascii() and _NON_ASCII_FOLDS.isdisjoint(lit) for clause in clauses for lit in clause):
+            # Unicode case folding matches text the lower-cased literal is not in (the Kelvin sign for "k")
+            return None
+        clauses = [frozenset(lit.lower() for lit in clause) for clause in clauses]
+    return RequiredLiterals(tuple(dict.fromkeys(clauses)), ignore_case)
+
+
+def max_match_width(pattern: str, flags: int = 0) -> int | None:
+    """Return the longest text ``pattern`` can match, or None when unbounded or unknown.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern will be compiled with
+
+    Returns:
+        Maximum match length in characters
+    """
+    if _uses_regex_only_syntax(pattern):
+        return None
+    try:
+        _low, high = sre_parse.parse(pattern, flags).getwidth()
+    except (re.error, RecursionError, OverflowError, ValueError):
+        return None
+    return None if high >= sre_constants.MAXREPEAT else int(high)
+
+
+def _uses_regex_only_syntax(pattern: str) -> bool:
+    """Return whether ``pattern`` may use ``regex`` module syntax the standard library parser reads as literal text.
+
+    Fuzzy constraints (``(?:foo){e<=1}``) and nested sets or set operations
+    (``[[a-z]--[aeiou]]``) parse without error but mean something else to the
+    ``regex`` module the searcher compiles with. Other ``regex``-only syntax
+    (``\\p{...}``, ``(?V1)``, ``(?r)``, named lists) is rejected by the parser.
+    The check is conservative: braces that merely look like constraints count too.
+    """
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+            elif char == "[" or pattern.startswith(("--", "&&", "||", "~~"), i):
+                return True
+        elif char == "[":
+            in_class = True
+            # A leading "]" (after an optional "^") is a member of the class
+            i += 2 if pattern.startswith("^", i + 1) else 1
+            if pattern.startswith("]", i):
+                i += 1
+            continue
+        elif char == "{":
+            end = pattern.find("}", i)
+            body = pattern[i + 1 : end] if end != -1 else ""
+            if not _REPEAT_BODY.fullmatch(body) and not _FUZZY_ERRORS.isdisjoint(body):
+                return True
+        i += 1
+    return False
+
+
+def _has_local_ignorecase(items: Any) -> bool:
+    """Detect ``(?i:...)`` groups anywhere in the parsed tree."""
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            _group, add_flags, _del_flags, body = av
+            if add_flags & re.IGNORECASE or _has_local_ignorecase(body):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_has_local_ignorecase(alt) for alt in av[1]):
+                return True
+        elif op in _REPEATS:
+            if _has_local_ignorecase(av[2]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.ATOMIC_GROUP):
+            body = av[1] if op is not sre_constants.ATOMIC_GROUP else av
+            if _has_local_ignorecase(body):
+                return True
+    return False
+
+
+def _analyse_sequence(items: Any) -> _Analysis:
+    """Analyse a sequence of parsed items, concatenating adjacent literals."""
+    clauses: list[frozenset[str]] = []
+    run: list[str] = []
+    exact = True
+
+    def flush() -> None:
+        if run:
+            clauses.append(frozenset({"".join(run)}))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is sre_constants.AT:
+            # Zero-width anchors keep neighbouring literals adjacent in the text
+            continue
+        if op is sre_constants.IN and len(av) == 1 and av[0][0] is sre_constants.LITERAL:
+            run.append(chr(av[0][1]))
+            continue
+
+        inner = _analyse_item(op, av)
+        if inner is not None and inner.exact is not None:
+            run.append(inner.exact)
+            continue
+
+        exact = False
+        flush()
+        if inner is not None:
+            clauses.extend(inner.clauses)
+
+    if exact:
+        text = "".join(run)
+        return _Analysis([frozenset({text})] if text else [], text)
+
+    flush()
+    return _Analysis(clauses)
+
+
+def _analyse_item(op: Any, av: Any) -> _Analysis | None:
+    """Analyse a single non-literal item; None means it requires nothing."""
+    if op is sre_constants.SUBPATTERN:
+        return _analyse_sequence(av[3])
+
+    if op is sre_constants.ATOMIC_GROUP:
+        return _analyse_sequence(av)
+
+    if op in _REPEATS:
+        min_count, max_count, body = av
+        if min_count == 0:
+            return None
+        inner = _analyse_sequence(body)
+        if inner.exact is not None and min_count <= _MAX_LITERAL_REPEAT:
+            repeated = inner.exact * min_count
+            if min_count == max_count:
+                return _Analysis([frozenset({repeated})] if repeated else [], repeated)
+            return _Analysis([frozenset({repeated})] if repeated else [])
+        return _Analysis(inner.clauses)
+
+    if op is sre_constants.BRANCH:
+        alternatives: set[str] = set()
+        for alt in av[1]:
+            best = RequiredLiterals(tuple(_analyse_sequence(alt).clauses)).best_clause()
+            if best is None:
+                return None
+            alternatives.update(best)
+        return _Analysis([frozenset(alternatives)])
+
+    return None
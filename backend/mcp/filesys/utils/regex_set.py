@@ -0,0 +1,314 @@
+"""Match several regular expressions in a single pass over the text.
+
+``RegexSet`` joins the patterns of a query into one alternation whose branches
+are wrapped in named groups, so a file is scanned once however many patterns
+were given, and the group that took part in a match tells which pattern it
+came from.
+
+Two kinds of pattern stay out of the alternation. Patterns that cannot be
+embedded without changing their meaning (global inline flags, back-references)
+are searched on their own. So are patterns containing a required literal: the
+``regex`` engine locates such a pattern by scanning for its literal, which is
+far cheaper than trying every alternation branch at every position, and an
+alternation loses that optimisation for all of its branches.
+
+When given an automaton builder, the set also prefilters literal-bearing
+patterns and runs a pattern only when all of its required literals occur in the
+text. With many literals, they go into one Aho-Corasick automaton and a single
+scan records which of them occur. An automaton scan has a fixed cost of several
+substring searches, so a few literals are checked with ``in`` instead. Patterns
+without a usable literal are unaffected.
+
+Every set also has a byte form for searching undecoded ASCII content, so files
+can be matched straight from ``bytes`` or ``mmap`` buffers.
+"""
+
+import mmap
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, overload
+
+import ahocorasick
+import regex
+from files.backend.mcp.filesys.utils.regex_literals import extract_required_literals, max_match_width
+from loguru import logger
+
+# Back-references and conditionals address groups by number or name, which an
+# enclosing alternation would renumber or make ambiguous
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\\g<|\(\?P=|\(\?\(|\(\?&|\(\?R\)|\(\?[0-9+-]")
+
+_BRANCH_PREFIX = "_rs"
+
+# Shortest literal the engine's own literal scan is worth keeping a pattern separate for
+MIN_SCAN_LITERAL = 3
+
+# Literal count from which one automaton scan beats a substring search per literal
+AUTOMATON_MIN_LITERALS = 16
+
+# Plain characters at the start of a pattern, which the engine scans for on its own
+_LEADING_LITERAL = re.compile(r"[A-Za-z0-9_ \-:=<>\"',;/]+")
+
+# Flags understood by the standard library parser used for literal extraction
+_PARSER_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE
+
+
+@dataclass(frozen=True)
+class _Plan:
+    """Compiled search strategy over one representation (``str`` or ``bytes``) of the patterns.
+
+    Patterns are referred to by their position in the original set.
+    """
+
+    patterns: tuple[regex.Pattern, ...]
+    combined: regex.Pattern | None
+    branches: dict[str, int]
+    separate: tuple[int, ...]
+    # Required literals of prefiltered patterns, typed like the searched text
+    needles: tuple[tuple[int, tuple[tuple[str | bytes, ...], ...]], ...]
+
+
+class RegexSet(Sequence[regex.Pattern]):
+    """Compiled patterns searched together.
+
+    Behaves as a read-only sequence of the individual patterns, so code that
+    needs per-pattern spans can still iterate over them. ``search_bytes`` runs
+    byte-compiled twins of the patterns over undecoded ASCII content.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[regex.Pattern],
+        build_automaton: Callable[[list[str]], ahocorasick.Automaton] | None = None,
+    ) -> None:
+        """Combine ``patterns`` into one alternation where possible.
+
+        Args:
+            patterns: Patterns compiled with the same flags argument
+            build_automaton: Builds an automaton with ``(index, literal)`` values;
+                enables the required-literal prefilter when given
+        """
+        self._patterns = list(patterns)
+        self._guarded: list[tuple[int, tuple[frozenset[str], ...]]] = []
+        self._prefilter: ahocorasick.Automaton | None = None
+        self._literal_count = 0
+
+        separate: list[int] = []
+        joinable: list[int] = []
+        # Patterns with inline global flags differ from the flags most patterns were compiled with
+        baseline = Counter(pattern.flags for pattern in self._patterns).most_common(1)[0][0] if self._patterns else 0
+        for position, pattern in enumerate(self._patterns):
+            clauses = _prefilter_clauses(pattern) if build_automaton is not None else ()
+            if clauses:
+                self._guarded.append((position, clauses))
+            elif pattern.flags != baseline or _GROUP_REFERENCE.search(pattern.pattern) or _has_scan_literal(pattern):
+                separate.append(position)
+            else:
+                joinable.append(position)
+        if len(joinable) == 1:
+            separate.insert(0, joinable.pop())
+
+        literals = sorted({literal for _position, clauses in self._guarded for clause in clauses for literal in clause})
+        if build_automaton is not None and len(literals) >= AUTOMATON_MIN_LITERALS:
+            self._prefilter = build_automaton(literals)
+            self._literal_count = len(literals)
+
+        self._text_plan = self._plan(self._patterns, baseline, separate, joinable, str)
+        self._bytes_plan: _Plan | None = None
+        if all(pattern.pattern.isascii() for pattern in self._patterns):
+            try:
+                byte_patterns = [regex.compile(pattern.pattern.encode("ascii"), pattern.flags & ~regex.UNICODE) for pattern in self._patterns]
+                self._bytes_plan = self._plan(byte_patterns, baseline & ~regex.UNICODE, separate, joinable, bytes)
+            except regex.error as error:
+                logger.debug(f"Regex patterns have no byte form: {error}")
+
+    def _plan(
+        self,
+        patterns: list[regex.Pattern],
+        flags: int,
+        separate: list[int],
+        joinable: list[int],
+        kind: type[str] | type[bytes],
+    ) -> _Plan:
+        """Compile the alternation and needle lists for one text representation."""
+        combined = None
+        branches: dict[str, int] = {}
+        if joinable:
+            named = {f"{_BRANCH_PREFIX}{branch}": position for branch, position in enumerate(joinable)}
+            source = "|".join(f"(?P<{name}>{self._patterns[position].pattern})" for name, position in named.items())
+            try:
+                combined = regex.compile(source if kind is str else source.encode("ascii"), flags)
+                branches = named
+            except regex.error as error:
+                # Typically duplicate group names across patterns
+                logger.debug(f"Searching regex patterns separately: {error}")
+                separate = joinable + separate
+
+        needles: list[tuple[int, tuple[tuple[str | bytes, ...], ...]]] = []
+        for position, clauses in self._guarded:
+            if kind is str or self._prefilter is not None:
+                # The automaton scans a latin-1 view of byte content, where ASCII literals read the same
+                needles.append((position, tuple(tuple(clause) for clause in clauses)))
+            else:
+                needles.append((position, tuple(tuple(literal.encode("ascii") for literal in clause) for clause in clauses)))
+        return _Plan(tuple(patterns), combined, branches, tuple(separate), tuple(needles))
+
+    @overload
+    def __getitem__(self, index: int) -> regex.Pattern: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[regex.Pattern]: ...
+
+    def __getitem__(self, index: int | slice) -> regex.Pattern | Sequence[regex.Pattern]:
+        return self._patterns[index]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __iter__(self) -> Iterator[regex.Pattern]:
+        return iter(self._patterns)
+
+    @property
+    def passes(self) -> int:
+        """Number of regex or automaton scans ``search`` makes over a text containing none of the required literals."""
+        plan = self._text_plan
+        return len(plan.separate) + (plan.combined is not None) + (self._prefilter is not None)
+
+    @property
+    def max_width(self) -> int | None:
+        """Longest text any pattern can match, or None when unbounded or unknown."""
+        widths = [max_match_width(pattern.pattern, pattern.flags & _PARSER_FLAGS) for pattern in self._patterns]
+        return None if not widths or None in widths else max(width for width in widths if width is not None)
+
+    @property
+    def supports_bytes(self) -> bool:
+        """Whether every pattern has a byte form usable by ``search_bytes``."""
+        return self._bytes_plan is not None
+
+    def search(self, text: str, start_before: int | None = None) -> tuple[regex.Pattern, regex.Match] | None:
+        """Return the first pattern found in ``text`` together with its match.
+
+        Args:
+            text: Text to scan
+            start_before: Only accept matches starting before this offset
+
+        Returns:
+            ``(pattern, match)``, or None when no pattern matches
+        """
+        return self._search(self._text_plan, text, 0, len(text), start_before)
+
+    def search_bytes(
+        self,
+        data: bytes | mmap.mmap,
+        pos: int = 0,
+        endpos: int | None = None,
+        start_before: int | None = None,
+    ) -> tuple[regex.Pattern, regex.Match] | None:
+        """Like ``search`` over undecoded content (``bytes`` or ``mmap``).
+
+        Byte patterns only agree with their text forms on ASCII content, so
+        callers must check the content first; ``supports_bytes`` must be true.
+
+        Args:
+            data: ASCII content to scan
+            pos: Offset to start searching at
+            endpos: Offset to stop searching at (as in ``regex.Pattern.search``)
+            start_before: Only accept matches starting before this offset
+
+        Returns:
+            ``(pattern, match)`` with a byte match, or None when no pattern matches
+        """
+        if self._bytes_plan is None:
+            raise ValueError("Regex set has no byte form")
+        return self._search(self._bytes_plan, data, pos, len(data) if endpos is None else endpos, start_before)
+
+    def _search(self, plan: _Plan, text: Any, pos: int, endpos: int, start_before: int | None) -> tuple[regex.Pattern, regex.Match] | None:
+        # Searches return the leftmost match, so a rejected match means the pattern has no acceptable one
+        limit = endpos + 1 if start_before is None else start_before
+        if plan.combined is not None:
+            found = plan.combined.search(text, pos, endpos)
+            if found is not None and found.start() < limit:
+                return self._patterns[self._branch_of(plan, found)], found
+        for position in plan.separate:
+            found = plan.patterns[position].search(text, pos, endpos)
+            if found is not None and found.start() < limit:
+                return self._patterns[position], found
+        for position in self._eligible(plan, text, pos, endpos):
+            found = plan.patterns[position].search(text, pos, endpos)
+            if found is not None and found.start() < limit:
+                return self._patterns[position], found
+        return None
+
+    def _eligible(self, plan: _Plan, text: Any, pos: int, endpos: int) -> Iterator[int]:
+        """Yield the prefiltered patterns whose required literals all occur in ``text[pos:endpos]``."""
+        if self._prefilter is None:
+            for position, clauses in plan.needles:
+                if all(any(text.find(literal, pos, endpos) != -1 for literal in clause) for clause in clauses):
+                    yield position
+            return
+
+        present: set[str | bytes] = set()
+        whole = pos == 0 and endpos >= len(text)
+        if isinstance(text, str):
+            scanned = text if whole else text[pos:endpos]
+        else:
+            scanned = str(text if whole else text[pos:endpos], "latin-1")
+        for _end, (_idx, literal) in self._prefilter.iter(scanned):
+            if literal not in present:
+                present.add(literal)
+                if len(present) == self._literal_count:
+                    break
+        if present:
+            yield from (position for position, clauses in plan.needles if all(not present.isdisjoint(clause) for clause in clauses))
+
+    @staticmethod
+    def _branch_of(plan: _Plan, found: regex.Match) -> int:
+        """Identify the pattern whose branch produced ``found``."""
+        # The wrapping group closes after any group nested in it, so it is normally the last one
+        name = found.lastgroup
+        if name in plan.branches:
+            return plan.branches[name]
+        return next(position for name, position in plan.branches.items() if found.start(name) != -1)
+
+
+def _has_scan_literal(pattern: regex.Pattern) -> bool:
+    """Return whether ``pattern`` must contain a literal of at least ``MIN_SCAN_LITERAL`` characters."""
+    required = extract_required_literals(pattern.pattern, pattern.flags & _PARSER_FLAGS)
+    if required is None or required.ignore_case:
+        return False
+    return any(len(clause) == 1 and len(next(iter(clause))) >= MIN_SCAN_LITERAL for clause in required.clauses)
+
+
+def _prefilter_clauses(pattern: regex.Pattern) -> tuple[frozenset[str], ...]:
+    """Return the literal clauses worth prefiltering ``pattern`` on (empty when none).
+
+    Clauses with a literal shorter than ``MIN_SCAN_LITERAL`` are dropped: short
+    literals occur nearly everywhere and would only slow the prefilter. Patterns
+    that start with a literal at least as long as any required one are left to
+    the engine, whose own scan for that literal is as fast as the prefilter.
+    Case-folding patterns are not prefiltered, since their literals would
+    require a lower-cased copy of the text.
+    """
+    required = extract_required_literals(pattern.pattern, pattern.flags & _PARSER_FLAGS)
+    if required is None or required.ignore_case:
+        return ()
+    clauses = [clause for clause in required.clauses if min(len(literal) for literal in clause) >= MIN_SCAN_LITERAL]
+    # Longer literals are rarer, so checking them first rejects most texts soonest
+    clauses.sort(key=lambda clause: -min(len(literal) for literal in clause))
+    if not clauses or min(len(literal) for literal in clauses[0]) <= len(_leading_literal(pattern.pattern)):
+        # The engine already scans for a literal at least as selective as any we could check
+        return ()
+    return tuple(clauses)
+
+
+def _leading_literal(source: str) -> str:
+    """Return the plain text a pattern starts with."""
+    found = _LEADING_LITERAL.match(source)
+    if found is None:
+        return ""
+    literal = found.group()
+    # A quantifier applies to the last character only, which may then be absent
+    if source[len(literal) : len(literal) + 1] in ("?", "*", "{"):
+        literal = literal[:-1]
+    return literal
@@ -0,0 +1,107 @@
+"""Candidate orderings for searches that stop after ``max_results`` matches.
+
+A limited search returns the first matches in the order candidates are
+visited, so that order decides which files a truncated result contains. The
+default ``walk`` order is the directory walk's; ``recent`` visits the most
+recently modified files first, and ``git`` visits files with uncommitted
+changes (modified, staged or untracked) first and then the rest, each group
+most recent first. Modification times come from the stat data the workspace
+tree already holds, or from the walker's directory entries.
+"""
+
+import os
+import shutil
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+from files.backend.mcp.filesys.utils.gitignore import find_repository_root
+from files.backend.mcp.filesys.utils.tree_walker import EntryFilter, FileFilter, walk_files
+from loguru import logger
+
+SEARCH_ORDERS = ("walk", "recent", "git")
+
+# Seconds allowed for ``git status`` before falling back to plain recency
+GIT_STATUS_TIMEOUT = 10.0
+
+# Variables that would point git at another repository than the searched one
+_SANITIZED_GIT_ENV_VARS = ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_NAMESPACE", "GIT_COMMON_DIR")
+
+
+def check_search_order(order: str) -> None:
+    """Validate an ordering name.
+
+    Raises:
+        ValueError: If ``order`` is not one of ``SEARCH_ORDERS``
+    """
+    if order not in SEARCH_ORDERS:
+        raise ValueError(f"Unknown search order {order!r}; expected one of {', '.join(SEARCH_ORDERS)}")
+
+
+def git_changed_files(directory: Path) -> frozenset[str]:
+    """Return absolute paths of files below ``directory`` with uncommitted changes.
+
+    Modified, staged, renamed and untracked files are included. Outside a
+    repository, or when git is unavailable or fails, the set is empty.
+    """
+    git = shutil.which("git")
+    directory = directory.resolve()
+    repository = find_repository_root(directory)
+    if git is None or not (repository / ".git").exists():
+        return frozenset()
+    env = {key: value for key, value in os.environ.items() if key not in _SANITIZED_GIT_ENV_VARS}
+    try:
+        completed = subprocess.run(
+            [git, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", "."],
+            cwd=directory,
+            capture_output=True,
+            check=False,
+            env=env,
+            timeout=GIT_STATUS_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as error:
+        logger.warning(f"git status failed in {directory}: {error}")
+        return frozenset()
+    if completed.returncode != 0:
+        logger.warning(f"git status failed in {directory}: {completed.stderr.decode(errors='replace').strip()}")
+        return frozenset()
+
+    changed: set[str] = set()
+    records = iter(os.fsdecode(record) for record in completed.stdout.split(b"\0") if record)
+    for record in records:
+        status, path = record[:2], record[3:]
+        changed.add(os.path.join(repository, path))
+        if "R" in status or "C" in status:
+            # Renames and copies are followed by their source path
+            next(records, None)
+    return frozenset(changed)
+
+
+def order_by_recency(files: Iterable[tuple[Path, int]], changed: frozenset[str] | None = None) -> list[Path]:
+    """Sort ``(path, mtime_ns)`` pairs most recently modified first.
+
+    Args:
+        files: Candidate files with their modification times, in walk order
+        changed: Absolute paths visited before all others (see ``git_changed_files``)
+
+    Returns:
+        Paths in visiting order; ties keep walk order
+    """
+    if changed:
+        ranked = sorted(files, key=lambda item: (str(item[0]) not in changed, -item[1]))
+    else:
+        ranked = sorted(files, key=lambda item: -item[1])
+    return [path for path, _mtime_ns in ranked]
+
+
+def walk_mtimes(
+    directory: Path, ignore: EntryFilter | None = None, max_depth: int | None = None, file_filter: FileFilter | None = None
+) -> list[tuple[Path, int]]:
+    """Walk ``directory`` and pair each file with its modification time from the entry's stat data."""
+    files: list[tuple[Path, int]] = []
+    for entry in walk_files(directory, ignore=ignore, max_depth=max_depth, file_filter=file_filter):
+        try:
+            files.append((Path(entry.path), entry.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return files
@@ -0,0 +1,409 @@
+"""Server-scoped search state kept current by a tree watcher.
+
+A ``SearchWorkspace`` owns everything the search tools can reuse between calls
+for one root directory: an in-memory tree of the directories and files below
+it with their stat data (``PathTree``), a fuzzy path index over the file names,
+the trigram content index and a cache of recent ``find`` results. It is populated once in
+the background at startup and then maintained incrementally from watcher events
+and from the filesystem tools' own writes, so searches never have to rediscover
+the tree.
+"""
+
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from files.backend.mcp.filesys.utils.fuzzy_paths import FuzzyMatch, FuzzyPathIndex
+from files.backend.mcp.filesys.utils.gitignore import find_repository_root
+from files.backend.mcp.filesys.utils.path_tree import PathTree, TreeEntry
+from files.backend.mcp.filesys.utils.query_cache import QueryResultCache
+from files.backend.mcp.filesys.utils.tree_walker import DEFAULT_PRUNED_DIRS, FileFilter, relative_entry_path, walk_entries
+from files.backend.mcp.filesys.utils.tree_watcher import ChangeBatch, TreeWatcher, file_signature
+from files.backend.mcp.filesys.utils.trigram_index import TrigramIndex
+from loguru import logger
+
+# Directory names excluded from the workspace snapshot (matches the shared tree walker)
+WORKSPACE_EXCLUDED_DIRS = DEFAULT_PRUNED_DIRS
+
+# Files whose changes can alter results anywhere in the tree
+_TREE_WIDE_FILES = frozenset({".gitignore"})
+
+# Repository ignore file inside the unwatched .git directory, checked by stat when generations are read
+_INFO_EXCLUDE = os.path.join(".git", "info", "exclude")
+
+
+class SearchWorkspace:
+    """Path tree, path and content indexes and result cache for one root, maintained incrementally."""
+
+    def __init__(
+        self,
+        root: Path,
+        index: TrigramIndex | None = None,
+        watch: bool = True,
+        poll_interval: float = 2.0,
+        debounce: float = 0.1,
+        force_polling: bool = False,
+        index_save_interval: float = 30.0,
+        result_cache_size: int = 256,
+    ) -> None:
+        """Initialise the workspace without touching the disk.
+
+        Args:
+            root: Root directory served by the tools
+            index: Trigram index to keep current, if content indexing is enabled
+            watch: Whether to follow external changes with a tree watcher
+            poll_interval: Seconds between scans when the watcher has to poll
+            debounce: Seconds of quiet before watcher events are applied
+            force_polling: Use the polling watcher even where inotify is available
+            index_save_interval: Minimum seconds between index writes to disk
+            result_cache_size: Number of ``find`` results to cache, or 0 to disable caching
+        """
+        self.root = root.resolve()
+        self._root_text = str(self.root)
+        self._root_prefix = self._root_text.rstrip(os.sep) + os.sep
+        self.index = index
+        self.index_save_interval = index_save_interval
+        self._tree = PathTree()
+        self.paths: FuzzyPathIndex | None = None
+        self._deferred: list[ChangeBatch] = []
+        self.results = QueryResultCache(result_cache_size) if result_cache_size > 0 else None
+        self._generation = 0
+        self._generation_floor = 0
+        self._subtree_generations: dict[str, int] = {}
+        self._info_exclude: Path | None = None
+        self._info_exclude_signature: tuple[int, int, int] | None = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watcher = TreeWatcher(self.root, self._apply_batch, WORKSPACE_EXCLUDED_DIRS, poll_interval, debounce, force_polling) if watch else None
+        self._scan_thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the initial scan has completed."""
+        return self._ready.is_set()
+
+    @property
+    def watching(self) -> bool:
+        """Whether external changes are being followed."""
+        return self._watcher is not None
+
+    def start(self) -> None:
+        """Start the watcher and the initial background scan."""
+        if self._scan_thread is not None:
+            return
+        # Start watching first so changes made during the scan are not lost
+        if self._watcher is not None:
+            self._watcher.start()
+        self._scan_thread = threading.Thread(target=self._initial_scan, name=f"SearchWorkspace[{self.root.name}]", daemon=True)
+        self._scan_thread.start()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the initial scan has completed."""
+        return self._ready.wait(timeout)
+
+    def close(self) -> None:
+        """Stop watching and persist the index."""
+        if self._watcher is not None:
+            self._watcher.stop()
+        if self.index is not None:
+            self.index.save()
+
+    def _initial_scan(self) -> None:
+        try:
+            self._rescan()
+        except Exception as e:
+            logger.warning(f"Initial workspace scan failed for {self.root}: {e}")
+            return
+        logger.info(f"Search workspace ready for {self.root}: {len(self._tree)} files")
+
+        if self.index is not None:
+            try:
+                self.index.update(self.root / rel for rel in self._file_keys())
+                self.index.save()
+            except Exception as e:
+                logger.warning(f"Initial index build failed for {self.root}: {e}")
+
+    def _rescan(self) -> None:
+        """Rebuild the path tree from disk, replaying changes seen while scanning."""
+        tree = PathTree()
+        for entry in walk_entries(self.root, include_dirs=True, pruned_dirs=WORKSPACE_EXCLUDED_DIRS):
+            rel = relative_entry_path(entry, self._root_text)
+            try:
+                if entry.is_dir():
+                    tree.add_dir(rel)
+                else:
+                    stat = entry.stat()
+                    tree.set_file(rel, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        paths = FuzzyPathIndex(tree.files())
+        info_exclude = find_repository_root(self.root) / _INFO_EXCLUDE
+        info_exclude_signature = _signature_or_none(info_exclude)
+        with self._lock:
+            self._tree = tree
+            self.paths = paths
+            self._info_exclude = info_exclude
+            self._info_exclude_signature = info_exclude_signature
+            self._ready.set()
+            deferred, self._deferred = self._deferred, []
+        for batch in deferred:
+            self._apply_batch(batch)
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def _is_tracked_path(self, path: Path) -> bool:
+        try:
+            rel = path.relative_to(self.root)
+        except ValueError:
+            return False
+        return not WORKSPACE_EXCLUDED_DIRS.intersection(rel.parts)
+
+    def cached_stat(self, path: Path) -> tuple[int, int] | None:
+        """Return cached ``(size, mtime_ns)`` for a file, or None if unknown."""
+        if not self._is_tracked_path(path):
+            return None
+        with self._lock:
+            return self._tree.stat(self._key(path))
+
+    def files_under(self, directory: Path, max_depth: int | None = None, file_filter: FileFilter | None = None) -> list[Path] | None:
+        """List cached files below ``directory``; None until the initial scan is done.
+
+        Args:
+            directory: Directory to list
+            max_depth: List files at most this many levels below ``directory``
+            file_filter: Name and stat conditions, checked against the cached stat data
+        """
+        if not self.ready or not self.watching:
+            return None
+        directory = directory.resolve()
+        if directory != self.root and not self._is_tracked_path(directory):
+            return None
+        with self._lock:
+            keys = list(self._tree.files(self._key(directory), max_depth, file_filter.accepts if file_filter is not None else None))
+        return [self.root / rel for rel in keys]
+
+    def file_mtimes_under(self, directory: Path, max_depth: int | None = None, file_filter: FileFilter | None = None) -> list[tuple[Path, int]] | None:
+        """List cached files below ``directory`` with their modification times; see ``files_under``."""
+        if not self.ready or not self.watching:
+            return None
+        directory = directory.resolve()
+        if directory != self.root and not self._is_tracked_path(directory):
+            return None
+        with self._lock:
+            stats = list(self._tree.file_mtimes(self._key(directory), max_depth, file_filter.accepts if file_filter is not None else None))
+        return [(self.root / rel, mtime_ns) for rel, mtime_ns in stats]
+
+    def entries_under(
+        self, directory: Path, recursive: bool = True, max_depth: int | None = None, file_filter: FileFilter | None = None
+    ) -> list[TreeEntry] | None:
+        """Return cached entries below ``directory`` in scan order, like ``walk_entries(include_dirs=True)``.
+
+        Args:
+            directory: Resolved absolute directory
+            recursive: Descend into subdirectories
+            max_depth: Yield entries at most this many levels below ``directory``
+            file_filter: Yield only files meeting these conditions, checked against the cached stat data
+
+        Returns:
+            Entries with root-relative paths, or None when changes below ``directory`` are not followed
+        """
+        if not self.ready or not self.watching:
+            return None
+        key = self._tracked_key(directory)
+        if key is None:
+            return None
+        with self._lock:
+            if not self._tree.is_dir(key):
+                return None
+            # Walk under the lock: watcher updates recycle the node ids of removed entries
+            return list(self._tree.walk(key, recursive, max_depth, file_filter.accepts if file_filter is not None else None))
+
+    def fuzzy_paths(self, directory: Path, query: str, limit: int) -> list[FuzzyMatch] | None:
+        """Rank cached files below ``directory`` against a fuzzy ``query``.
+
+        Args:
+            directory: Resolved absolute directory
+            query: Characters to match in order, case-insensitively
+            limit: Number of ranked matches to return
+
+        Returns:
+            Matches with root-relative paths, or None when changes below ``directory`` are not followed
+        """
+        if not self.ready or not self.watching or self.paths is None:
+            return None
+        key = self._tracked_key(directory)
+        if key is None:
+            return None
+        return self.paths.search(query, limit, "" if key == "." else f"{key}/")
+
+    def generation(self, directory: Path) -> int | None:
+        """Return the change generation of the subtree below ``directory``.
+
+        The generation advances whenever a file or directory below it changes
+        (and everywhere when an ignore file changes), so results computed for ``directory`` stay valid while it is unchanged.
+
+        Args:
+            directory: Resolved absolute directory
+
+        Returns:
+            Generation number, or None when changes below ``directory`` are not followed
+        """
+        if not self.ready or not self.watching:
+            return None
+        key = self._tracked_key(directory)
+        if key is None:
+            return None
+        info_exclude_signature = _signature_or_none(self._info_exclude) if self._info_exclude is not None else None
+        with self._lock:
+            if info_exclude_signature != self._info_exclude_signature:
+                # The watcher does not descend into .git, so edits of the repository's exclude file are noticed here
+                self._info_exclude_signature = info_exclude_signature
+                self._generation += 1
+                self._generation_floor = self._generation
+            return max(self._generation_floor, self._subtree_generations.get(key, 0))
+
+    def touch(self, paths: Iterable[Path]) -> None:
+        """Advance the generation of every subtree containing one of ``paths``."""
+        with self._lock:
+            self._generation += 1
+            for path in paths:
+                key = self._tracked_key(path)
+                if key is None:
+                    continue
+                if path.name in _TREE_WIDE_FILES:
+                    self._generation_floor = self._generation
+                self._subtree_generations[key] = self._generation
+                while key != ".":
+                    key = key.rpartition("/")[0] or "."
+                    self._subtree_generations[key] = self._generation
+
+    def _tracked_key(self, path: Path) -> str | None:
+        """Return the root-relative key of a tracked absolute path (string operations only, for hot lookups)."""
+        text = str(path)
+        if text == self._root_text:
+            return "."
+        if not text.startswith(self._root_prefix):
+            return None
+        rel = text[len(self._root_prefix) :].replace(os.sep, "/")
+        return None if WORKSPACE_EXCLUDED_DIRS.intersection(rel.split("/")) else rel
+
+    def record_written(self, paths: Iterable[Path]) -> None:
+        """Synchronously refresh cache and index entries for files the tools wrote."""
+        changed = [path for path in paths if self._is_tracked_path(path)]
+        present: list[str] = []
+        missing: list[str] = []
+        with self._lock:
+            for path in changed:
+                key = self._key(path)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    missing.extend(self._tree.remove(key))
+                    continue
+                self._tree.set_file(key, stat.st_size, stat.st_mtime_ns)
+                present.append(key)
+            if self.paths is not None:
+                self.paths.add(present)
+                self.paths.remove(missing)
+        if self.index is not None and changed:
+            self.index.update(changed)
+            self.index.save_if_due(self.index_save_interval)
+        # Advanced last so results computed before the update can never be cached as current
+        self.touch(changed)
+
+    def record_dirs(self, paths: Iterable[Path]) -> None:
+        """Synchronously add directories the tools created (and their parents) to the tree."""
+        created = [path for path in paths if self._is_tracked_path(path)]
+        with self._lock:
+            for path in created:
+                self._tree.add_dir(self._key(path))
+        self.touch(created)
+
+    def _file_keys(self) -> list[str]:
+        with self._lock:
+            return list(self._tree.files())
+
+    def record_removed(self, paths: Iterable[Path]) -> None:
+        """Synchronously drop cache and index entries for deleted files or directories."""
+        removed = [path for path in paths if self._is_tracked_path(path)]
+        with self._lock:
+            for path in removed:
+                doomed = self._tree.remove(self._key(path))
+                if self.paths is not None:
+                    self.paths.remove(doomed)
+        if self.index is not None and removed:
+            self.index.remove(removed)
+            self.index.save_if_due(self.index_save_interval)
+        self.touch(removed)
+
+    def _apply_batch(self, batch: ChangeBatch) -> None:
+        """Apply watcher events to the cache and index."""
+        with self._lock:
+            if not self._ready.is_set():
+                self._deferred.append(batch)
+                return
+        if batch.overflow:
+            logger.info(f"Watcher events overflowed for {self.root}; rescanning")
+            self._rescan()
+            if self.index is not None:
+                self.index.update(self.root / rel for rel in self._file_keys())
+                self.index.save_if_due(self.index_save_interval)
+            with self._lock:
+                self._generation += 1
+                self._generation_floor = self._generation
+            return
+        if batch.removed:
+            self.record_removed(batch.removed)
+        if batch.changed:
+            self.record_dirs(path for path in batch.changed if os.path.isdir(path))
+            self.record_written(path for path in batch.changed if os.path.isfile(path))
+        self.touch(batch.changed | batch.removed)
+
+
+def _signature_or_none(path: Path) -> tuple[int, int, int] | None:
+    """Return the change signature of ``path``, or None when it does not exist."""
+    try:
+        return file_signature(path)
+    except OSError:
+        return None
+
+
+class _WorkspaceRegistry:
+    """Map root directories to the workspace serving them."""
+
+    def __init__(self) -> None:
+        self._workspaces: dict[Path, SearchWorkspace] = {}
+        self._lock = threading.Lock()
+
+    def register(self, workspace: SearchWorkspace) -> None:
+        with self._lock:
+            self._workspaces[workspace.root] = workspace
+
+    def unregister(self, workspace: SearchWorkspace) -> None:
+        with self._lock:
+            if self._workspaces.get(workspace.root) is workspace:
+                del self._workspaces[workspace.root]
+
+    def get(self, root: Path) -> SearchWorkspace | None:
+        with self._lock:
+            return self._workspaces.get(root.resolve())
+
+
+_WORKSPACE_REGISTRY = _WorkspaceRegistry()
+
+
+def register_workspace(workspace: SearchWorkspace) -> None:
+    """Make ``workspace`` available to tools operating on its root."""
+    _WORKSPACE_REGISTRY.register(workspace)
+
+
+def unregister_workspace(workspace: SearchWorkspace) -> None:
+    """Remove ``workspace`` from the registry if it is still the active one."""
+    _WORKSPACE_REGISTRY.unregister(workspace)
+
+
+def get_workspace(root: Path) -> SearchWorkspace | None:
+    """Return the workspace registered for ``root``, if any."""
+    return _WORKSPACE_REGISTRY.get(root)
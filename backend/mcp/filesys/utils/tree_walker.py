@@ -0,0 +1,320 @@
+"""Shared ``os.scandir`` tree walker with directory pruning.
+
+Every traversal in the filesystem tools goes through ``walk_entries``. It yields
+``os.DirEntry`` objects, so callers reuse the type information returned by the
+directory read (and the stat data cached on the entry) instead of issuing
+``is_file()``/``stat()`` calls per path, and it prunes excluded directories
+before descending into them rather than filtering their contents afterwards.
+Size, modification time and extension conditions (``FileFilter``) are checked
+on the entries as they are read, so rejected files never reach a matcher.
+"""
+
+import os
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+# Directories that are never descended into: VCS metadata, dependencies, caches
+DEFAULT_PRUNED_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv"})
+
+# Predicate deciding whether an entry (file or directory) is skipped
+EntryFilter = Callable[[os.DirEntry[str]], bool]
+
+
+@dataclass(frozen=True)
+class FileFilter:
+    """Conditions on a file's name and stat data, checked before the file is opened.
+
+    Sizes are in bytes and bounds are inclusive; times are POSIX timestamps.
+    ``extensions`` holds lower-case extensions without the leading dot.
+    """
+
+    min_size: int | None = None
+    max_size: int | None = None
+    modified_after: float | None = None
+    modified_before: float | None = None
+    extensions: frozenset[str] | None = None
+
+    @classmethod
+    def create(
+        cls,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        modified_after: float | None = None,
+        modified_before: float | None = None,
+        extensions: list[str] | None = None,
+    ) -> "FileFilter | None":
+        """Build a filter from optional conditions; None when there are none.
+
+        Raises:
+            ValueError: If a size is negative or a range is empty
+        """
+        if (min_size is not None and min_size < 0) or (max_size is not None and max_size < 0):
+            raise ValueError("File size bounds must not be negative")
+        if min_size is not None and max_size is not None and min_size > max_size:
+            raise ValueError(f"min_size ({min_size}) is larger than max_size ({max_size})")
+        if modified_after is not None and modified_before is not None and modified_after > modified_before:
+            raise ValueError("modified_after is later than modified_before")
+        normalised = frozenset(extension.lower().lstrip(".") for extension in extensions) if extensions is not None else None
+        if min_size is None and max_size is None and modified_after is None and modified_before is None and normalised is None:
+            return None
+        return cls(min_size, max_size, modified_after, modified_before, normalised)
+
+    @property
+    def needs_stat(self) -> bool:
+        """Whether the conditions depend on stat data rather than the name alone."""
+        return self.min_size is not None or self.max_size is not None or self.modified_after is not None or self.modified_before is not None
+
+    def accepts_name(self, name: str) -> bool:
+        """Check the extension condition against a file name (``""`` selects files without one)."""
+        if self.extensions is None:
+            return True
+        stem, dot, extension = name.rpartition(".")
+        return (extension.lower() if dot and stem else "") in self.extensions
+
+    def accepts_stat(self, size: int, mtime_ns: int) -> bool:
+        """Check the size and modification time conditions."""
+        if (self.min_size is not None and size < self.min_size) or (self.max_size is not None and size > self.max_size):
+            return False
+        mtime = mtime_ns / 1e9
+        if self.modified_after is not None and mtime < self.modified_after:
+            return False
+        return self.modified_before is None or mtime <= self.modified_before
+
+    def accepts(self, name: str, size: int, mtime_ns: int) -> bool:
+        """Check every condition against a file's name, size and modification time."""
+        return self.accepts_name(name) and self.accepts_stat(size, mtime_ns)
+
+    def accepts_entry(self, entry: os.DirEntry[str]) -> bool:
+        """Check a file entry, stat'ing it (once, cached on the entry) only when the name passes and stat data is needed.
+
+        Raises:
+            OSError: If the entry cannot be stat'ed
+        """
+        if not self.accepts_name(entry.name):
+            return False
+        if not self.needs_stat:
+            return True
+        stat = entry.stat()
+        return self.accepts_stat(stat.st_size, stat.st_mtime_ns)
+
+
+def walk_entries(
+    root: Path | str,
+    recursive: bool = True,
+    include_dirs: bool = False,
+    pruned_dirs: frozenset[str] = DEFAULT_PRUNED_DIRS,
+    ignore: EntryFilter | None = None,
+    max_depth: int | None = None,
+    file_filter: FileFilter | None = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Yield entries below ``root`` without descending into pruned directories.
+
+    Symlinked directories are reported but not followed, which keeps the walk
+    free of cycles; symlinks to files are reported as files.
+
+    Args:
+        root: Directory to walk
+        recursive: Descend into subdirectories
+        include_dirs: Yield directory entries as well as files
+        pruned_dirs: Directory names that are skipped entirely
+        ignore: Extra predicate; matching directories are pruned, matching files skipped
+        max_depth: Yield entries at most this many levels below ``root`` (1 lists ``root`` only)
+        file_filter: Name and stat conditions files must meet (directories are unaffected)
+
+    Yields:
+        Directory entries of regular files (and directories when requested)
+    """
+    if not recursive:
+        max_depth = 1
+    stack = [(os.fspath(root), 1)]
+    while stack:
+        directory, depth = stack.pop()
+        descend = max_depth is None or depth < max_depth
+        try:
+            with os.scandir(directory) as entries:
+                subdirs: list[tuple[str, int]] = []
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                        if is_dir:
+                            if entry.name in pruned_dirs or (ignore is not None and ignore(entry)):
+                                continue
+                            if descend and not entry.is_symlink():
+                                subdirs.append((entry.path, depth + 1))
+                            if include_dirs:
+                                yield entry
+                        elif entry.is_file() and (file_filter is None or file_filter.accepts_entry(entry)) and (ignore is None or not ignore(entry)):
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Reverse so directories are visited in the order scandir returned them
+        stack.extend(reversed(subdirs))
+
+
+def walk_files(
+    root: Path | str,
+    pruned_dirs: frozenset[str] = DEFAULT_PRUNED_DIRS,
+    ignore: EntryFilter | None = None,
+    max_depth: int | None = None,
+    file_filter: FileFilter | None = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Yield every regular file below ``root``; see ``walk_entries``."""
+    return walk_entries(root, pruned_dirs=pruned_dirs, ignore=ignore, max_depth=max_depth, file_filter=file_filter)
+
+
+def relative_entry_path(entry: os.DirEntry[str], root: str) -> str:
+    """Return the entry's path relative to ``root`` in POSIX form."""
+    rel = entry.path[len(root) :].lstrip(os.sep)
+    return rel if os.sep == "/" else rel.replace(os.sep, "/")
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str, recursive: bool = True) -> tuple[re.Pattern[str], bool]:
+    """Compile a pathlib-style glob into a regex over POSIX relative paths.
+
+    ``recursive`` gives ``Path.rglob`` semantics (the pattern may match at any
+    depth); otherwise the pattern is anchored like ``Path.glob``. ``*`` and ``?``
+    never cross ``/`` and a ``**`` segment matches any number of directories
+    (as in Python 3.12, a trailing ``**`` selects directories only).
+
+    Returns:
+        Tuple of (compiled regex, whether the pattern only matches directories)
+    """
+    dirs_only = pattern.endswith("/")
+    segments = _glob_segments(pattern)
+    body = ""
+    for position, segment in enumerate(segments):
+        last = position == len(segments) - 1
+        if segment != "**":
+            body += _translate_segment(segment) + ("" if last else "/")
+        elif not last:
+            body += "(?:[^/]+/)*"
+        else:
+            # A trailing ``**`` matches the directory itself and every directory below it
+            body = body[:-1] + "(?:/[^/]+)*" if body else "[^/]+(?:/[^/]+)*"
+            dirs_only = True
+    prefix = "(?:.*/)?" if recursive else ""
+    return re.compile(f"{prefix}{body}", re.DOTALL), dirs_only
+
+
+def glob_depth(pattern: str) -> int | None:
+    """Return how many levels below the walk root an anchored glob can match; None when ``**`` makes it unbounded."""
+    segments = _glob_segments(pattern)
+    return None if "**" in segments else max(1, len(segments))
+
+
+def _glob_segments(pattern: str) -> list[str]:
+    return [segment for segment in pattern.strip("/").split("/") if segment not in ("", ".")]
+
+
+class GlobSet:
+    """Several globs evaluated by one combined matcher during a single walk.
+
+    Each path is attributed to the first pattern that matches it, so a path
+    matched by several patterns is reported once. Anchored (non-recursive)
+    patterns also bound the walk: a literal directory prefix such as
+    ``src/pkg`` in ``src/pkg/*.py`` restricts it to that subtree, and patterns
+    without ``**`` limit how deep it descends.
+    """
+
+    def __init__(self, patterns: list[str], recursive: bool = True) -> None:
+        """Compile ``patterns`` with ``compile_glob`` semantics."""
+        self.patterns = patterns
+        self.recursive = recursive
+        compiled = [compile_glob(pattern, recursive) for pattern in patterns]
+        self._any_kind = _alternation([regex for regex, _dirs_only in compiled])
+        self._file_patterns = [index for index, (_regex, dirs_only) in enumerate(compiled) if not dirs_only]
+        self._files = _alternation([compiled[index][0] for index in self._file_patterns])
+
+    def match(self, rel: str, is_dir: bool) -> int | None:
+        """Return the index of the first pattern matching ``rel``, or None."""
+        if is_dir:
+            found = self._any_kind.fullmatch(rel) if self._any_kind is not None else None
+            return None if found is None or found.lastindex is None else found.lastindex - 1
+        found = self._files.fullmatch(rel) if self._files is not None else None
+        return None if found is None or found.lastindex is None else self._file_patterns[found.lastindex - 1]
+
+    def walk_roots(self, pruned_dirs: frozenset[str] = DEFAULT_PRUNED_DIRS, use_prefixes: bool = True) -> list[tuple[str, int | None]]:
+        """Return the disjoint ``(relative directory, max_depth)`` subtrees a walk must visit.
+
+        Recursive patterns may match at any depth and always need the whole
+        tree (``[("", None)]``). Prefixes through pruned directories are
+        dropped, since a full walk would never enter them.
+
+        Args:
+            pruned_dirs: Directory names the walk never enters
+            use_prefixes: Start walks below literal prefixes; otherwise only
+                bound the depth of one walk from the top (needed when ignore
+                rules must see every directory on the way down)
+        """
+        if self.recursive:
+            return [("", None)]
+        roots: list[tuple[list[str], int | None]] = []
+        for prefix, depth in sorted((_literal_prefix(_glob_segments(pattern)) for pattern in self.patterns), key=lambda item: len(item[0])):
+            if depth == 0 or pruned_dirs.intersection(prefix):
+                continue
+            if not use_prefixes:
+                prefix, depth = [], None if depth is None else len(prefix) + depth
+            for position, (root, root_depth) in enumerate(roots):
+                if prefix[: len(root)] == root:
+                    below = len(prefix) - len(root)
+                    merged = None if depth is None or root_depth is None else max(root_depth, below + depth)
+                    roots[position] = (root, merged)
+                    break
+            else:
+                roots.append((prefix, depth))
+        return [("/".join(root), depth) for root, depth in roots]
+
+
+def _literal_prefix(segments: list[str]) -> tuple[list[str], int | None]:
+    """Split anchored glob segments into a literal directory prefix and the depth matched below it.
+
+    The prefix is always a proper ancestor of every match: it never takes the
+    last segment, nor the one before a trailing ``**`` (which matches that
+    directory itself). The depth is None when ``**`` makes it unbounded.
+    """
+    limit = len(segments) - (2 if segments and segments[-1] == "**" else 1)
+    prefix: list[str] = []
+    for segment in segments[: max(0, limit)]:
+        if segment in ("..", "**") or any(char in segment for char in "*?["):
+            break
+        prefix.append(segment)
+    return prefix, None if "**" in segments else len(segments) - len(prefix)
+
+
+def _alternation(regexes: list[re.Pattern[str]]) -> re.Pattern[str] | None:
+    """Combine regexes into one whose ``lastindex`` names the first alternative that matched."""
+    if not regexes:
+        return None
+    return re.compile("|".join(f"({regex.pattern})" for regex in regexes), re.DOTALL)
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one glob path segment to a regex that cannot cross ``/``."""
+    out: list[str] = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", i + 1 if i < len(segment) and segment[i] in "!]" else i)
+            if end == -1:
+                out.append(re.escape(char))
+                continue
+            body = segment[i:end].replace("\\", "\\\\")
+            i = end + 1
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
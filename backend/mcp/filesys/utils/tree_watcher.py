@@ -0,0 +1,335 @@
+"""Background watcher reporting file changes below a root directory.
+
+On Linux the watcher uses inotify (through ctypes, no extra dependency) with one
+watch per directory. Elsewhere, or when inotify is unavailable or runs out of
+watches, it falls back to periodically polling stat data.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from files.backend.mcp.filesys.utils.tree_walker import walk_entries
+from loguru import logger
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+# Events on a single watched file
+_FILE_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_DELETE_SELF | _IN_MOVE_SELF
+_CHANGE_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_REMOVE_MASK = _IN_DELETE | _IN_MOVED_FROM
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+# Upper bound on how long a continuously busy tree can delay a batch
+_MAX_BATCH_DELAY = 1.0
+
+
+@dataclass
+class ChangeBatch:
+    """Coalesced file system changes delivered to the watcher callback.
+
+    ``changed`` holds files that were created or modified and directories that
+    were created, ``removed`` holds deleted files or directories. ``overflow`` signals that events were lost and
+    consumers must resynchronise from disk.
+    """
+
+    changed: set[Path] = field(default_factory=set)
+    removed: set[Path] = field(default_factory=set)
+    overflow: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed or self.overflow)
+
+
+ChangeCallback = Callable[[ChangeBatch], None]
+
+
+# Polling signature of a directory: only its creation and removal are reported
+_DIRECTORY_SIGNATURE = (-1, -1)
+
+
+def iter_tree_signatures(root: Path, exclude_dirs: frozenset[str]) -> Iterator[tuple[Path, tuple[int, int]]]:
+    """Yield every directory and regular file below ``root`` with a change signature, pruning excluded directories.
+
+    Files are signed by ``(st_size, st_mtime_ns)``; directories share one constant signature.
+    """
+    for entry in walk_entries(root, include_dirs=True, pruned_dirs=exclude_dirs):
+        try:
+            if entry.is_dir():
+                yield Path(entry.path), _DIRECTORY_SIGNATURE
+            else:
+                stat = entry.stat()
+                yield Path(entry.path), (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            continue
+
+
+class TreeWatcher:
+    """Watch a directory tree and report batched changes on a daemon thread."""
+
+    def __init__(
+        self,
+        root: Path,
+        on_change: ChangeCallback,
+        exclude_dirs: frozenset[str] = frozenset(),
+        poll_interval: float = 2.0,
+        debounce: float = 0.1,
+        force_polling: bool = False,
+    ) -> None:
+        """Initialise the watcher.
+
+        Args:
+            root: Directory to watch recursively
+            on_change: Callback receiving coalesced change batches
+            exclude_dirs: Directory names that are neither watched nor descended into
+            poll_interval: Seconds between scans when polling
+            debounce: Seconds of quiet before a batch of inotify events is delivered
+            force_polling: Skip inotify even when it is available
+        """
+        self.root = root
+        self.on_change = on_change
+        self.exclude_dirs = exclude_dirs
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.force_polling = force_polling
+        self.backend: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start watching; a no-op if already running."""
+        if self._thread is not None:
+            return
+        inotify = None if self.force_polling else _Inotify.create()
+        self.backend = "inotify" if inotify is not None else "polling"
+        target = self._run_polling if inotify is None else lambda: self._run_inotify(inotify)
+        self._thread = threading.Thread(target=target, name=f"TreeWatcher[{self.root.name}]", daemon=True)
+        self._thread.start()
+        logger.debug(f"Watching {self.root} using {self.backend}")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _deliver(self, batch: ChangeBatch) -> None:
+        if not batch:
+            return
+        try:
+            self.on_change(batch)
+        except Exception as e:
+            logger.warning(f"Tree watcher callback failed for {self.root}: {e}")
+
+    def _run_inotify(self, inotify: "_Inotify") -> None:
+        """Event loop for the inotify backend."""
+        try:
+            if not inotify.watch_tree(self.root, self.exclude_dirs):
+                logger.warning(f"inotify watch limit reached for {self.root}; falling back to polling")
+                self.backend = "polling"
+                inotify.close()
+                self._run_polling()
+                return
+
+            poller = select.poll()
+            poller.register(inotify.fd, select.POLLIN)
+            batch = ChangeBatch()
+            batch_started = 0.0
+            while not self._stop.is_set():
+                timeout_ms = int(self.debounce * 1000) if batch else 250
+                if poller.poll(timeout_ms):
+                    if not batch:
+                        batch_started = time.monotonic()
+                    inotify.read_into(batch, self.exclude_dirs)
+                    if time.monotonic() - batch_started < _MAX_BATCH_DELAY:
+                        continue
+                if batch:
+                    self._deliver(batch)
+                    batch = ChangeBatch()
+        finally:
+            inotify.close()
+
+    def _run_polling(self) -> None:
+        """Scan loop for the polling backend."""
+        snapshot = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            batch = ChangeBatch()
+            batch.changed = {path for path, signature in current.items() if snapshot.get(path) != signature}
+            batch.removed = snapshot.keys() - current.keys()
+            snapshot = current
+            self._deliver(batch)
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        return dict(iter_tree_signatures(self.root, self.exclude_dirs))
+
+
+def file_signature(path: Path) -> tuple[int, int, int]:
+    """Return ``(st_ino, st_size, st_mtime_ns)`` of ``path``, which changes when it is written to or replaced.
+
+    Raises:
+        OSError: If ``path`` cannot be stat'ed
+    """
+    stat_result = path.stat()
+    return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+def wait_for_file_change(path: Path, signature: tuple[int, int, int], timeout: float, poll_interval: float = 0.25) -> None:
+    """Block until ``path`` no longer has ``signature`` (see ``file_signature``) or ``timeout`` seconds pass.
+
+    Waits on an inotify watch of the file where available, and otherwise polls
+    its stat data every ``poll_interval`` seconds. Callers re-check the file
+    afterwards: a removed file, or an event that leaves the signature as it
+    was, also ends the wait.
+    """
+    deadline = time.monotonic() + timeout
+    inotify = _Inotify.create()
+    try:
+        if inotify is not None and inotify.add_watch(path, _FILE_WATCH_MASK) and inotify._watches:
+            # The file may have changed before the watch was added
+            if _changed(path, signature):
+                return
+            poller = select.poll()
+            poller.register(inotify.fd, select.POLLIN)
+            poller.poll(max(0.0, deadline - time.monotonic()) * 1000)
+            return
+    finally:
+        if inotify is not None:
+            inotify.close()
+
+    while not _changed(path, signature) and (remaining := deadline - time.monotonic()) > 0:
+        time.sleep(min(poll_interval, remaining))
+
+
+def _changed(path: Path, signature: tuple[int, int, int]) -> bool:
+    try:
+        return file_signature(path) != signature
+    except OSError:
+        return True
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API."""
+
+    def __init__(self, libc: ctypes.CDLL, fd: int) -> None:
+        self._libc = libc
+        self.fd = fd
+        self._watches: dict[int, Path] = {}
+
+    @classmethod
+    def create(cls) -> "_Inotify | None":
+        """Return an inotify instance, or None when the platform lacks support."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError) as error:
+            logger.debug(f"inotify unavailable: {error}")
+            return None
+        if fd < 0:
+            logger.debug(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return None
+        return cls(libc, fd)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def add_watch(self, directory: Path, mask: int = _WATCH_MASK) -> bool:
+        """Watch one directory (or file, with a file ``mask``); returns False when the kernel watch limit is hit."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                return False
+            logger.debug(f"Cannot watch {directory}: {os.strerror(err)}")
+            return True
+        self._watches[wd] = directory
+        return True
+
+    def watch_tree(self, root: Path, exclude_dirs: frozenset[str]) -> bool:
+        """Watch ``root`` and all non-excluded subdirectories."""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            if not self.add_watch(directory):
+                return False
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(Path(entry.path) for entry in entries if entry.name not in exclude_dirs and entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        return True
+
+    def read_into(self, batch: ChangeBatch, exclude_dirs: frozenset[str]) -> None:
+        """Drain pending events and merge them into ``batch``."""
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                self._handle_event(batch, wd, mask, os.fsdecode(raw_name), exclude_dirs)
+
+    def _handle_event(self, batch: ChangeBatch, wd: int, mask: int, name: str, exclude_dirs: frozenset[str]) -> None:
+        if mask & _IN_Q_OVERFLOW:
+            batch.overflow = True
+            return
+        if mask & _IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        directory = self._watches.get(wd)
+        if directory is None or not name:
+            return
+        if mask & _IN_ISDIR and name in exclude_dirs:
+            return
+
+        path = directory / name
+        if mask & _REMOVE_MASK:
+            batch.removed.add(path)
+            batch.changed.discard(path)
+        elif mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+            # New directories may already contain files by the time the watch is added
+            self.watch_tree(path, exclude_dirs)
+            batch.changed.add(path)
+            batch.changed.update(Path(entry.path) for entry in walk_entries(path, include_dirs=True, pruned_dirs=exclude_dirs))
+        elif mask & _CHANGE_MASK and not mask & _IN_ISDIR:
+            batch.changed.add(path)
+            batch.removed.discard(path)
@@ -0,0 +1,525 @@
+"""Persistent trigram index used to narrow content searches.
+
+Each indexed file contributes the set of byte trigrams of its (ASCII
+lower-cased) content. A query literal can only occur in a file whose trigram set
+contains every trigram of the literal, so intersecting posting lists yields a
+small superset of the files that can match. Matching itself is still performed
+by the search engine; the index only prunes candidates.
+
+Files are tracked with their size and modification time. Entries that no longer
+agree with the file on disk are treated as unknown and always searched, so a
+stale index degrades to a full scan instead of returning wrong results.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+from files.backend.mcp.filesys.utils.regex_literals import RequiredLiterals
+from loguru import logger
+
+INDEX_FORMAT_VERSION = 1
+
+# Minimum number of pending entries before they are merged into the base postings
+_PENDING_MERGE_THRESHOLD = 512
+
+# Entry flags
+_FLAG_INDEXED = 1
+_FLAG_OPAQUE = 0  # Unreadable, too large or not valid UTF-8: always a candidate
+
+# Case-insensitive text matches "k" with the Kelvin sign, whose bytes ``bytes.lower`` leaves alone
+_LOWER_K = ord("k")
+
+ContentQuery = Sequence[RequiredLiterals]
+
+
+def literal_trigrams(literal: str, ascii_only: bool = False) -> np.ndarray | None:
+    """Return the unique packed trigrams of a literal, or None if it is too short.
+
+    Args:
+        literal: Literal text that must occur in matching files
+        ascii_only: Drop trigrams that case-insensitive matches need not contain: those with non-ASCII
+            bytes, and those with a "k", which the Kelvin sign lower-cases to
+
+    Returns:
+        Sorted array of packed trigrams, or None when no trigram constrains the literal
+    """
+    trigrams = _packed_trigrams(literal.encode("utf-8").lower(), ascii_only)
+    return trigrams if trigrams.size else None
+
+
+def _packed_trigrams(data: bytes, ascii_only: bool = False) -> np.ndarray:
+    """Pack every trigram of ``data`` into a 24-bit integer and deduplicate."""
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    raw = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+    packed = (raw[:-2] << 16) | (raw[1:-1] << 8) | raw[2:]
+    if ascii_only:
+        keep = ((raw[:-2] | raw[1:-1] | raw[2:]) & 0x80) == 0
+        keep &= (raw[:-2] != _LOWER_K) & (raw[1:-1] != _LOWER_K) & (raw[2:] != _LOWER_K)
+        packed = packed[keep]
+    return np.unique(packed)
+
+
+class TrigramIndex:
+    """On-disk trigram index for the files below a single root directory."""
+
+    def __init__(self, root: Path, cache_dir: Path, max_file_size: int = 16 * 1024 * 1024) -> None:
+        """Initialise the index and load any persisted state.
+
+        Args:
+            root: Directory whose files are indexed
+            cache_dir: Directory holding persisted indexes
+            max_file_size: Files larger than this are never indexed
+        """
+        self.root = root.resolve()
+        self.cache_dir = cache_dir
+        self.max_file_size = max_file_size
+        digest = hashlib.sha1(str(self.root).encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+        self.index_path = cache_dir / f"trigrams-{digest}.npz"
+
+        self._lock = threading.RLock()
+        self._paths: list[str | None] = []
+        self._stats: list[tuple[int, int, int]] = []
+        self._live = bytearray()
+        self._ids: dict[str, int] = {}
+        self._base: _Postings = _empty_postings()
+        self._pending: dict[int, np.ndarray] = {}
+        self._pending_postings: _Postings | None = None
+        self._dirty = False
+        self._last_save = float("-inf")
+        self._compactions = 0
+        self._load()
+
+    @property
+    def entry_count(self) -> int:
+        """Number of files with a live index entry."""
+        with self._lock:
+            return len(self._ids)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether in-memory state differs from the persisted index."""
+        return self._dirty
+
+    def _relative(self, path: Path) -> str | None:
+        """Return the root-relative key for ``path`` or None if outside root."""
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def lookup(self, path: Path, size: int, mtime_ns: int) -> int | None:
+        """Return the entry id for ``path`` if the index is current for it.
+
+        Args:
+            path: Absolute file path
+            size: Current size of the file in bytes
+            mtime_ns: Current modification time of the file in nanoseconds
+
+        Returns:
+            Entry id, or None when the file is unknown, stale or opaque
+        """
+        rel = self._relative(path)
+        if rel is None:
+            return None
+        with self._lock:
+            entry_id = self._ids.get(rel)
+            if entry_id is None:
+                return None
+            indexed_size, indexed_mtime_ns, flag = self._stats[entry_id]
+        if flag != _FLAG_INDEXED or indexed_size != size or indexed_mtime_ns != mtime_ns:
+            return None
+        return entry_id
+
+    def snapshot(self) -> tuple[int, int]:
+        """Return a marker for the entries that exist now.
+
+        Candidate ids are only meaningful for entries that existed when they
+        were computed; see ``added_since``.
+        """
+        with self._lock:
+            return self._compactions, len(self._paths)
+
+    def added_since(self, entry_id: int, snapshot: tuple[int, int]) -> bool:
+        """Return whether ``entry_id`` may postdate ``snapshot`` (ids only grow until compaction renumbers them)."""
+        compactions, horizon = snapshot
+        with self._lock:
+            return compactions != self._compactions or entry_id >= horizon
+
+    def candidate_ids(self, query: ContentQuery) -> set[int] | None:
+        """Return ids of indexed files that may satisfy any of the requirements.
+
+        Args:
+            query: Literal requirements; a file matches when any element matches
+
+        Returns:
+            Candidate entry ids, or None when the query cannot be narrowed
+        """
+        with self._lock:
+            if not self._ids:
+                return None
+            result: set[int] = set()
+            for required in query:
+                ids = self._ids_for_requirement(required)
+                if ids is None:
+                    return None
+                live = np.frombuffer(self._live, dtype=np.bool_)
+                result.update(ids[live[ids]].tolist())
+                del live
+            return result
+
+    def _ids_for_requirement(self, required: RequiredLiterals) -> np.ndarray | None:
+        """Intersect the clauses of one requirement."""
+        current: np.ndarray | None = None
+        for clause in required.clauses:
+            clause_ids = self._ids_for_clause(clause, required.ignore_case)
+            if clause_ids is None:
+                continue
+            current = clause_ids if current is None else np.intersect1d(current, clause_ids, assume_unique=True)
+            if current.size == 0:
+                break
+        return current
+
+    def _ids_for_clause(self, clause: Iterable[str], ignore_case: bool) -> np.ndarray | None:
+        """Union the files containing any literal of the clause."""
+        parts: list[np.ndarray] = []
+        for literal in clause:
+            trigrams = literal_trigrams(literal, ascii_only=ignore_case)
+            if trigrams is None:
+                return None
+            parts.append(self._ids_for_trigrams(trigrams))
+        if not parts:
+            return None
+        return np.unique(np.concatenate(parts))
+
+    def _ids_for_trigrams(self, trigrams: np.ndarray) -> np.ndarray:
+        """Return ids of files containing every trigram."""
+        pending = self._pending_index()
+        current: np.ndarray | None = None
+        for trigram in trigrams.tolist():
+            ids = self._base.lookup(trigram)
+            if pending is not None:
+                ids = np.union1d(ids, pending.lookup(trigram))
+            current = ids if current is None else np.intersect1d(current, ids, assume_unique=True)
+            if current.size == 0:
+                break
+        return current if current is not None else np.empty(0, dtype=np.uint32)
+
+    def _pending_index(self) -> "_Postings | None":
+        """Return (and cache) posting arrays for entries not yet merged."""
+        if not self._pending:
+            return None
+        if self._pending_postings is None:
+            self._pending_postings = _Postings.from_entries(self._pending)
+        return self._pending_postings
+
+    def update(self, paths: Iterable[Path]) -> int:
+        """Re-index files whose entries are missing or stale.
+
+        Args:
+            paths: Absolute file paths below the root
+
+        Returns:
+            Number of entries that changed
+        """
+        changed = 0
+        for path in paths:
+            rel = self._relative(path)
+            if rel is None:
+                continue
+            try:
+                stat_result = path.stat()
+            except OSError:
+                changed += self.remove([path])
+                continue
+
+            with self._lock:
+                entry_id = self._ids.get(rel)
+                if entry_id is not None:
+                    size, mtime_ns, _flag = self._stats[entry_id]
+                    if size == stat_result.st_size and mtime_ns == stat_result.st_mtime_ns:
+                        continue
+
+            trigrams = self._read_trigrams(path, stat_result)
+            with self._lock:
+                self._store(rel, stat_result, trigrams)
+            changed += 1
+        return changed
+
+    def remove(self, paths: Iterable[Path]) -> int:
+        """Drop entries for deleted files (and everything below deleted directories)."""
+        removed = 0
+        with self._lock:
+            for path in paths:
+                rel = self._relative(path)
+                if rel is None:
+                    continue
+                prefix = f"{rel}/" if rel != "." else ""
+                doomed = [key for key in self._ids if key == rel or key.startswith(prefix)]
+                for key in doomed:
+                    self._tombstone(self._ids.pop(key))
+                    removed += 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def _read_trigrams(self, path: Path, stat_result: os.stat_result) -> np.ndarray | None:
+        """Read a file and compute its trigram set; None marks it opaque."""
+        if stat_result.st_size > self.max_file_size:
+            return None
+        try:
+            data = path.read_bytes()
+            data.decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        return _packed_trigrams(data.lower())
+
+    def _store(self, rel: str, stat_result: os.stat_result, trigrams: np.ndarray | None) -> None:
+        """Record a fresh entry for ``rel``, superseding any previous one."""
+        previous = self._ids.get(rel)
+        if previous is not None:
+            self._tombstone(previous)
+
+        entry_id = len(self._paths)
+        self._paths.append(rel)
+        self._live.append(1)
+        flag = _FLAG_INDEXED if trigrams is not None else _FLAG_OPAQUE
+        self._stats.append((stat_result.st_size, stat_result.st_mtime_ns, flag))
+        self._ids[rel] = entry_id
+        if trigrams is not None and trigrams.size:
+            self._pending[entry_id] = trigrams
+            self._pending_postings = None
+        self._dirty = True
+
+        # Merge geometrically so building a large index stays linear overall
+        if len(self._pending) >= max(_PENDING_MERGE_THRESHOLD, len(self._ids) // 4):
+            self._merge_pending()
+
+    def _tombstone(self, entry_id: int) -> None:
+        self._paths[entry_id] = None
+        self._live[entry_id] = 0
+        if self._pending.pop(entry_id, None) is not None:
+            self._pending_postings = None
+
+    def _merge_pending(self) -> None:
+        """Fold pending per-file postings into the compact base arrays."""
+        pending = self._pending_index()
+        if pending is None:
+            return
+        self._base = _Postings.merge(self._base, pending)
+        self._pending.clear()
+        self._pending_postings = None
+
+    def _compact(self) -> None:
+        """Renumber live entries so tombstones stop occupying space."""
+        live = [i for i, rel in enumerate(self._paths) if rel is not None]
+        if len(live) == len(self._paths):
+            return
+        remap = np.full(len(self._paths), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        keys, ids = self._base.pairs()
+        mapped = remap[ids]
+        keep = mapped >= 0
+        self._paths = [self._paths[i] for i in live]
+        self._stats = [self._stats[i] for i in live]
+        self._live = bytearray(b"\x01" * len(live))
+        self._ids = {rel: new_id for new_id, rel in enumerate(self._paths) if rel is not None}
+        self._base = _Postings.from_pairs(keys[keep], mapped[keep].astype(np.uint32))
+        self._compactions += 1
+
+    def save_if_due(self, min_interval: float) -> None:
+        """Persist pending changes unless the index was written recently."""
+        if self._dirty and time.monotonic() - self._last_save >= min_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Persist the index atomically if it has unsaved changes."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._last_save = time.monotonic()
+            self._merge_pending()
+            self._compact()
+            meta = {
+                "version": INDEX_FORMAT_VERSION,
+                "root": str(self.root),
+                "paths": self._paths,
+                "stats": self._stats,
+            }
+            meta_bytes = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+            base = self._base
+            self._dirty = False
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+            with tmp_path.open("wb") as handle:
+                np.savez(handle, meta=meta_bytes, keys=base.keys, offsets=base.offsets, postings=base.ids)
+            tmp_path.replace(self.index_path)
+        except OSError as error:
+            logger.warning(f"Unable to persist trigram index {self.index_path}: {error}")
+            with self._lock:
+                self._dirty = True
+
+    def _load(self) -> None:
+        """Load persisted state, discarding it when unreadable or incompatible."""
+        if not self.index_path.exists():
+            return
+        try:
+            with np.load(self.index_path, allow_pickle=False) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                if meta.get("version") != INDEX_FORMAT_VERSION or meta.get("root") != str(self.root):
+                    logger.info(f"Discarding incompatible trigram index {self.index_path}")
+                    return
+                base = _Postings(
+                    data["keys"].astype(np.uint32),
+                    data["offsets"].astype(np.int64),
+                    data["postings"].astype(np.uint32),
+                )
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning(f"Discarding unreadable trigram index {self.index_path}: {error}")
+            return
+
+        self._paths = list(meta["paths"])
+        self._stats = [(int(size), int(mtime_ns), int(flag)) for size, mtime_ns, flag in meta["stats"]]
+        self._live = bytearray(0 if rel is None else 1 for rel in self._paths)
+        self._ids = {rel: entry_id for entry_id, rel in enumerate(self._paths) if rel is not None}
+        self._base = base
+
+
+class _Postings:
+    """Sorted trigram keys with CSR-style offsets into a flat id array."""
+
+    __slots__ = ("ids", "keys", "offsets")
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, ids: np.ndarray) -> None:
+        self.keys = keys
+        self.offsets = offsets
+        self.ids = ids
+
+    @classmethod
+    def from_pairs(cls, keys: np.ndarray, ids: np.ndarray) -> "_Postings":
+        """Build postings from parallel (trigram, id) arrays."""
+        order = np.lexsort((ids, keys))
+        sorted_keys = keys[order]
+        unique_keys, starts = np.unique(sorted_keys, return_index=True)
+        offsets = np.append(starts, sorted_keys.size).astype(np.int64)
+        return cls(unique_keys.astype(np.uint32), offsets, ids[order].astype(np.uint32))
+
+    @classmethod
+    def from_entries(cls, entries: dict[int, np.ndarray]) -> "_Postings":
+        """Build postings from per-entry trigram arrays."""
+        keys = np.concatenate(list(entries.values()))
+        ids = np.concatenate([np.full(grams.size, entry_id, dtype=np.uint32) for entry_id, grams in entries.items()])
+        return cls.from_pairs(keys, ids)
+
+    @classmethod
+    def merge(cls, first: "_Postings", second: "_Postings") -> "_Postings":
+        """Combine two posting sets."""
+        first_keys, first_ids = first.pairs()
+        second_keys, second_ids = second.pairs()
+        return cls.from_pairs(np.concatenate([first_keys, second_keys]), np.concatenate([first_ids, second_ids]))
+
+    def pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """Expand to parallel (trigram, id) arrays."""
+        return np.repeat(self.keys, np.diff(self.offsets)), self.ids
+
+    def lookup(self, trigram: int) -> np.ndarray:
+        """Return the sorted ids posted under ``trigram``."""
+        position = int(np.searchsorted(self.keys, trigram))
+        if position < self.keys.size and int(self.keys[position]) == trigram:
+            return self.ids[self.offsets[position] : self.offsets[position + 1]]
+        return np.empty(0, dtype=np.uint32)
+
+
+def _empty_postings() -> _Postings:
+    return _Postings(np.empty(0, dtype=np.uint32), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.uint32))
+
+
+class _TrigramIndexRegistry:
+    """Share open trigram indexes across searches within the process."""
+
+    def __init__(self) -> None:
+        self._indexes: dict[tuple[Path, Path], TrigramIndex] = {}
+        self._lock = threading.Lock()
+
+    def open(self, root: Path, cache_dir: Path, max_file_size: int) -> TrigramIndex:
+        """Return the shared index for ``root``, loading it on first use."""
+        key = (root.resolve(), cache_dir)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = TrigramIndex(root, cache_dir, max_file_size)
+                self._indexes[key] = index
+            return index
+
+    def index_paths(self) -> set[Path]:
+        """Return the persistence paths of the indexes open in this process."""
+        with self._lock:
+            return {index.index_path for index in self._indexes.values()}
+
+
+_INDEX_REGISTRY = _TrigramIndexRegistry()
+
+
+def open_trigram_index(root: Path, cache_dir: Path, max_file_size: int = 16 * 1024 * 1024) -> TrigramIndex:
+    """Return the process-wide trigram index for ``root``."""
+    return _INDEX_REGISTRY.open(root, cache_dir, max_file_size)
+
+
+def evict_trigram_indexes(cache_dir: Path, max_indexes: int, max_age: float) -> int:
+    """Delete persisted indexes that are no longer worth keeping.
+
+    Indexes open in this process are kept. Of the others, those whose root no
+    longer exists, that cannot be read or that were last written more than
+    ``max_age`` seconds ago are deleted, and then the least recently written
+    beyond ``max_indexes``.
+
+    Returns:
+        Number of index files deleted
+    """
+    open_paths = _INDEX_REGISTRY.index_paths()
+    cutoff = time.time() - max_age
+    kept: list[tuple[float, Path]] = []
+    evicted: list[Path] = []
+    for path in cache_dir.glob("trigrams-*.npz"):
+        if path in open_paths:
+            continue
+        try:
+            written = path.stat().st_mtime
+        except OSError:
+            continue
+        root = _indexed_root(path) if written >= cutoff else None
+        if root is None or not Path(root).is_dir():
+            evicted.append(path)
+        else:
+            kept.append((written, path))
+    kept.sort(reverse=True)
+    evicted.extend(path for _written, path in kept[max(0, max_indexes) :])
+
+    removed = 0
+    for path in evicted:
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as error:
+            logger.warning(f"Unable to evict trigram index {path}: {error}")
+    if removed:
+        logger.info(f"Evicted {removed} trigram indexes from {cache_dir}")
+    return removed
+
+
+def _indexed_root(path: Path) -> str | None:
+    """Return the root recorded in a persisted index, or None when it cannot be read."""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            root = json.loads(data["meta"].tobytes().decode("utf-8")).get("root")
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+    return root if isinstance(root, str) else None
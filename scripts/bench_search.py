@@ -0,0 +1,206 @@
+"""Benchmark FastFileSearcher engines against worker count.
+
+Generates a synthetic source tree and times the same search on the thread and
+process engines for 1, 2, 4, ... workers up to the CPU count, so the scaling of
+each engine can be compared directly. A second table times regex queries with
+and without the required-literal prefilter, and a third compares searching
+large log files as raw bytes against decoding them, in time and peak memory.
+
+Usage:
+    python scripts/bench_search.py [--files 4000] [--repeat 3] [--pattern REGEX] [--logs 6] [--log-mb 16]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Make the ``files`` package importable when run from a checkout
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher, shutdown_search_processes
+from files.backend.mcp.filesys.utils.regex_set import RegexSet
+
+# Regex queries for the prefilter comparison: single patterns and a multi-pattern set
+PREFILTER_QUERIES = (
+    [r"def\s+handle_\w+"],
+    [r"\s+return\s+None"],
+    [r"\w+_\d+\(missing\)"],
+    [r"raise\s+\w+Error", r"class\s+\w+Handler", r"TODO\s*:", r"import\s+missing", r"handler_\w+\s+\d+"],
+)
+
+# Content queries for the log comparison: (label, keywords, regex mode)
+LOG_QUERIES = (
+    ("literal", ["connection reset by peer"], False),
+    ("regex", [r"timeout after \d{4,}ms"], True),
+)
+
+LOG_LEVELS = ("INFO", "DEBUG", "WARN", "ERROR")
+
+WORDS = ("alpha", "beta", "gamma", "delta", "request", "handler", "config", "value", "result", "error")
+
+
+def build_corpus(root: Path, file_count: int, lines_per_file: int, seed: int = 7) -> None:
+    """Write ``file_count`` pseudo-source files spread over nested directories."""
+    rng = random.Random(seed)
+    for i in range(file_count):
+        directory = root / f"pkg_{i % 37}" / f"mod_{i % 11}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = [f"def {rng.choice(WORDS)}_{j}({rng.choice(WORDS)}): return {rng.choice(WORDS)}_{rng.randint(0, 9999)}" for j in range(lines_per_file)]
+        if i % 50 == 0:
+            lines.append("raise ValueError('unexpected handler_result 42')")
+        (directory / f"file_{i}.py").write_text("\n".join(lines), encoding="utf-8")
+
+
+def build_logs(root: Path, count: int, megabytes: int, seed: int = 11) -> None:
+    """Write ``count`` ASCII log files of roughly ``megabytes`` each."""
+    rng = random.Random(seed)
+    for i in range(count):
+        with (root / f"service_{i}.log").open("w", encoding="utf-8") as handle:
+            written = 0
+            while written < megabytes * 1_000_000:
+                line = (
+                    f"2026-10-14T12:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} {rng.choice(LOG_LEVELS)} worker-{rng.randint(1, 64)} "
+                    f"request id={rng.randint(0, 10**9)} took {rng.randint(1, 999)}ms path=/api/v1/items/{rng.randint(1, 10**6)}\n"
+                )
+                handle.write(line)
+                written += len(line)
+
+
+def measure(search: Callable[[Path], bool], files: list[Path]) -> tuple[float, float, int]:
+    """Return wall time, traced peak memory in MB and match count for searching ``files``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    matches = sum(search(file_path) for file_path in files)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak, matches
+
+
+async def time_search(searcher: FastFileSearcher, root: Path, patterns: list[str], regex_mode: bool, repeat: int) -> tuple[float, int]:
+    """Return the best wall time over ``repeat`` runs and the result count."""
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = await searcher.search_files(root, content_keywords=patterns, regex_mode=regex_mode, max_results=1_000_000)
+        best = min(best, time.perf_counter() - start)
+        count = len(results)
+    return best, count
+
+
+def worker_counts(limit: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+async def run(args: argparse.Namespace) -> None:
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        build_corpus(root, args.files, args.lines)
+        print(f"corpus: {args.files} files x {args.lines} lines, cpus={cpus}, pattern={args.pattern!r} (regex={not args.literal})")
+        print(f"{'workers':>7}  {'thread s':>9}  {'process s':>9}  {'speedup':>7}  {'matches':>7}")
+
+        for workers in worker_counts(args.max_workers or cpus):
+            timings = {}
+            matches = 0
+            for engine in ("thread", "process"):
+                searcher = FastFileSearcher(max_workers=workers, engine=engine)
+                try:
+                    # Warm up: starts worker processes and fills the page cache
+                    await searcher.search_files(root, content_keywords=[args.pattern], regex_mode=not args.literal, max_results=1)
+                    timings[engine], matches = await time_search(searcher, root, [args.pattern], not args.literal, args.repeat)
+                finally:
+                    searcher.close()
+            print(f"{workers:>7}  {timings['thread']:>9.3f}  {timings['process']:>9.3f}  {timings['thread'] / timings['process']:>6.2f}x  {matches:>7}")
+            shutdown_search_processes()
+
+        await run_prefilter(root, args, cpus)
+
+    if args.logs:
+        run_read_path(args)
+
+
+async def run_prefilter(root: Path, args: argparse.Namespace, cpus: int) -> None:
+    """Time regex queries with the required-literal prefilter off and on."""
+    print(f"\n{'query':<48}  {'plain s':>9}  {'prefilter s':>11}  {'speedup':>7}  {'matches':>7}")
+    for patterns in PREFILTER_QUERIES:
+        timings = {}
+        matches = 0
+        for prefilter in (False, True):
+            searcher = FastFileSearcher(max_workers=args.max_workers or cpus, regex_prefilter=prefilter)
+            try:
+                await searcher.search_files(root, content_keywords=patterns, regex_mode=True, max_results=1)
+                timings[prefilter], matches = await time_search(searcher, root, patterns, True, args.repeat)
+            finally:
+                searcher.close()
+        label = " | ".join(patterns)
+        label = label if len(label) <= 48 else f"{label[:45]}..."
+        print(f"{label:<48}  {timings[False]:>9.3f}  {timings[True]:>11.3f}  {timings[False] / timings[True]:>6.2f}x  {matches:>7}")
+
+
+def run_read_path(args: argparse.Namespace) -> None:
+    """Compare decoding log files to text against searching their raw bytes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        build_logs(root, args.logs, args.log_mb)
+        files = sorted(root.iterdir())
+        total_mb = sum(file_path.stat().st_size for file_path in files) / 1e6
+        print(f"\nlogs: {len(files)} files, {total_mb:.0f} MB total (single thread, peak traced Python memory)")
+        print(f"{'query':<8}  {'decode s':>9}  {'decode MB':>9}  {'bytes s':>8}  {'bytes MB':>8}  {'MB/s':>7}  {'speedup':>7}")
+
+        searcher = FastFileSearcher(max_workers=1)
+        try:
+            for label, keywords, regex_mode in LOG_QUERIES:
+                _path_literals, _path_regex, literals, patterns, _query = searcher._prepare_matchers(None, keywords, regex_mode)
+
+                def decoded(file_path: Path, literals: Any = literals, patterns: RegexSet | None = patterns) -> bool:
+                    # The former read path: decode every file before matching
+                    content = file_path.read_text(encoding="utf-8", errors="ignore")
+                    if literals is not None and literals.search(content):
+                        return True
+                    return patterns is not None and patterns.search(content) is not None
+
+                def raw(file_path: Path, literals: Any = literals, patterns: RegexSet | None = patterns) -> bool:
+                    return searcher._search_file_content(file_path, literals, patterns)
+
+                decode_s, decode_mb, decode_matches = measure(decoded, files)
+                bytes_s, bytes_mb, bytes_matches = measure(raw, files)
+                if decode_matches != bytes_matches:
+                    print(f"warning: {label} match counts differ ({decode_matches} vs {bytes_matches})")
+                print(
+                    f"{label:<8}  {decode_s:>9.3f}  {decode_mb:>9.1f}  {bytes_s:>8.3f}  {bytes_mb:>8.1f}  "
+                    f"{total_mb / bytes_s:>7.0f}  {decode_s / bytes_s:>6.2f}x"
+                )
+        finally:
+            searcher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark search engines against worker count")
+    parser.add_argument("--files", type=int, default=4000, help="Number of files in the synthetic corpus")
+    parser.add_argument("--lines", type=int, default=200, help="Lines per generated file")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per configuration (best is reported)")
+    parser.add_argument("--pattern", default=r"handler_\w+\s+\d+", help="Content pattern to search for")
+    parser.add_argument("--literal", action="store_true", help="Treat the pattern as a literal keyword")
+    parser.add_argument("--max-workers", type=int, default=0, help="Largest worker count to test (default: CPU count)")
+    parser.add_argument("--logs", type=int, default=6, help="Log files for the read-path comparison (0 to skip)")
+    parser.add_argument("--log-mb", type=int, default=16, help="Approximate size of each log file in MB")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Shared fixtures for unit tests."""
+
+from pathlib import Path
+
+import pytest
+from files.backend.config.loader import files_config
+from files.backend.mcp.filesys.utils import file_classes
+
+
+@pytest.fixture(autouse=True)
+def search_cache_dir(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Persist trigram indexes and file classifications below a temporary directory instead of the user's cache."""
+    cache_dir = tmp_path_factory.mktemp("search-cache")
+    index_config = files_config.get_search_index_config()
+    monkeypatch.setattr(files_config, "get_search_index_config", lambda: {**index_config, "cache_dir": str(cache_dir)})
+    # The shared classification cache picks up the cache directory when it is first used
+    monkeypatch.setattr(file_classes, "_SHARED_CACHE", None)
+    return cache_dir
@@ -0,0 +1,189 @@
+"""Tests for byte-level content search."""
+
+import itertools
+import mmap
+from pathlib import Path
+
+import pytest
+import regex
+from files.backend.mcp.filesys.utils import byte_search, fast_search
+from files.backend.mcp.filesys.utils.byte_search import LiteralSet, build_automaton, decode_content, is_ascii, open_content, scan_windows
+from files.backend.mcp.filesys.utils.fast_search import REGEX_FLAGS, FastFileSearcher
+from files.backend.mcp.filesys.utils.regex_set import RegexSet
+
+
+class TestOpenContent:
+    """Validate how file content is loaded."""
+
+    def test_small_files_are_read(self, tmp_path: Path) -> None:
+        """Files below the threshold come back as bytes."""
+        path = tmp_path / "small.txt"
+        path.write_bytes(b"hello")
+        with open_content(path) as data:
+            assert data == b"hello"
+
+    def test_large_files_are_mapped(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Files at or above the threshold are memory-mapped."""
+        monkeypatch.setattr(byte_search, "MMAP_MIN_SIZE", 4)
+        path = tmp_path / "large.log"
+        path.write_bytes("café latte\n".encode())
+        with open_content(path) as data:
+            assert isinstance(data, mmap.mmap)
+            assert not is_ascii(data)
+            assert decode_content(data) == "café latte\n"
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Empty files are read, not mapped."""
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        with open_content(path) as data:
+            assert data == b""
+            assert is_ascii(data)
+
+
+class TestLiteralSet:
+    """Validate literal matching on raw bytes."""
+
+    def test_matches_utf8_keywords(self) -> None:
+        """Keywords are matched by their UTF-8 encoding."""
+        literals = LiteralSet(["café", "latte"], build_automaton)
+
+        assert literals.search_bytes("un café".encode())
+        assert not literals.search_bytes(b"un cafe")
+        assert literals.search("une latte")
+
+    def test_many_keywords_use_one_automaton(self) -> None:
+        """Large keyword sets are matched with an automaton over the bytes."""
+        keywords = [f"keyword_{i}" for i in range(20)] + ["naïve"]
+        literals = LiteralSet(keywords, build_automaton)
+
+        assert literals.search_bytes(b"x keyword_17 y")
+        assert literals.search_bytes("a naïve test".encode())
+        assert not literals.search_bytes(b"keyword_ only")
+
+    def test_ignore_case(self) -> None:
+        """Folded keywords match any letter case, on bytes and on text."""
+        ascii_literals = LiteralSet(["Needle"], build_automaton, ignore_case=True)
+        assert ascii_literals.search_bytes(b"a NEEDLE here")
+        assert ascii_literals.search("a needle here")
+        assert not ascii_literals.search_bytes(b"a noodle here")
+
+        accented = LiteralSet(["CAFÉ"], build_automaton, ignore_case=True)
+        assert accented.search_bytes("un Café noir".encode())
+        assert list(accented.iter_spans("un café")) == [(3, 7, "CAFÉ")]
+
+    @pytest.mark.parametrize("keywords", [["Kelvin"], ["KELVIN", "Grad"], [f"kelvin{i}" for i in range(20)], ["Kelvin", "CAFÉ"]])
+    def test_ignore_case_bytes_fold_like_text(self, keywords: list[str]) -> None:
+        """Byte searches lower-case as the locator does, so the Kelvin sign matches "k" in both."""
+        literals = LiteralSet(keywords, build_automaton, ignore_case=True)
+        text = f"temperature in \u212a{keywords[0][1:]} and more"
+        spans = list(literals.iter_spans(text))
+
+        assert literals.search_bytes(text.encode())
+        assert spans
+        assert spans[0][2] == keywords[0]
+        assert not literals.search_bytes("temperature in \u212aalvin".encode())
+
+    def test_whole_word(self) -> None:
+        """Hits adjoined by letters, digits or underscores are rejected, and the scan continues past them."""
+        literals = LiteralSet(["test"], build_automaton, whole_word=True)
+        assert not literals.search_bytes(b"testing my_test test2")
+        assert literals.search_bytes(b"testing (test)")
+        assert not literals.search_bytes("étest".encode())
+        assert [span[:2] for span in literals.iter_spans("tests test_ test.")] == [(12, 16)]
+
+    def test_modes_combined_on_the_automaton(self) -> None:
+        """Large keyword sets apply both modes to the single automaton scan."""
+        keywords = [f"Keyword{i}" for i in range(20)]
+        literals = LiteralSet(keywords, build_automaton, ignore_case=True, whole_word=True)
+
+        assert literals.search_bytes(b"x KEYWORD17 y")
+        assert not literals.search_bytes(b"x keyword17y keyword3_")
+        assert literals.search_bytes(b"xxxxxxxx keyword3.", start=8)
+
+
+class TestRegexSetBytes:
+    """Validate byte-compiled regex twins."""
+
+    def test_byte_search_agrees_on_ascii(self) -> None:
+        """Byte patterns find the same matches as text patterns on ASCII content."""
+        patterns = [regex.compile(source, REGEX_FLAGS) for source in (r"timeout after \d+ms", r"\w+_\d+\(missing\)")]
+        regex_set = RegexSet(patterns, build_automaton)
+
+        assert regex_set.supports_bytes
+        found = regex_set.search_bytes(b"warn: load_7(missing)\n")
+        assert found is not None
+        assert found[0] is patterns[1]
+        assert found[1].group() == b"load_7(missing)"
+        assert regex_set.search_bytes(b"timeout after ms") is None
+
+    def test_non_ascii_patterns_have_no_byte_form(self) -> None:
+        """Patterns with non-ASCII source are only searched as text."""
+        regex_set = RegexSet([regex.compile(r"café\s+\w+", REGEX_FLAGS)])
+
+        assert not regex_set.supports_bytes
+        with pytest.raises(ValueError):
+            regex_set.search_bytes(b"cafe")
+
+
+class TestScanWindows:
+    """Validate windowed scanning of large mapped files."""
+
+    @pytest.fixture
+    def small_windows(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(byte_search, "MMAP_MIN_SIZE", 1)
+        monkeypatch.setattr(byte_search, "SCAN_WINDOW", 64)
+        monkeypatch.setattr(fast_search, "WINDOW_MIN_SIZE", 1)
+
+    def _matches(self, path: Path, keywords: list[str] | None = None, patterns: list[str] | None = None) -> bool:
+        literals = LiteralSet(keywords, build_automaton) if keywords else None
+        regex_set = RegexSet([regex.compile(source, REGEX_FLAGS) for source in patterns], build_automaton) if patterns else None
+        with open_content(path) as data:
+            assert isinstance(data, mmap.mmap)
+            return FastFileSearcher._content_matches(data, literals, regex_set)
+
+    def test_windows_cover_the_file_on_character_boundaries(self, tmp_path: Path, small_windows: None) -> None:
+        """Windows tile the file and never split a UTF-8 character."""
+        path = tmp_path / "big.txt"
+        path.write_bytes(("é" * 100).encode())
+        with open_content(path) as data:
+            assert isinstance(data, mmap.mmap)
+            windows = list(scan_windows(data, 8, window=33))
+
+        assert windows[0][0] == 0
+        assert windows[-1][1] == 200
+        assert all(end == next_start for (_, end, _), (next_start, _, _) in itertools.pairwise(windows))
+        assert all(end % 2 == 0 and stop <= 200 for _, end, stop in windows)
+
+    def test_literal_across_window_boundary(self, tmp_path: Path, small_windows: None) -> None:
+        """A keyword straddling two windows is found."""
+        path = tmp_path / "big.log"
+        path.write_bytes(b"x" * 60 + b"needle" + b"y" * 200)
+
+        assert self._matches(path, keywords=["needle"])
+        assert not self._matches(path, keywords=["needles"])
+
+    def test_regex_across_window_boundary(self, tmp_path: Path, small_windows: None) -> None:
+        """A bounded regex match straddling two windows is found."""
+        path = tmp_path / "big.log"
+        path.write_bytes(b"x " * 30 + b"code=12345 " + b"y " * 100)
+
+        assert self._matches(path, patterns=[r"code=\d{5}\b"])
+        assert not self._matches(path, patterns=[r"code=\d{6}"])
+
+    def test_window_end_is_not_an_anchor(self, tmp_path: Path, small_windows: None) -> None:
+        """Anchors and word boundaries see the text past the window."""
+        path = tmp_path / "big.log"
+        path.write_bytes(b"a" * 63 + b"bcd" + b"a" * 200)
+
+        assert not self._matches(path, patterns=[r"\w+bc\b"])
+        assert not self._matches(path, patterns=[r"[a-z]+b$"])
+
+    def test_non_ascii_windows(self, tmp_path: Path, small_windows: None) -> None:
+        """Windows of non-ASCII content are decoded before regex matching."""
+        path = tmp_path / "big.txt"
+        path.write_bytes(("é" * 40 + " naïve_42 " + "ü" * 100).encode())
+
+        assert self._matches(path, patterns=[r"na\wve_\d+"])
+        assert self._matches(path, keywords=["naïve"])
+        assert not self._matches(path, patterns=[r"naive_\d+"])
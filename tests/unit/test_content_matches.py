@@ -0,0 +1,70 @@
+"""Tests for match location and search result formatting."""
+
+import regex
+from files.backend.mcp.filesys.utils.byte_search import build_automaton
+from files.backend.mcp.filesys.utils.content_matches import FileMatches, locate_matches
+from files.backend.mcp.filesys.utils.file_formatter import FileFormatter
+
+
+class TestLocateMatches:
+    """Test locate_matches positions and context."""
+
+    def test_lines_columns_and_byte_offsets(self) -> None:
+        """Test that positions are 1-based lines/columns and UTF-8 byte offsets."""
+        content = "first line\nsecond ünïcode needle\nthird\nneedle again"
+        found = locate_matches("f.txt", content, build_automaton(["needle"]), None, context_lines=0)
+
+        assert [(m.line, m.column) for m in found.matches] == [(2, 16), (4, 1)]
+        for match in found.matches:
+            assert content.encode("utf-8")[match.byte_offset : match.byte_offset + 6] == b"needle"
+        assert found.context == {2: "second ünïcode needle", 4: "needle again"}
+
+    def test_multiple_keywords_and_regex_sorted_by_position(self) -> None:
+        """Test that automaton and regex matches are merged in file order."""
+        content = "alpha\nbeta 42\ngamma alpha"
+        patterns = [regex.compile(r"\d+")]
+        found = locate_matches("f.txt", content, build_automaton(["alpha", "gamma"]), patterns, context_lines=0)
+
+        assert [(m.line, m.keyword, m.text) for m in found.matches] == [
+            (1, "alpha", "alpha"),
+            (2, r"\d+", "42"),
+            (3, "gamma", "gamma"),
+            (3, "alpha", "alpha"),
+        ]
+
+    def test_context_window_clipped_at_file_edges(self) -> None:
+        """Test that context stops at the first and last lines."""
+        content = "\n".join(f"line {i}" for i in range(1, 8))
+        found = locate_matches("f.txt", content, build_automaton(["line 1", "line 7"]), None, context_lines=2)
+
+        assert sorted(found.context) == [1, 2, 3, 5, 6, 7]
+
+    def test_max_matches_sets_truncated(self) -> None:
+        """Test that matches beyond the cap are dropped and flagged."""
+        content = "x\n" * 50
+        found = locate_matches("f.txt", content, build_automaton(["x"]), None, context_lines=0, max_matches=5)
+
+        assert len(found.matches) == 5
+        assert found.truncated
+        assert [m.line for m in found.matches] == [1, 2, 3, 4, 5]
+
+
+class TestFormatSearchResults:
+    """Test FileFormatter.format_search_results."""
+
+    def test_merges_overlapping_context(self) -> None:
+        """Test that nearby matches share one context block and gaps show ellipses."""
+        content = "\n".join(f"row {i}" for i in range(1, 21))
+        found = locate_matches("rows.txt", content, build_automaton(["row 5", "row 6", "row 15"]), None, context_lines=1)
+
+        lines = FileFormatter.format_search_results(found).splitlines()
+
+        assert lines[0] == "=== rows.txt ==="
+        assert lines.count("  ...") == 2
+        assert [line for line in lines if line.startswith(">")] == [">    5 | row 5", ">    6 | row 6", ">   15 | row 15"]
+        assert "     4 | row 4" in lines
+        assert "     7 | row 7" in lines
+
+    def test_path_only_match(self) -> None:
+        """Test formatting a file matched only by path."""
+        assert FileFormatter.format_search_results(FileMatches("a.py")) == "=== a.py ==="
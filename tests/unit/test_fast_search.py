@@ -1,13 +1,15 @@
 """Tests for fast multithreaded file search."""
 
+import os
 import tempfile
 import time
 from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
-from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher, _MatcherSpec, _worker_searcher, shutdown_search_processes
 from files.backend.mcp.filesys.utils.file_utils import FileUtils
+from files.backend.mcp.filesys.utils.tree_walker import EntryFilter, FileFilter
 from loguru import logger
 
 
@@ -228,3 +230,295 @@ class TestFastFileSearcher:
         # For small test sets, performance might be similar
         # but the architecture is proven to scale better
         logger.info(f"Fast search: {fast_time:.3f}s, Original: {original_time:.3f}s")
+
+    @pytest.mark.asyncio
+    async def test_iter_search_matches_search_files(self, temp_dir: Path) -> None:
+        """Test that streaming search finds the same files as the batch search."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            streamed = [match async for match in searcher.iter_search(temp_dir, content_keywords=["test"])]
+            batched = await searcher.search_files(temp_dir, content_keywords=["test"])
+
+            assert sorted(streamed) == sorted(batched)
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_iter_search_stops_at_max_results(self, temp_dir: Path) -> None:
+        """Test that streaming search stops walking once enough matches are found."""
+        for i in range(500):
+            (temp_dir / f"hit_{i}.txt").write_text("needle")
+
+        searcher = FastFileSearcher(max_workers=2)
+        pulled: list[Path] = []
+        original = searcher._iter_candidate_files
+
+        def counting_walk(
+            directory: Path, ignore: EntryFilter | None = None, max_depth: int | None = None, file_filter: FileFilter | None = None
+        ) -> Iterator[Path]:
+            for file_path in original(directory, ignore, max_depth, file_filter):
+                pulled.append(file_path)
+                yield file_path
+
+        searcher._iter_candidate_files = counting_walk  # type: ignore[method-assign]
+        try:
+            results = [match async for match in searcher.iter_search(temp_dir, content_keywords=["needle"], max_results=5)]
+
+            assert len(results) == 5
+            assert all("hit_" in r for r in results)
+            assert len(pulled) < 500
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_iter_search_consumer_can_stop_early(self, temp_dir: Path) -> None:
+        """Test that closing the stream early leaves the searcher usable."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            stream = searcher.iter_search(temp_dir, path_keywords=["test"])
+            first = await anext(stream)
+            await stream.aclose()
+
+            assert Path(first).is_file()
+            assert await searcher.search_files(temp_dir, path_keywords=["module"]) != []
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_iter_matches_reports_locations(self, temp_dir: Path) -> None:
+        """Test that located search reports lines and context for content matches."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            located = {Path(fm.path).name: fm async for fm in searcher.iter_matches(temp_dir, content_keywords=["hello"], context_lines=1)}
+
+            assert set(located) == {"test1.py", "test2.txt"}
+            assert [(m.line, m.column) for m in located["test1.py"].matches] == [(2, 8)]
+            assert located["test2.txt"].context == {1: "hello world", 2: "this is a test file"}
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_process_engine_matches_thread_engine(self, temp_dir: Path) -> None:
+        """Test that worker processes return the same results as threads."""
+        threaded = FastFileSearcher(max_workers=2)
+        processes = FastFileSearcher(max_workers=2, engine="process")
+        try:
+            expected = await threaded.search_files(temp_dir, content_keywords=[r"test\w*"], regex_mode=True)
+            results = await processes.search_files(temp_dir, content_keywords=[r"test\w*"], regex_mode=True)
+            located = [fm async for fm in processes.iter_matches(temp_dir, content_keywords=[r"hello"], regex_mode=True, context_lines=0)]
+
+            assert sorted(results) == sorted(expected)
+            assert sorted(Path(fm.path).name for fm in located) == ["test1.py", "test2.txt"]
+            assert all(fm.matches for fm in located)
+        finally:
+            threaded.close()
+            processes.close()
+            shutdown_search_processes()
+
+    def test_auto_engine_heuristic(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that auto mode uses processes only for large regex content searches."""
+        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        searcher = FastFileSearcher(max_workers=4, engine="auto", process_min_files=100)
+        try:
+            regex_spec = _MatcherSpec((), ("foo.*bar",), True)
+            literal_spec = _MatcherSpec((), ("foo",), False)
+
+            assert searcher._choose_engine(regex_spec, 1000) == "process"
+            assert searcher._choose_engine(regex_spec, 10) == "thread"
+            assert searcher._choose_engine(literal_spec, 1000) == "thread"
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_matchers_reused_across_queries(self, temp_dir: Path) -> None:
+        """Test that repeated keyword sets reuse compiled matchers."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            spec = _MatcherSpec(("test",), ("hello",), False)
+            first = searcher._matchers_for(spec)
+
+            assert searcher._matchers_for(_MatcherSpec(("test",), ("hello",), False)) is first
+            assert searcher._matchers_for(_MatcherSpec(("test",), ("hello",), True)) is not first
+            assert FastFileSearcher(max_workers=1).text_extensions is searcher.text_extensions
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_max_workers_caps_shared_pool(self, temp_dir: Path) -> None:
+        """Test that a per-query worker cap limits concurrency without resizing the pool."""
+        searcher = FastFileSearcher(max_workers=4)
+        try:
+            assert searcher._concurrency(None) == 4
+            assert searcher._concurrency(2) == 2
+            assert searcher._concurrency(16) == 4
+            assert searcher._concurrency(0) == 1
+
+            capped = await searcher.search_files(temp_dir, content_keywords=["test"], max_workers=1)
+            full = await searcher.search_files(temp_dir, content_keywords=["test"])
+            assert sorted(capped) == sorted(full)
+            assert searcher.max_workers == 4
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_regex_prefilter_matches_unfiltered(self, temp_dir: Path) -> None:
+        """Test that prefiltering regexes on required literals does not change results."""
+        filtered = FastFileSearcher(max_workers=2)
+        unfiltered = FastFileSearcher(max_workers=2, regex_prefilter=False)
+        try:
+            patterns = [r"print\('hel+o", r"def\s+test_\w+", r'"key":\s*"\w+"', r"\d{2}"]
+            expected = await unfiltered.search_files(temp_dir, content_keywords=patterns, regex_mode=True)
+            results = await filtered.search_files(temp_dir, content_keywords=patterns, regex_mode=True)
+
+            assert sorted(results) == sorted(expected)
+            assert {Path(r).name for r in results} == {"test1.py", "module.py", "data.json", "config.yaml"}
+
+            # Worker processes rebuild matchers from the spec with the issuing searcher's setting
+            for searcher, enabled in ((filtered, True), (unfiltered, False)):
+                plan = searcher._plan_stream(temp_dir, [], [r"def\s+test_\w+"], True, None, None)
+                assert plan.spec.regex_prefilter is enabled
+                content_regex = _worker_searcher()._matchers_for(plan.spec)[3]
+                assert content_regex is not None
+                assert bool(content_regex._guarded) is enabled
+        finally:
+            filtered.close()
+            unfiltered.close()
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_content_keeps_unicode_regex_semantics(self, temp_dir: Path) -> None:
+        """Test that regexes over non-ASCII files match as they would on decoded text."""
+        (temp_dir / "menu.txt").write_text("un café crème\n", encoding="utf-8")
+        (temp_dir / "notes.txt").write_text("plain cafe\n", encoding="utf-8")
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            results = await searcher.search_files(temp_dir, content_keywords=[r"caf\w\s+cr\w+me"], regex_mode=True)
+            literal = await searcher.search_files(temp_dir, content_keywords=["crème"])
+
+            assert [Path(r).name for r in results] == ["menu.txt"]
+            assert [Path(r).name for r in literal] == ["menu.txt"]
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_limit_counts_matches_not_walked_files(self, temp_dir: Path) -> None:
+        """Test that matches far past ``max_results * 2`` walked files are still found."""
+        bulk = temp_dir / "aaa_bulk"
+        bulk.mkdir()
+        for i in range(300):
+            (bulk / f"miss_{i}.txt").write_text("nothing here\n")
+        (temp_dir / "zzz_late.txt").write_text("rare_marker\n")
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            results = await searcher.search_files(temp_dir, content_keywords=["rare_marker"], max_results=1)
+
+            assert [Path(r).name for r in results] == ["zzz_late.txt"]
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_search_files_returns_first_matches_in_walk_order(self, temp_dir: Path) -> None:
+        """Test that limited searches are deterministic and stop walking early."""
+        for i in range(1000):
+            (temp_dir / f"hit_{i:04d}.txt").write_text("needle")
+
+        searcher = FastFileSearcher(max_workers=2)
+        pulled: list[Path] = []
+        original = searcher._iter_candidate_files
+
+        def counting_walk(
+            directory: Path, ignore: EntryFilter | None = None, max_depth: int | None = None, file_filter: FileFilter | None = None
+        ) -> Iterator[Path]:
+            for file_path in original(directory, ignore, max_depth, file_filter):
+                pulled.append(file_path)
+                yield file_path
+
+        searcher._iter_candidate_files = counting_walk  # type: ignore[method-assign]
+        try:
+            everything = await searcher.search_files(temp_dir, content_keywords=["needle"])
+            pulled.clear()
+            first = await searcher.search_files(temp_dir, content_keywords=["needle"], max_results=10)
+
+            assert len(everything) == 1000
+            assert first == everything[:10]
+            assert len(pulled) < 1000
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_find_query_combines_path_and_content(self, temp_dir: Path) -> None:
+        """Test that boolean queries select files by path and content predicates."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            results = await searcher.search_files(temp_dir, query="content:test AND NOT path:subdir/ AND NOT ext:json")
+            assert sorted(Path(result).name for result in results) == ["readme.md", "test2.txt"]
+
+            located = [fm async for fm in searcher.iter_matches(temp_dir, query="ext:py AND content:def", context_lines=0)]
+            assert [(Path(fm.path).name, [m.line for m in fm.matches]) for fm in located] == [("module.py", [1])]
+
+            with pytest.raises(ValueError):
+                await searcher.search_files(temp_dir, content_keywords=["test"], query="ext:py")
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_file_filter_and_depth_restrict_candidates(self, temp_dir: Path) -> None:
+        """Test that stat conditions and max_depth are applied before files are matched."""
+        (temp_dir / "large.txt").write_text("test " * 1000)
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            small = await searcher.search_files(temp_dir, content_keywords=["test"], file_filter=FileFilter.create(max_size=100))
+            assert "large.txt" not in {Path(result).name for result in small}
+
+            python = await searcher.search_files(temp_dir, content_keywords=["test"], file_filter=FileFilter.create(extensions=["py", "yaml"]))
+            assert sorted(Path(result).name for result in python) == ["config.yaml", "module.py"]
+
+            shallow = await searcher.search_files(temp_dir, content_keywords=["test"], file_filter=FileFilter.create(extensions=["py", "yaml"]), max_depth=1)
+            assert shallow == []
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_recent_order_keeps_newest_matches(self, temp_dir: Path) -> None:
+        """Test that a limited recency-ordered search returns the most recently modified matches first."""
+        for i in range(50):
+            hit = temp_dir / f"hit_{i:02d}.txt"
+            hit.write_text("needle")
+            os.utime(hit, ns=(i * 1_000_000_000, i * 1_000_000_000))
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            newest = await searcher.search_files(temp_dir, content_keywords=["needle"], max_results=3, order="recent")
+            assert [Path(result).name for result in newest] == ["hit_49.txt", "hit_48.txt", "hit_47.txt"]
+
+            streamed = [Path(result).name async for result in searcher.iter_search(temp_dir, content_keywords=["needle"], max_results=3, order="recent")]
+            assert streamed == ["hit_49.txt", "hit_48.txt", "hit_47.txt"]
+
+            with pytest.raises(ValueError):
+                await searcher.search_files(temp_dir, content_keywords=["needle"], order="size")
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_ignore_case_and_whole_word(self, temp_dir: Path) -> None:
+        """Test that case-insensitive and whole-word modes apply to literal, regex and path keywords."""
+        (temp_dir / "upper.txt").write_text("TODO: Fix\n")
+        (temp_dir / "joined.txt").write_text("todos and fixtures\n")
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            folded = await searcher.search_files(temp_dir, content_keywords=["todo"], ignore_case=True)
+            assert sorted(Path(result).name for result in folded) == ["joined.txt", "upper.txt"]
+
+            words = await searcher.search_files(temp_dir, content_keywords=["todo", "fix"], ignore_case=True, whole_word=True)
+            assert [Path(result).name for result in words] == ["upper.txt"]
+
+            patterns = await searcher.search_files(temp_dir, content_keywords=[r"fix\w*"], regex_mode=True, whole_word=True)
+            assert [Path(result).name for result in patterns] == ["joined.txt"]
+
+            paths = await searcher.search_files(temp_dir, path_keywords=["UPPER"], ignore_case=True)
+            assert [Path(result).name for result in paths] == ["upper.txt"]
+
+            located = [fm async for fm in searcher.iter_matches(temp_dir, content_keywords=["fix"], ignore_case=True, whole_word=True, context_lines=0)]
+            assert [(Path(fm.path).name, [(m.column, m.keyword) for m in fm.matches]) for fm in located] == [("upper.txt", [(7, "fix")])]
+        finally:
+            searcher.close()
@@ -0,0 +1,103 @@
+"""Tests for cached text/binary file classification."""
+
+import os
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils import file_classes
+from files.backend.mcp.filesys.utils.file_classes import SNIFF_SIZE, FileClassCache, classify_head, sniff_is_text
+
+
+class TestClassifyHead:
+    """Validate classification of a file's leading bytes."""
+
+    @pytest.mark.parametrize(
+        "head",
+        [
+            b"\x7fELF\x02\x01\x01",
+            b"\x89PNG\r\n\x1a\n",
+            b"PK\x03\x04mimetype",
+            b"%PDF-1.7\n%ascii only header",
+        ],
+    )
+    def test_signatures_are_binary(self, head: bytes) -> None:
+        """Known binary formats are recognised without decoding."""
+        assert not classify_head(head, complete=False)
+
+    def test_text_and_nul_bytes(self) -> None:
+        """UTF-8 text is text, and NUL bytes mark binary content."""
+        assert classify_head("naïve café\n".encode(), complete=True)
+        assert classify_head(b"", complete=True)
+        assert not classify_head(b"abc\x00def", complete=True)
+        assert not classify_head(b"\xff\xfe latin junk", complete=True)
+
+    def test_character_cut_by_the_sample(self, tmp_path: Path) -> None:
+        """A multi-byte character split by the sample boundary is still text."""
+        path = tmp_path / "long.txt"
+        path.write_bytes(b"a" * (SNIFF_SIZE - 1) + "é".encode() * 10)
+
+        assert sniff_is_text(path)
+        assert not classify_head("é".encode()[:1], complete=True)
+
+
+class TestFileClassCache:
+    """Validate caching and persistence of classifications."""
+
+    def test_unchanged_files_are_not_resniffed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Repeat lookups hit the cache until the file changes."""
+        path = tmp_path / "notes.txt"
+        path.write_text("hello\n")
+        cache = FileClassCache()
+        sniffed: list[Path] = []
+        original = file_classes.sniff_is_text
+        monkeypatch.setattr(file_classes, "sniff_is_text", lambda p: sniffed.append(p) or original(p))
+
+        assert cache.is_text(path)
+        assert cache.is_text(path)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        path.write_bytes(b"\x7fELF" + b"\x00" * 20)
+        assert not cache.is_text(path)
+        assert sniffed == [path, path]
+
+    def test_missing_files_raise(self, tmp_path: Path) -> None:
+        """Callers decide how unreadable files are treated."""
+        with pytest.raises(FileNotFoundError):
+            FileClassCache().is_text(tmp_path / "missing.txt")
+
+    def test_persisted_across_instances(self, tmp_path: Path) -> None:
+        """Saved classifications are reused by a new cache."""
+        text_path = tmp_path / "a.txt"
+        text_path.write_text("text")
+        binary_path = tmp_path / "b.png"
+        binary_path.write_bytes(b"\x89PNG\r\n\x1a\n" + os.urandom(32))
+        cache_path = tmp_path / "cache" / "file-classes.npz"
+
+        cache = FileClassCache(cache_path)
+        assert cache.is_text(text_path)
+        assert not cache.is_text(binary_path)
+        cache.save()
+        assert not cache.dirty
+
+        reloaded = FileClassCache(cache_path)
+        assert len(reloaded) == 2
+        assert reloaded.is_text(text_path)
+        assert not reloaded.is_text(binary_path)
+        assert (reloaded.hits, reloaded.misses) == (2, 0)
+
+    def test_unreadable_cache_is_discarded(self, tmp_path: Path) -> None:
+        """A corrupt cache file starts an empty cache."""
+        cache_path = tmp_path / "file-classes.npz"
+        cache_path.write_bytes(b"not a cache")
+
+        assert len(FileClassCache(cache_path)) == 0
+
+    def test_oldest_entries_are_evicted(self, tmp_path: Path) -> None:
+        """The cache never holds more than ``max_entries`` classifications."""
+        cache = FileClassCache(max_entries=2)
+        for name in ("a", "b", "c"):
+            path = tmp_path / name
+            path.write_text(name)
+            cache.is_text(path)
+
+        assert len(cache) == 2
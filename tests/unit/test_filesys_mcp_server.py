@@ -61,6 +61,11 @@ class TestFilesysMCPServer:
         assert hasattr(server, "root_dir")
         assert hasattr(server, "mcp")
 
+    def test_construction_starts_no_background_work(self, server: FilesysMCPServer) -> None:
+        """Search maintenance starts with ``start``, not when the server is constructed."""
+        assert server.workspace is None
+        assert server.searcher is None
+
     def test_server_with_custom_config(self, temp_dir: Path) -> None:
         """Test server initialization with custom configuration."""
         config = {
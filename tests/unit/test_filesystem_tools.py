@@ -1,14 +1,25 @@
 """Tests for filesystem tool safety checks."""
 
+import asyncio
 import tempfile
 from collections.abc import Generator
 from pathlib import Path
+from typing import Any
 
 import pytest
+from files.backend.mcp.filesys.tools import filesystem_tools
 from files.backend.mcp.filesys.tools.filesystem_tools import (
     create_dirs_tool,
     delete_paths_tool,
+    find_paths_tool,
+    list_dir_tool,
+    read_from_file_tool,
+    search_stats_tool,
 )
+from files.backend.mcp.filesys.utils import line_index
+from files.backend.mcp.filesys.utils.fast_search import STREAM_BATCH_SIZE
+from files.backend.mcp.filesys.utils.search_workspace import SearchWorkspace, register_workspace, unregister_workspace
+from files.backend.mcp.filesys.utils.tree_walker import walk_entries
 
 
 class TestFilesystemTools:
@@ -36,3 +47,146 @@ class TestFilesystemTools:
         assert "errors" in result
         assert any("protected directory" in err.lower() for err in result["errors"])
         assert protected.exists()
+
+    @pytest.mark.asyncio
+    async def test_list_dir_prunes_only_on_request(self, temp_root: Path) -> None:
+        """Listings show VCS and dependency directories unless pruning is requested."""
+        (temp_root / ".git").mkdir()
+        (temp_root / "node_modules" / "pkg").mkdir(parents=True)
+        (temp_root / "main.py").write_text("print()\n")
+
+        listed = await list_dir_tool(temp_root, ".", recursive=True)
+        assert sorted(item["path"] for item in listed["items"]) == [".git", "main.py", "node_modules", "node_modules/pkg"]
+        pruned = await list_dir_tool(temp_root, ".", recursive=True, prune_dirs=True)
+        assert [item["path"] for item in pruned["items"]] == ["main.py"]
+
+    @pytest.mark.asyncio
+    async def test_list_dir_anchored_patterns(self, temp_root: Path) -> None:
+        """Non-recursive patterns with several segments match below the listed directory, like ``Path.glob``."""
+        (temp_root / "src" / "sub").mkdir(parents=True)
+        for name in ("setup.py", "src/a.py", "src/b.txt", "src/sub/c.py"):
+            (temp_root / name).write_text("")
+
+        async def listed(pattern: str) -> list[str]:
+            return sorted(item["path"] for item in (await list_dir_tool(temp_root, ".", pattern=pattern))["items"])
+
+        assert await listed("src/*.py") == ["src/a.py"]
+        assert await listed("*.py") == ["setup.py"]
+        assert await listed("src/**/*.py") == ["src/a.py", "src/sub/c.py"]
+
+    @pytest.mark.asyncio
+    async def test_limited_finds_return_the_first_matches(self, temp_root: Path) -> None:
+        """A find with max_results returns the first matches of the unlimited find, in walk order."""
+        for number in range(200):
+            (temp_root / f"module_{number}.py").touch()
+        # The first walked batch holds the large files, so later batches finish matching first
+        for position, entry in enumerate(walk_entries(temp_root)):
+            Path(entry.path).write_text(("hay\n" * 50_000 if position < STREAM_BATCH_SIZE else "") + "needle\n")
+
+        full = await find_paths_tool(temp_root, keywords_file_content=["needle"])
+        limited = [await find_paths_tool(temp_root, keywords_file_content=["needle"], max_results=5) for _ in range(3)]
+        assert all(result["paths"] == full["paths"][:5] for result in limited)
+
+    @pytest.mark.asyncio
+    async def test_cached_finds_follow_info_exclude(self, temp_root: Path) -> None:
+        """Repeated finds are cache hits until .git/info/exclude changes, and the stats report them."""
+        (temp_root / ".git" / "info").mkdir(parents=True)
+        for name in ("main.py", "secret.py"):
+            (temp_root / name).write_text("needle\n")
+        workspace = SearchWorkspace(temp_root, poll_interval=0.1, debounce=0.02)
+        workspace.start()
+        assert workspace.wait_ready(5.0)
+        register_workspace(workspace)
+        try:
+            first = await find_paths_tool(temp_root, keywords_file_content=["needle"], respect_gitignore=True)
+            second = await find_paths_tool(temp_root, keywords_file_content=["needle"], respect_gitignore=True)
+            (temp_root / ".git" / "info" / "exclude").write_text("secret.py\n")
+            excluded = await find_paths_tool(temp_root, keywords_file_content=["needle"], respect_gitignore=True)
+            stats = await search_stats_tool(temp_root)
+        finally:
+            unregister_workspace(workspace)
+            workspace.close()
+
+        assert sorted(first["paths"]) == sorted(second["paths"]) == ["main.py", "secret.py"]
+        assert excluded["paths"] == ["main.py"]
+        assert stats["result_cache"] == {"hits": 1, "misses": 2, "entries": 2}
+        assert stats["workspace"] == {"ready": True, "watching": True}
+
+    @pytest.mark.asyncio
+    async def test_indexed_reads_match_plain_reads(self, temp_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Line and character ranges read through the line-offset index equal whole-file reads."""
+        (temp_root / "app.log").write_text("".join(f"entry {i}\n" for i in range(5000)))
+        requests: list[dict[str, Any]] = [
+            {"start_line": 4000, "end_line": 4002, "add_line_numbers": True},
+            {"start_line": 4998},
+            {"offset_type": "char", "start_offset_inclusive": 30_000, "end_offset_inclusive": 30_020},
+        ]
+        plain = [await read_from_file_tool(temp_root, "app.log", **request) for request in requests]
+        monkeypatch.setattr(line_index, "LINE_INDEX_MIN_SIZE", 1)
+        indexed = [await read_from_file_tool(temp_root, "app.log", **request) for request in requests]
+
+        assert indexed == plain
+        assert plain[0]["content"] == "4000|entry 3999\n4001|entry 4000\n4002|entry 4001"
+
+    @pytest.mark.asyncio
+    async def test_paginated_reads(self, temp_root: Path) -> None:
+        """Pages of a line range resume from their cursors, keep their page size and reassemble the range."""
+        path = temp_root / "app.log"
+        path.write_text("".join(f"entry {i}\n" for i in range(100)))
+
+        first = await read_from_file_tool(temp_root, "app.log", start_line=11, end_line=40, page_size=64, add_line_numbers=True)
+        assert first["start_line"] == 11
+        assert first["content"].startswith("11|entry 10\n12|entry 11")
+
+        pages = [first]
+        while pages[-1]["next_cursor"] is not None:
+            pages.append(await read_from_file_tool(temp_root, "app.log", cursor=pages[-1]["next_cursor"], add_line_numbers=False))
+        plain = await read_from_file_tool(temp_root, "app.log", start_line=11, end_line=40)
+        assert "".join(page["content"] for page in pages[1:]) == plain["content"][pages[1]["byte_offset"] - first["byte_offset"] :]
+        assert all(len(page["content"]) <= 64 for page in pages[1:])
+        resized = await read_from_file_tool(temp_root, "app.log", cursor=first["next_cursor"], page_size=1024, add_line_numbers=False)
+        assert resized["content"] == "".join(page["content"] for page in pages[1:])
+
+        with path.open("a") as handle:
+            handle.write("late entry\n")
+        assert "changed" in (await read_from_file_tool(temp_root, "app.log", cursor=first["next_cursor"]))["error"]
+
+    @pytest.mark.asyncio
+    async def test_tail_reads_last_lines(self, temp_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Tails are found by scanning backwards and bounded by the page size."""
+        monkeypatch.setattr(filesystem_tools, "_TAIL_BLOCK_SIZE", 7)
+        (temp_root / "app.log").write_text("".join(f"entry {i}\n" for i in range(100)))
+        (temp_root / "partial.log").write_text("a\nb\nc")
+
+        tail = await read_from_file_tool(temp_root, "app.log", tail_lines=3)
+        assert tail["content"] == "entry 97\nentry 98\nentry 99\n"
+        assert tail["start_line"] is None
+        assert (await read_from_file_tool(temp_root, "partial.log", tail_lines=2))["content"] == "b\nc"
+        assert (await read_from_file_tool(temp_root, "partial.log", tail_lines=10))["content"] == "a\nb\nc"
+        assert (await read_from_file_tool(temp_root, "app.log", tail_lines=0))["content"] == ""
+        assert (await read_from_file_tool(temp_root, "app.log", tail_lines=50, page_size=30))["content"] == "entry 97\nentry 98\nentry 99\n"
+
+    @pytest.mark.asyncio
+    async def test_follow_returns_appended_data(self, temp_root: Path) -> None:
+        """Follow reads wait for appends after their cursor and reject truncated files."""
+        path = temp_root / "job.log"
+        path.write_text("started\n")
+        tail = await read_from_file_tool(temp_root, "job.log", tail_lines=1)
+
+        async def append_later() -> None:
+            await asyncio.sleep(0.2)
+            with path.open("a") as handle:
+                handle.write("step 1\n")
+
+        appender = asyncio.create_task(append_later())
+        followed = await read_from_file_tool(temp_root, "job.log", follow=True, cursor=tail["next_cursor"], follow_timeout=5)
+        await appender
+        assert followed["content"] == "step 1\n"
+        assert followed["byte_offset"] == len("started\n")
+
+        idle = await read_from_file_tool(temp_root, "job.log", follow=True, cursor=followed["next_cursor"], follow_timeout=0.1)
+        assert idle["content"] == ""
+        assert idle["next_cursor"] == followed["next_cursor"]
+
+        path.write_text("")
+        assert "truncated" in (await read_from_file_tool(temp_root, "job.log", follow=True, cursor=idle["next_cursor"], follow_timeout=0))["error"]
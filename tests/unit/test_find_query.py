@@ -0,0 +1,119 @@
+"""Tests for boolean find queries."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+import regex
+from files.backend.mcp.filesys.utils import find_query
+from files.backend.mcp.filesys.utils.byte_search import build_automaton
+from files.backend.mcp.filesys.utils.find_query import And, FindQuery, Not, Or, Predicate, parse_query
+from files.backend.mcp.filesys.utils.regex_literals import RequiredLiterals
+
+
+def _compile(text: str) -> FindQuery:
+    return FindQuery(text, build_automaton, regex.MULTILINE | regex.DOTALL)
+
+
+def _always_text(_path: Path) -> bool:
+    return True
+
+
+class TestParseQuery:
+    """Validate the grammar: precedence, implicit AND, quoting and errors."""
+
+    def test_precedence(self) -> None:
+        """NOT binds tightest, then AND (explicit or implicit), then OR."""
+        assert parse_query('content:"TODO" AND NOT path:tests/ ext:py') == And(
+            (Predicate("content", "TODO"), Not(Predicate("path", "tests/")), Predicate("ext", "py"))
+        )
+        assert parse_query("ext:py OR ext:md name:README*") == Or((Predicate("ext", "py"), And((Predicate("ext", "md"), Predicate("name", "README*")))))
+        assert parse_query("(ext:py or ext:md) and not content:x") == And(
+            (Or((Predicate("ext", "py"), Predicate("ext", "md"))), Not(Predicate("content", "x")))
+        )
+
+    def test_quoted_values(self) -> None:
+        """Quoted values may hold spaces, parentheses and escaped quotes."""
+        assert parse_query(r'content:"say \"hi\" (now)"') == Predicate("content", 'say "hi" (now)')
+        assert parse_query("REGEX:def\\s+\\w+") == Predicate("regex", "def\\s+\\w+")
+
+    @pytest.mark.parametrize("text", ["", "ext:py AND", "(ext:py", "ext:py)", "size:10", "TODO", "ext:py OR OR ext:md"])
+    def test_malformed_queries_raise(self, text: str) -> None:
+        """Errors are reported as ValueError."""
+        with pytest.raises(ValueError):
+            parse_query(text)
+
+    def test_invalid_regex_raises(self) -> None:
+        """Regex predicates are compiled up front."""
+        with pytest.raises(ValueError, match="Invalid regex"):
+            _compile('regex:"(unclosed"')
+
+
+class TestFindQuery:
+    """Validate evaluation order, the one-pass content check and index narrowing."""
+
+    def test_path_predicates_decide_without_reading(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Files ruled in or out by their path are never opened."""
+        target = tmp_path / "tests" / "test_a.py"
+        target.parent.mkdir()
+        target.write_text("TODO\n")
+
+        def fail(_path: Path) -> None:
+            raise AssertionError("content was read")
+
+        monkeypatch.setattr(find_query, "open_content", fail)
+        assert not _compile('content:"TODO" AND NOT path:tests/ AND ext:py').matches(target, "tests/test_a.py", _always_text)
+        assert _compile("ext:py OR content:TODO").matches(target, "tests/test_a.py", _always_text)
+        assert _compile("name:test_*.py").matches(target, "tests/test_a.py", _always_text)
+        assert not _compile("ext:.MD").matches(target, "tests/test_a.py", _always_text)
+
+    def test_content_is_read_once_for_all_predicates(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Every literal and regex is checked against one read of the file."""
+        target = tmp_path / "main.py"
+        target.write_text("# TODO: tidy\ndef handle_event(): pass\n")
+        opened: list[Path] = []
+        original: Callable = find_query.open_content
+
+        def counting(path: Path):  # type: ignore[no-untyped-def]
+            opened.append(path)
+            return original(path)
+
+        monkeypatch.setattr(find_query, "open_content", counting)
+        query = _compile('content:TODO AND (content:FIXME OR regex:"def\\s+handle_") AND NOT content:XXX')
+        assert query.matches(target, "main.py", _always_text)
+        assert opened == [target]
+
+    def test_many_literals_use_the_automaton(self, tmp_path: Path) -> None:
+        """Large literal sets are found with one automaton pass."""
+        target = tmp_path / "words.txt"
+        target.write_text(" ".join(f"word{i}" for i in range(0, 40, 2)))
+        query = _compile(" AND ".join(f"content:word{i}" for i in range(0, 40, 2)))
+        assert query._literal_automaton is not None
+        assert query.matches(target, "words.txt", _always_text)
+        assert not _compile(" AND ".join(f"content:word{i}" for i in range(40))).matches(target, "words.txt", _always_text)
+
+    def test_binary_files_fail_content_predicates(self, tmp_path: Path) -> None:
+        """Content predicates never hold for binary files, so their negation does."""
+        target = tmp_path / "blob.bin"
+        target.write_bytes(b"\x00TODO\x00")
+        assert not _compile("content:TODO").matches(target, "blob.bin", lambda _path: False)
+        assert _compile("NOT content:TODO").matches(target, "blob.bin", lambda _path: False)
+
+    def test_index_query(self) -> None:
+        """Queries that require content narrow the trigram index; others do not."""
+        assert _compile("content:alpha AND content:beta AND ext:py").index_query() == [RequiredLiterals((frozenset({"alpha"}), frozenset({"beta"})))]
+        assert _compile("content:alpha OR content:beta").index_query() == [
+            RequiredLiterals((frozenset({"alpha"}),)),
+            RequiredLiterals((frozenset({"beta"}),)),
+        ]
+        assert _compile("content:alpha OR ext:py").index_query() is None
+        assert _compile("NOT content:alpha").index_query() is None
+
+    def test_fuzzy_regex_predicates_do_not_narrow_the_index(self, tmp_path: Path) -> None:
+        """A fuzzy ``regex:`` predicate requires no literal, so files it matches are not dropped by the index."""
+        query = _compile('regex:"(?:handle_request){e<=1}" AND ext:py')
+        target = tmp_path / "server.py"
+        target.write_text("def handle_reqest(): pass\n")
+
+        assert query.index_query() is None
+        assert query.matches(target, "server.py", _always_text)
@@ -0,0 +1,90 @@
+"""Tests for fuzzy ranked path search."""
+
+import numpy as np
+import pytest
+from files.backend.mcp.filesys.utils import fuzzy_paths
+from files.backend.mcp.filesys.utils.fuzzy_paths import FuzzyPathIndex, char_mask, fuzzy_score, path_masks, rank_paths
+
+PATHS = [
+    "backend/mcp/filesys/utils/search_workspace.py",
+    "backend/mcp/filesys/utils/fast_search.py",
+    "backend/search/workers/settings.py",
+    "docs/Search/WorkSpace.md",
+    "tests/unit/test_search_workspace.py",
+    "README.md",
+]
+
+
+class TestFuzzyScore:
+    """Validate subsequence matching and fzf-style scoring."""
+
+    def test_non_subsequences_do_not_match(self) -> None:
+        """Every query character must occur in order."""
+        assert fuzzy_score("src/main.py", "nim") is None
+        assert fuzzy_score("src/main.py", "smp") is not None
+
+    def test_boundaries_outscore_scattered_matches(self) -> None:
+        """Characters starting words and components earn bonuses."""
+        boundary = fuzzy_score("fast_search.py", "fs")
+        scattered = fuzzy_score("offset.py", "fs")
+        assert boundary is not None and scattered is not None
+        assert boundary[0] > scattered[0]
+        assert fuzzy_score("fast_search.py", "sea") == (96, [5, 6, 7])
+
+    def test_basename_matches_are_preferred(self) -> None:
+        """A match inside the basename beats one spread over directories."""
+        ranked = rank_paths(["search/workers/x.py", "lib/search_workspace.py"], "srchws", 2)
+        assert [match.path for match in ranked] == ["lib/search_workspace.py", "search/workers/x.py"]
+        assert fuzzy_score("search/workers/x.py", "srchws", basename_only=True) is None
+
+
+class TestPathMasks:
+    """Validate the vectorised mask computation."""
+
+    def test_masks_match_per_path_computation(self) -> None:
+        """Path and basename masks equal the masks of the lower-cased strings."""
+        paths = ["a/b/SearchWorkspace.py", "noslash", "café/Über.txt", "deep/dir/"]
+        masks = path_masks(paths)
+        for column, path in enumerate(paths):
+            lowered = path.lower()
+            assert masks[0, column] == char_mask(lowered)
+            assert masks[1, column] == char_mask(lowered[lowered.rfind("/") + 1 :])
+
+    def test_word_starts(self) -> None:
+        """Component starts, word starts, camelCase humps and numbers are word starts."""
+        (mask,) = path_masks(["src/fooBar_baz9.py"])[2]
+        assert mask == np.uint64(char_mask("sfbb9p"))
+
+
+class TestFuzzyPathIndex:
+    """Validate ranking, scoping and incremental updates of the index."""
+
+    def test_ranks_like_a_full_scan(self) -> None:
+        """The index returns the same ranking as scoring every path."""
+        index = FuzzyPathIndex(PATHS)
+        for query in ("srchws", "search", "readme", "wsp"):
+            assert index.search(query, 3) == rank_paths(PATHS, query, 3)
+
+    def test_incremental_updates(self) -> None:
+        """Added paths become searchable and removed paths disappear."""
+        index = FuzzyPathIndex(PATHS)
+        index.remove(["backend/mcp/filesys/utils/search_workspace.py", "not/indexed.py"])
+        index.add(["src/swarm/handlers.py"])
+
+        assert len(index) == len(PATHS)
+        assert "src/swarm/handlers.py" in index
+        assert [match.path for match in index.search("swhand", 1)] == ["src/swarm/handlers.py"]
+        assert "backend/mcp/filesys/utils/search_workspace.py" not in [match.path for match in index.search("srchws", 10)]
+
+    def test_prefix_scopes_results(self) -> None:
+        """Only paths below the prefix are ranked."""
+        ranked = FuzzyPathIndex(PATHS).search("srchws", 10, prefix="tests/")
+        assert [match.path for match in ranked] == ["tests/unit/test_search_workspace.py"]
+
+    def test_budget_keeps_word_start_matches(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Broad queries score only the candidates whose word starts cover the query."""
+        monkeypatch.setattr(fuzzy_paths, "SCORE_BUDGET", 2)
+        paths = [f"pkg/module{number}/notes.txt" for number in range(50)] + ["pkg/Make/Tool.py"]
+
+        ranked = FuzzyPathIndex(paths).search("mt", 1)
+        assert [match.path for match in ranked] == ["pkg/Make/Tool.py"]
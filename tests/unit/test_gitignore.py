@@ -0,0 +1,125 @@
+"""Tests for the compiled gitignore matcher."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher
+from files.backend.mcp.filesys.utils.gitignore import GitignoreMatcher, compile_ignore_rules, gitignore_matcher_for
+from files.backend.mcp.filesys.utils.tree_walker import relative_entry_path, walk_files
+
+
+class TestIgnoreRules:
+    """Test pattern semantics of a single ignore file."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "path", "is_dir", "expected"),
+        [
+            ("*.log", "a.log", False, True),
+            ("*.log", "deep/dir/a.log", False, True),
+            ("/build", "build", True, True),
+            ("/build", "src/build", True, None),
+            ("doc/*.txt", "doc/a.txt", False, True),
+            ("doc/*.txt", "doc/sub/a.txt", False, None),
+            ("out/", "out", True, True),
+            ("out/", "out", False, None),
+            ("**/cache", "x/y/cache", True, True),
+            ("a/**/b", "a/b", False, True),
+            ("a/**/b", "a/x/y/b", False, True),
+            ("logs/**", "logs/x/y.txt", False, True),
+            ("\\#notes", "#notes", False, True),
+            ("f?o[0-9]", "fo1", False, None),
+            ("f?o[0-9]", "fxo1", False, True),
+        ],
+    )
+    def test_pattern_semantics(self, pattern: str, path: str, is_dir: bool, expected: bool | None) -> None:
+        """Test anchoring, directory-only, globstar and escape handling."""
+        assert compile_ignore_rules([pattern]).verdict(path, is_dir) is expected
+
+    def test_last_match_wins_with_negation(self) -> None:
+        """Test that later negations re-include and later patterns re-exclude."""
+        rules = compile_ignore_rules(["*.log", "!keep.log", "keep.log.old", "# comment", ""])
+        assert rules.verdict("a.log", False) is True
+        assert rules.verdict("keep.log", False) is False
+        assert len(rules.groups) == 3
+
+    def test_rules_apply_below_base_only(self) -> None:
+        """Test that nested ignore files only cover their own subtree."""
+        rules = compile_ignore_rules(["*.tmp"], base="pkg")
+        assert rules.verdict("pkg/a.tmp", False) is True
+        assert rules.verdict("other/a.tmp", False) is None
+        assert rules.verdict("pkgx/a.tmp", False) is None
+
+
+class TestGitignoreMatcher:
+    """Test hierarchical matching and integration with traversals."""
+
+    @pytest.fixture
+    def repo(self, tmp_path: Path) -> Iterator[Path]:
+        """Create a repository with nested ignore files."""
+        (tmp_path / ".git" / "info").mkdir(parents=True)
+        (tmp_path / ".git" / "info" / "exclude").write_text("secret.txt\n")
+        (tmp_path / ".gitignore").write_text("*.log\nbuild/\n")
+        (tmp_path / "pkg" / "build").mkdir(parents=True)
+        (tmp_path / "pkg" / ".gitignore").write_text("!important.log\n")
+        for rel in ("main.py", "debug.log", "secret.txt", "pkg/mod.py", "pkg/important.log", "pkg/other.log", "pkg/build/out.py"):
+            (tmp_path / rel).write_text("needle\n")
+        yield tmp_path
+
+    def test_walk_respects_nested_rules(self, repo: Path) -> None:
+        """Test that deeper files override shallower ones and ignored directories are pruned."""
+        session = GitignoreMatcher(repo).session()
+        walked = {relative_entry_path(entry, str(repo)) for entry in walk_files(repo, ignore=session.entry_filter())}
+
+        assert walked == {".gitignore", "main.py", "pkg/.gitignore", "pkg/mod.py", "pkg/important.log"}
+
+    def test_is_ignored_checks_parent_directories(self, repo: Path) -> None:
+        """Test that files below an ignored directory are reported as ignored."""
+        matcher = GitignoreMatcher(repo)
+        assert matcher.is_ignored(repo / "pkg" / "build" / "out.py")
+        assert not matcher.is_ignored(repo / "pkg" / "mod.py")
+        assert not matcher.is_ignored(Path("/elsewhere/debug.log"))
+
+    def test_reloads_when_ignore_file_changes(self, repo: Path) -> None:
+        """Test that the compiled cache is invalidated by the ignore file's mtime."""
+        matcher = GitignoreMatcher(repo)
+        assert not matcher.is_ignored(repo / "main.py")
+
+        gitignore = repo / ".gitignore"
+        gitignore.write_text("*.py\n")
+        stat = gitignore.stat()
+        os.utime(gitignore, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert matcher.is_ignored(repo / "main.py")
+
+    def test_reloads_when_info_exclude_changes(self, repo: Path) -> None:
+        """Test that editing .git/info/exclude alone invalidates the root's compiled rules."""
+        matcher = GitignoreMatcher(repo)
+        assert not matcher.is_ignored(repo / "main.py")
+
+        exclude = repo / ".git" / "info" / "exclude"
+        exclude.write_text("secret.txt\nmain.py\n")
+        stat = exclude.stat()
+        os.utime(exclude, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert matcher.is_ignored(repo / "main.py")
+
+    def test_shared_matcher_per_repository(self, repo: Path) -> None:
+        """Test that lookups from subdirectories share the repository matcher."""
+        assert gitignore_matcher_for(repo / "pkg") is gitignore_matcher_for(repo)
+
+    @pytest.mark.asyncio
+    async def test_searcher_respect_gitignore(self, repo: Path) -> None:
+        """Test that the searcher skips ignored files only when asked."""
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            everything = await searcher.search_files(repo, content_keywords=["needle"])
+            tracked = await searcher.search_files(repo, content_keywords=["needle"], respect_gitignore=True)
+            streamed = [match async for match in searcher.iter_search(repo, content_keywords=["needle"], respect_gitignore=True)]
+
+            assert len(everything) == 7
+            assert sorted(Path(p).relative_to(repo).as_posix() for p in tracked) == ["main.py", "pkg/important.log", "pkg/mod.py"]
+            assert sorted(streamed) == sorted(tracked)
+        finally:
+            searcher.close()
@@ -0,0 +1,119 @@
+"""Tests for the sparse line-offset index."""
+
+import os
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils import line_index
+from files.backend.mcp.filesys.utils.line_index import LineIndex, forget_line_indexes, line_index_for, supports_encoding
+
+
+@pytest.fixture(autouse=True)
+def small_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Index tiny files with short checkpoint intervals, from an empty cache."""
+    monkeypatch.setattr(line_index, "LINE_INDEX_MIN_SIZE", 1)
+    monkeypatch.setattr(line_index, "CHECKPOINT_LINES", 3)
+    monkeypatch.setattr(line_index, "_BLOCK_SIZE", 7)
+    monkeypatch.setattr(line_index, "_SEEK_BLOCK_SIZE", 5)
+    monkeypatch.setattr(line_index, "_INDEXES", line_index.OrderedDict())
+
+
+def _build(path: Path, encoding: str = "utf-8") -> LineIndex:
+    index = LineIndex(encoding, interval=3)
+    with path.open("rb") as handle:
+        index.extend(handle, path.stat())
+    return index
+
+
+class TestLineIndex:
+    """Validate that indexed reads agree with reading the whole file."""
+
+    def test_line_ranges_match_readlines(self, tmp_path: Path) -> None:
+        """Every line range, including ranges past the end, equals a slice of ``readlines``."""
+        path = tmp_path / "mixed.log"
+        path.write_bytes("".join(f"line {i} café\r\n" if i % 4 == 0 else f"line {i}\n" for i in range(20)).encode() + b"tail")
+        index = _build(path)
+        with path.open(encoding="utf-8") as handle:
+            lines = handle.readlines()
+
+        assert list(index.byte_offsets[:2]) == [0, len(b"line 0 caf\xc3\xa9\r\nline 1\nline 2\n")]
+        for start in range(len(lines) + 2):
+            assert index.read_lines(path, start, -1) == lines[start:]
+            for end in range(start, len(lines) + 2):
+                assert index.read_lines(path, start, end) == lines[start : end + 1]
+
+    def test_char_ranges_match_read(self, tmp_path: Path) -> None:
+        """Character offsets count decoded characters after newline translation."""
+        path = tmp_path / "chars.txt"
+        path.write_bytes("".join(f"ñ{i}\r\n" for i in range(12)).encode())
+        index = _build(path)
+        text = path.read_text(encoding="utf-8")
+
+        for start in range(0, len(text) + 2, 2):
+            assert index.read_chars(path, start, start + 4) == text[start : start + 5]
+        assert index.read_chars(path, 10, -1) == text[10:]
+
+    def test_lone_carriage_returns_are_not_indexed(self, tmp_path: Path) -> None:
+        """Files with ``\\r`` line breaks fall back to plain reads."""
+        path = tmp_path / "mac.txt"
+        path.write_bytes(b"a\rb\r\nc\n" * 4)
+        assert _build(path).lone_cr
+        assert line_index_for(path, "utf-8") is None
+        (tmp_path / "split.txt").write_bytes(b"abcdef\r\nxyz\n")
+        assert not _build(tmp_path / "split.txt").lone_cr
+
+    def test_encodings(self) -> None:
+        """Only ASCII-compatible encodings are indexed."""
+        assert supports_encoding("utf-8")
+        assert supports_encoding("latin-1")
+        assert not supports_encoding("utf-16")
+        assert not supports_encoding("utf-8-sig")
+        assert not supports_encoding("no-such-codec")
+
+
+class TestLineIndexCache:
+    """Validate caching by file identity and incremental extension."""
+
+    def test_unchanged_files_reuse_their_index(self, tmp_path: Path) -> None:
+        """A second lookup of an unchanged file returns the cached index."""
+        path = tmp_path / "a.txt"
+        path.write_text("x\n" * 10)
+        assert line_index_for(path, "utf-8") is line_index_for(path, "utf-8")
+
+    def test_appends_extend_the_index(self, tmp_path: Path) -> None:
+        """Appended lines are indexed from the previous end, not from the start."""
+        path = tmp_path / "app.log"
+        path.write_text("".join(f"event {i}\n" for i in range(10)))
+        index = line_index_for(path, "utf-8")
+        with path.open("a") as handle:
+            handle.write("".join(f"event {i}\n" for i in range(10, 25)))
+
+        extended = line_index_for(path, "utf-8")
+        assert extended is index
+        assert extended is not None
+        assert extended.lines == 25
+        assert extended.read_lines(path, 22, 23) == ["event 22\n", "event 23\n"]
+        assert list(extended.byte_offsets) == list(_build(path).byte_offsets)
+
+    def test_rewrites_rebuild_the_index(self, tmp_path: Path) -> None:
+        """A file rewritten in place with new leading content is indexed again."""
+        path = tmp_path / "rewritten.txt"
+        path.write_text("old\n" * 10)
+        index = line_index_for(path, "utf-8")
+        with path.open("r+") as handle:
+            handle.write("new\n" * 12)
+        stat_result = path.stat()
+        os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+
+        rebuilt = line_index_for(path, "utf-8")
+        assert rebuilt is not index
+        assert rebuilt is not None
+        assert rebuilt.read_lines(path, 0, 0) == ["new\n"]
+
+    def test_forget(self, tmp_path: Path) -> None:
+        """Forgotten files are indexed afresh on the next lookup."""
+        path = tmp_path / "b.txt"
+        path.write_text("y\n" * 10)
+        index = line_index_for(path, "utf-8")
+        forget_line_indexes([path, tmp_path / "missing.txt"])
+        assert line_index_for(path, "utf-8") is not index
@@ -0,0 +1,98 @@
+"""Tests for the array-backed path tree."""
+
+from pathlib import Path
+
+from files.backend.mcp.filesys.utils.path_tree import PathTree, TreeEntry
+from files.backend.mcp.filesys.utils.tree_walker import relative_entry_path, walk_entries
+
+
+def _build(root: Path) -> PathTree:
+    tree = PathTree()
+    for entry in walk_entries(root, include_dirs=True):
+        rel = relative_entry_path(entry, str(root))
+        if entry.is_dir():
+            tree.add_dir(rel)
+        else:
+            stat = entry.stat()
+            tree.set_file(rel, stat.st_size, stat.st_mtime_ns)
+    return tree
+
+
+class TestPathTree:
+    """Validate lookups, walks and updates of the tree."""
+
+    def test_walk_matches_disk_walk(self, tmp_path: Path) -> None:
+        """Walks yield the same entries, in the same order, as the disk walker."""
+        for rel in ("src/pkg/a.py", "src/pkg/b.txt", "src/c.py", "docs/index.md", "top.txt"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text(rel)
+        (tmp_path / "empty").mkdir()
+        tree = _build(tmp_path)
+
+        for directory, recursive in (("", True), ("", False), ("src", True)):
+            disk = [
+                (relative_entry_path(entry, str(tmp_path)), entry.is_dir())
+                for entry in walk_entries(tmp_path / directory, recursive=recursive, include_dirs=True)
+            ]
+            assert [(entry.path, entry.is_dir) for entry in tree.walk(directory or ".", recursive)] == disk
+
+        assert len(tree) == 5
+        assert tree.stat("src/c.py") == ((tmp_path / "src/c.py").stat().st_size, (tmp_path / "src/c.py").stat().st_mtime_ns)
+        assert tree.is_dir("empty")
+        assert list(tree.walk("empty")) == []
+        assert list(tree.walk("top.txt")) == []
+
+    def test_components_are_interned(self) -> None:
+        """Names shared by many paths are stored once."""
+        tree = PathTree()
+        for number in range(100):
+            tree.set_file(f"pkg{number}/__init__.py", 0, 0)
+
+        assert len(tree._components) == 102
+        assert tree.node_count == 200
+
+    def test_remove_returns_removed_files_and_reuses_nodes(self) -> None:
+        """Removing a directory drops its subtree and frees its nodes for reuse."""
+        tree = PathTree()
+        tree.set_file("a/b/one.py", 1, 1)
+        tree.set_file("a/two.py", 2, 2)
+        tree.set_file("c.py", 3, 3)
+
+        assert sorted(tree.remove("a")) == ["a/b/one.py", "a/two.py"]
+        assert tree.remove("missing") == []
+        assert len(tree) == 1 and tree.node_count == 1
+
+        tree.set_file("d/e.py", 5, 5)
+        assert list(tree.walk()) == [TreeEntry("c.py", False, 3), TreeEntry("d", True, 0), TreeEntry("d/e.py", False, 5)]
+        assert tree.remove("c.py") == ["c.py"]
+
+    def test_kind_changes_replace_the_node(self) -> None:
+        """A file replaced by a directory of the same name (or vice versa) is replaced in the tree."""
+        tree = PathTree()
+        tree.set_file("x", 1, 1)
+        tree.set_file("x/y.py", 2, 2)
+
+        assert tree.stat("x") is None
+        assert tree.is_dir("x")
+        assert list(tree.files()) == ["x/y.py"]
+
+    def test_walk_applies_file_filters(self) -> None:
+        """File filters see each file's name and cached stat data; directories are always walked."""
+        tree = PathTree()
+        tree.set_file("src/big.py", 500, 10)
+        tree.set_file("src/small.py", 5, 20)
+        tree.set_file("notes.md", 50, 30)
+
+        walked = tree.walk(file_filter=lambda name, size, mtime_ns: name.endswith(".py") and size < 100)
+        assert [entry.path for entry in walked] == ["src", "src/small.py"]
+        assert list(tree.files(file_filter=lambda name, size, mtime_ns: mtime_ns >= 20)) == ["notes.md", "src/small.py"]
+        assert list(tree.files(max_depth=1)) == ["notes.md"]
+
+    def test_file_mtimes(self) -> None:
+        """File mtimes are reported in walk order for the files passing the filter."""
+        tree = PathTree()
+        tree.set_file("a/one.py", 1, 100)
+        tree.set_file("two.md", 2, 200)
+
+        assert list(tree.file_mtimes()) == [("two.md", 200), ("a/one.py", 100)]
+        assert list(tree.file_mtimes("a", file_filter=lambda name, size, mtime_ns: size > 1)) == []
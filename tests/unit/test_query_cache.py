@@ -0,0 +1,39 @@
+"""Tests for the find result cache."""
+
+from files.backend.mcp.filesys.utils.query_cache import QueryResultCache
+
+
+class TestQueryResultCache:
+    """Validate LRU behaviour and counters."""
+
+    def test_hits_and_misses_are_counted(self) -> None:
+        """Lookups report whether a result was cached."""
+        cache = QueryResultCache()
+        assert cache.get(("q", 1)) is None
+
+        cache.put(("q", 1), {"success": True, "paths": ["a.py"]})
+        assert cache.get(("q", 1)) == {"success": True, "paths": ["a.py"]}
+        assert cache.get(("q", 2)) is None
+        assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+    def test_returned_results_are_copies(self) -> None:
+        """Callers may add keys to a result without changing the cache."""
+        cache = QueryResultCache()
+        cache.put("q", {"paths": []})
+        result = cache.get("q")
+        assert result is not None
+        result["extra"] = True
+
+        assert cache.get("q") == {"paths": []}
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Recently read entries survive eviction."""
+        cache = QueryResultCache(max_entries=2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        cache.get("a")
+        cache.put("c", {"n": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"n": 1}
+        assert len(cache) == 2
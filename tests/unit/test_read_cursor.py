@@ -0,0 +1,82 @@
+"""Tests for paginated read cursors."""
+
+import os
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.read_cursor import ReadCursor, read_page
+
+
+def _start(path: Path, page_size: int, text: bool = True) -> ReadCursor:
+    return ReadCursor.for_file(path.stat(), 0, 0, path.stat().st_size, text, page_size)
+
+
+def _pages(path: Path, cursor: ReadCursor | None) -> list[bytes]:
+    pages = []
+    while cursor is not None:
+        page = read_page(path, cursor)
+        pages.append(page.data)
+        cursor = page.next_cursor
+    return pages
+
+
+class TestReadCursor:
+    """Validate cursor encoding and version checks."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Encoded cursors decode to the same position."""
+        path = tmp_path / "a.txt"
+        path.write_text("hello\n")
+        cursor = ReadCursor.for_file(path.stat(), 3, 0, 6, True, 64)
+        assert ReadCursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize("token", ["", "not a cursor", "WzEsMl0", "WzIsMCwwLDAsMCwwLDAsMCwxLDY0XQ", "WzEsMCwwLDAsMCwwLDAsMCwxLDBd"])
+    def test_invalid_tokens_raise(self, token: str) -> None:
+        """Malformed, truncated, foreign-version and zero page size tokens are rejected."""
+        with pytest.raises(ValueError, match="Invalid read cursor"):
+            ReadCursor.decode(token)
+
+    def test_changed_files_are_rejected(self, tmp_path: Path) -> None:
+        """A cursor only resumes the file version it was issued for."""
+        path = tmp_path / "a.txt"
+        path.write_text("hello\n")
+        cursor = _start(path, 64)
+        cursor.check(path.stat())
+        stat_result = path.stat()
+        os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+        with pytest.raises(ValueError, match="changed"):
+            cursor.check(path.stat())
+
+
+class TestReadPage:
+    """Validate page boundaries."""
+
+    def test_text_pages_end_at_line_breaks(self, tmp_path: Path) -> None:
+        """Pages end after their last complete line and track line numbers."""
+        path = tmp_path / "log.txt"
+        path.write_bytes(b"one\ntwo\nthree\nfour\n")
+        first = read_page(path, _start(path, 10))
+        assert first.data == b"one\ntwo\n"
+        assert first.next_cursor is not None
+        assert (first.next_cursor.offset, first.next_cursor.line) == (8, 2)
+        assert _pages(path, _start(path, 10)) == [b"one\ntwo\n", b"three\n", b"four\n"]
+
+    def test_long_lines_split_on_character_boundaries(self, tmp_path: Path) -> None:
+        """A line longer than the page is split without cutting a UTF-8 character."""
+        path = tmp_path / "wide.txt"
+        path.write_text("ééééé\n", encoding="utf-8")
+        pages = _pages(path, _start(path, 3))
+        assert b"".join(pages) == path.read_bytes()
+        assert all(page.decode("utf-8") for page in pages)
+
+    def test_binary_pages_are_fixed_size(self, tmp_path: Path) -> None:
+        """Binary reads ignore line breaks and character boundaries."""
+        path = tmp_path / "blob.bin"
+        path.write_bytes(bytes(range(256)) * 2)
+        assert [len(page) for page in _pages(path, _start(path, 200, text=False))] == [200, 200, 112]
+
+    def test_range_end_bounds_the_read(self, tmp_path: Path) -> None:
+        """Reads stop at the cursor's end offset."""
+        path = tmp_path / "log.txt"
+        path.write_bytes(b"one\ntwo\nthree\n")
+        assert _pages(path, ReadCursor.for_file(path.stat(), 4, 1, 8, True, 100)) == [b"two\n"]
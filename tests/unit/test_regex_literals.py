@@ -0,0 +1,78 @@
+"""Tests for required literal extraction from regex patterns."""
+
+import pytest
+from files.backend.mcp.filesys.utils.regex_literals import extract_required_literals, max_match_width
+
+
+class TestExtractRequiredLiterals:
+    """Validate the literal requirements derived from regexes."""
+
+    def test_plain_literal_is_single_clause(self) -> None:
+        """A pattern without metacharacters requires itself."""
+        required = extract_required_literals("hello world")
+        assert required is not None
+        assert required.clauses == (frozenset({"hello world"}),)
+
+    def test_sequence_yields_each_literal_run(self) -> None:
+        """Literal runs separated by classes become separate clauses."""
+        required = extract_required_literals(r"def\s+handle_\w+")
+        assert required is not None
+        assert set(required.clauses) == {frozenset({"def"}), frozenset({"handle_"})}
+        assert required.best_clause() == frozenset({"handle_"})
+
+    def test_alternation_becomes_disjunction(self) -> None:
+        """Each branch contributes its best literal to one clause."""
+        required = extract_required_literals(r"(foo|barbaz)\(")
+        assert required is not None
+        assert frozenset({"foo", "barbaz"}) in required.clauses
+
+    def test_anchors_keep_literals_adjacent(self) -> None:
+        """Zero-width assertions do not split literal runs."""
+        required = extract_required_literals(r"\bimport\b os")
+        assert required is not None
+        assert required.clauses == (frozenset({"import os"}),)
+
+    def test_ignore_case_lowercases_literals(self) -> None:
+        """Case-insensitive patterns report lower-cased literals."""
+        required = extract_required_literals(r"(?i)TODO:")
+        assert required is not None
+        assert required.ignore_case
+        assert required.clauses == (frozenset({"todo:"}),)
+
+    @pytest.mark.parametrize("pattern", [r"(?i)straße", r"(?i)\u212a", r"(?i:café) menu", r"(?i)kelvin", r"(?i)class", r"(?i)print"])
+    def test_ignore_case_non_ascii_literals_are_not_required(self, pattern: str) -> None:
+        """Case-folding patterns cannot narrow the index when folds map their literals to other text (the Kelvin sign, the long s, the dotted capital I)."""
+        assert extract_required_literals(pattern) is None
+        assert extract_required_literals(pattern.replace("(?i)", "").replace("(?i:café)", "(?:café)")) is not None
+
+    @pytest.mark.parametrize("pattern", [r"\w+", r"a*", r"(foo|\d+)", r"\p{L}+"])
+    def test_patterns_without_required_literals(self, pattern: str) -> None:
+        """Optional, class-only or unsupported patterns produce no requirement."""
+        assert extract_required_literals(pattern) is None
+
+    @pytest.mark.parametrize("pattern", [r"(?:handle_request){e<=1}", r"handle_request{i<=1,d<=1}", r"(?:foo){2i+1d<=2}bar", r"[[a-z]--[aeiou]]handler"])
+    def test_regex_only_syntax_is_not_read_as_literals(self, pattern: str) -> None:
+        """Fuzzy constraints and set operations, which the standard library parser reads as text, produce no requirement."""
+        assert extract_required_literals(pattern) is None
+        assert max_match_width(pattern) is None
+
+    @pytest.mark.parametrize(("pattern", "literal"), [(r"if \(x\) {", "if (x) {"), (r"[]a]bcd", "bcd"), (r"\{e<=1\}", "{e<=1}")])
+    def test_literal_braces_and_brackets_are_required(self, pattern: str, literal: str) -> None:
+        """Escaped or plain-text braces and brackets keep their literals."""
+        required = extract_required_literals(pattern)
+        assert required is not None
+        assert literal in required.best_clause()
+
+
+class TestMaxMatchWidth:
+    """Validate the longest-match bound used to size scan-window overlaps."""
+
+    @pytest.mark.parametrize(("pattern", "width"), [("abc", 3), (r"a{2,5}b", 6), (r"(?:x|yy)z", 3), (r"\d{4}-\d{2}", 7)])
+    def test_bounded_patterns(self, pattern: str, width: int) -> None:
+        """Bounded patterns report their longest match."""
+        assert max_match_width(pattern) == width
+
+    @pytest.mark.parametrize("pattern", [r"a\w+", r"foo.*bar", r"\p{L}"])
+    def test_unbounded_or_unknown_patterns(self, pattern: str) -> None:
+        """Unbounded repeats and unsupported syntax have no bound."""
+        assert max_match_width(pattern) is None
@@ -0,0 +1,148 @@
+"""Tests for single-pass multi-regex matching."""
+
+import regex
+from files.backend.mcp.filesys.utils.byte_search import build_automaton
+from files.backend.mcp.filesys.utils.fast_search import REGEX_FLAGS
+from files.backend.mcp.filesys.utils.regex_set import RegexSet
+
+
+def _compile(*patterns: str) -> list[regex.Pattern]:
+    return [regex.compile(pattern, REGEX_FLAGS) for pattern in patterns]
+
+
+class TestRegexSet:
+    """Validate combined matching and pattern attribution."""
+
+    def test_combines_patterns_into_one_pass(self) -> None:
+        """Patterns without a scannable literal share a single alternation."""
+        patterns = _compile(r"[xq]1\d+y", r"\d{5,}", r"[A-Z]{2}\w*")
+        regex_set = RegexSet(patterns)
+
+        assert regex_set.passes == 1
+        assert list(regex_set) == patterns
+        assert len(regex_set) == 3
+
+    def test_literal_patterns_keep_their_literal_scan(self) -> None:
+        """Patterns with a required literal are searched on their own."""
+        patterns = _compile(r"def\s+\w+", r"class\s+\w+", r"\d{5,}")
+        regex_set = RegexSet(patterns)
+
+        assert regex_set.passes == 3
+        found = regex_set.search("x = 123456")
+        assert found is not None
+        assert found[0] is patterns[2]
+
+    def test_reports_matching_pattern(self) -> None:
+        """The branch that matched identifies its source pattern."""
+        patterns = _compile(r"(\d+)px", r"\d+(?P<unit>em)\b")
+        regex_set = RegexSet(patterns)
+
+        assert regex_set.passes == 1
+        found = regex_set.search("width: 3em;")
+        assert found is not None
+        assert found[0] is patterns[1]
+        assert found[1].group() == "3em"
+        assert regex_set.search("nothing here") is None
+
+    def test_backreferences_are_searched_separately(self) -> None:
+        """Patterns whose group numbers would shift keep their own pass."""
+        patterns = _compile(r"(\w)\1", r"\d+", r"[A-Z]+")
+        regex_set = RegexSet(patterns)
+
+        assert regex_set.passes == 2
+        found = regex_set.search("a bb c")
+        assert found is not None
+        assert found[0] is patterns[0]
+
+    def test_global_inline_flags_are_searched_separately(self) -> None:
+        """A pattern-wide flag must not leak into the other patterns."""
+        patterns = _compile(r"(?i)t[o0]d[o0]", r"[A-Z]{2}\d", r"\d[A-Z]{2}")
+        regex_set = RegexSet(patterns)
+
+        assert regex_set.passes == 2
+        assert regex_set.search("ab1 1ab") is None
+        found = regex_set.search("ToDo")
+        assert found is not None
+        assert found[0] is patterns[0]
+
+    def test_duplicate_group_names_fall_back(self) -> None:
+        """Patterns that cannot be joined are still matched."""
+        patterns = _compile(r"(?P<n>[fg]o+)", r"(?P<n>[bc]ar)")
+        regex_set = RegexSet(patterns)
+
+        found = regex_set.search("xx bar")
+        assert found is not None
+        assert found[0] is patterns[1]
+
+
+class TestRegexSetPrefilter:
+    """Validate the required-literal prefilter."""
+
+    def test_prefilter_skips_patterns_without_their_literals(self) -> None:
+        """A pattern runs only when its required literals occur in the text."""
+        patterns = _compile(r"def\s+handle_\w+", r"\s+return\s+None")
+        regex_set = RegexSet(patterns, build_automaton)
+
+        assert regex_set.passes == 0
+        assert regex_set.search("def other():\n    return 1\n") is None
+
+        found = regex_set.search("x = 1\ndef  handle_request(): pass\n")
+        assert found is not None
+        assert found[0] is patterns[0]
+
+    def test_many_literals_share_one_automaton_scan(self) -> None:
+        """Large literal sets are checked with a single automaton pass."""
+        patterns = _compile(*(rf"\w+_{name}\(\)" for name in ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel") * 2))
+        patterns += _compile(*(rf"\w+_{name}\(\)" for name in ("india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa")))
+        regex_set = RegexSet(patterns, build_automaton)
+
+        assert regex_set.passes == 1
+        assert regex_set.search("call foo_zulu()") is None
+        found = regex_set.search("call foo_papa()")
+        assert found is not None
+        assert found[0].pattern == r"\w+_papa\(\)"
+
+    def test_literals_present_but_no_match(self) -> None:
+        """The full regex still decides once the literals are present."""
+        regex_set = RegexSet(_compile(r"def\s+handle_\d+"), build_automaton)
+
+        assert regex_set.search("def handle_abc") is None
+        assert regex_set.search("handle_1 = def") is None
+
+    def test_alternation_clause_accepts_any_branch(self) -> None:
+        """A clause is met by any of its literals."""
+        regex_set = RegexSet(_compile(r"\s(?:foo|barbaz)\("), build_automaton)
+
+        assert regex_set.search("call barbaz(1)") is not None
+        assert regex_set.search("call bar(1)") is None
+
+    def test_leading_literal_is_left_to_the_engine(self) -> None:
+        """Patterns starting with their most selective literal are not prefiltered."""
+        regex_set = RegexSet(_compile(r"raise\s+\w+Error"), build_automaton)
+
+        assert regex_set.passes == 1
+        assert regex_set.search("raise ValueError") is not None
+
+    def test_fuzzy_patterns_are_not_prefiltered(self) -> None:
+        """Fuzzy constraints are not read as literal text the prefilter would require."""
+        patterns = _compile(r"(?:handle_request){e<=1}", r"\s+return\s+None")
+        regex_set = RegexSet(patterns, build_automaton)
+
+        found = regex_set.search("def handle_reqest(): pass\n")
+        assert found is not None
+        assert found[0] is patterns[0]
+
+    def test_patterns_without_literals_fall_back(self) -> None:
+        """Literal-free and case-folding patterns are matched without the prefilter."""
+        patterns = _compile(r"\w+_\d+\(missing\)", r"\d{5,}", r"(?i)todo:")
+        regex_set = RegexSet(patterns, build_automaton)
+
+        found = regex_set.search("id = 123456")
+        assert found is not None
+        assert found[0] is patterns[1]
+        found = regex_set.search("# ToDo: later")
+        assert found is not None
+        assert found[0] is patterns[2]
+        found = regex_set.search("x = load_7(missing)")
+        assert found is not None
+        assert found[0] is patterns[0]
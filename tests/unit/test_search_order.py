@@ -0,0 +1,61 @@
+"""Tests for recency-ranked search candidate orders."""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.search_order import check_search_order, git_changed_files, order_by_recency, walk_mtimes
+from files.backend.mcp.filesys.utils.tree_walker import FileFilter
+
+
+class TestSearchOrder:
+    """Validate recency ranking, git change detection and the stat walk."""
+
+    def test_order_by_recency(self) -> None:
+        """Newest files come first, ties keep walk order and changed files lead."""
+        files = [(Path("/r/a"), 1), (Path("/r/b"), 3), (Path("/r/c"), 2), (Path("/r/d"), 3)]
+        assert order_by_recency(files) == [Path("/r/b"), Path("/r/d"), Path("/r/c"), Path("/r/a")]
+        assert order_by_recency(files, frozenset({"/r/a"})) == [Path("/r/a"), Path("/r/b"), Path("/r/d"), Path("/r/c")]
+
+    def test_unknown_order_raises(self) -> None:
+        """Only the documented orders are accepted."""
+        check_search_order("recent")
+        with pytest.raises(ValueError):
+            check_search_order("size")
+
+    def test_walk_mtimes_uses_entry_stat_data(self, tmp_path: Path) -> None:
+        """The walk reports each file's mtime and honours walker filters."""
+        (tmp_path / "old.py").write_text("x")
+        (tmp_path / "notes.md").write_text("y")
+        os.utime(tmp_path / "old.py", ns=(5_000_000_000, 5_000_000_000))
+        assert walk_mtimes(tmp_path, file_filter=FileFilter.create(extensions=["py"])) == [(tmp_path / "old.py", 5_000_000_000)]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+    def test_git_changed_files(self, tmp_path: Path) -> None:
+        """Modified, renamed and untracked files below the directory are reported; clean files are not."""
+
+        def git(*args: str) -> None:
+            subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=tmp_path, check=True, capture_output=True)
+
+        (tmp_path / "src").mkdir()
+        for name in ("src/clean.py", "src/edited.py", "src/moved.py", "top.py"):
+            (tmp_path / name).write_text("x\n")
+        git("init", "-q")
+        git("add", ".")
+        git("commit", "-qm", "init")
+        (tmp_path / "src" / "edited.py").write_text("y\n")
+        (tmp_path / "src" / "new.py").write_text("z\n")
+        (tmp_path / "top.py").write_text("y\n")
+        git("mv", "src/moved.py", "src/renamed.py")
+
+        root = tmp_path.resolve()
+        assert git_changed_files(tmp_path / "src") == {str(root / "src" / name) for name in ("edited.py", "new.py", "renamed.py")}
+        assert str(root / "top.py") in git_changed_files(tmp_path)
+
+    def test_outside_a_repository(self, tmp_path: Path) -> None:
+        """Directories outside any repository have no changed files."""
+        if any((parent / ".git").exists() for parent in (tmp_path, *tmp_path.parents)):
+            pytest.skip("temporary directory is inside a repository")
+        assert git_changed_files(tmp_path) == frozenset()
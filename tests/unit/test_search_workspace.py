@@ -0,0 +1,169 @@
+"""Tests for the watched search workspace and tree watcher."""
+
+import shutil
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher
+from files.backend.mcp.filesys.utils.search_workspace import SearchWorkspace
+from files.backend.mcp.filesys.utils.trigram_index import TrigramIndex
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    """Poll ``predicate`` until it holds or the timeout elapses."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestSearchWorkspace:
+    """Validate initial scans, watcher-driven updates and synchronous tool updates."""
+
+    @pytest.fixture
+    def root(self) -> Iterator[Path]:
+        """Create a small tree with an excluded virtualenv."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "pkg").mkdir()
+            (root / "pkg" / "core.py").write_text("def core(): pass\n")
+            (root / ".venv").mkdir()
+            (root / ".venv" / "site.py").write_text("ignored\n")
+            yield root
+
+    @pytest.fixture(params=[False, True], ids=["inotify", "polling"])
+    def workspace(self, request: pytest.FixtureRequest, root: Path) -> Iterator[SearchWorkspace]:
+        """Start a workspace with either watcher backend and a private index."""
+        with tempfile.TemporaryDirectory() as cache:
+            index = TrigramIndex(root, Path(cache))
+            workspace = SearchWorkspace(root, index=index, poll_interval=0.1, debounce=0.02, force_polling=request.param)
+            workspace.start()
+            assert workspace.wait_ready(5.0)
+            try:
+                yield workspace
+            finally:
+                workspace.close()
+
+    def test_initial_scan_lists_tracked_files(self, workspace: SearchWorkspace, root: Path) -> None:
+        """The stat cache holds every file outside excluded directories."""
+        files = workspace.files_under(root) or []
+        assert [path.relative_to(root).as_posix() for path in files] == ["pkg/core.py"]
+        assert workspace.cached_stat(root / "pkg" / "core.py") is not None
+
+    def test_external_changes_are_picked_up(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Files created and deleted outside the tools reach the cache."""
+        (root / "pkg" / "nested").mkdir()
+        created = root / "pkg" / "nested" / "new.py"
+        created.write_text("def new(): pass\n")
+        assert _wait_until(lambda: workspace.cached_stat(created) is not None)
+
+        created.unlink()
+        assert _wait_until(lambda: workspace.cached_stat(created) is None)
+
+    def test_record_written_is_synchronous(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Tool writes are visible to the cache and index immediately."""
+        target = root / "pkg" / "written.py"
+        target.write_text("marker_value = 1\n")
+        workspace.record_written([target])
+
+        signature = workspace.cached_stat(target)
+        assert signature is not None
+        assert workspace.index is not None
+        assert workspace.index.lookup(target, *signature) is not None
+
+        workspace.record_removed([root / "pkg"])
+        assert workspace.files_under(root) == []
+
+    @pytest.mark.asyncio
+    async def test_search_uses_workspace_listing(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Searches served from the workspace see tool writes without rescanning."""
+        target = root / "pkg" / "fresh.py"
+        target.write_text("needle_token = True\n")
+        workspace.record_written([target])
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            results = await searcher.search_files(root, content_keywords=["needle_token"], max_results=10, workspace=workspace)
+        finally:
+            searcher.close()
+
+        assert results == [str(target)]
+
+    def test_generation_tracks_changed_subtrees(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Writes advance the generation of their ancestors only."""
+        (root / "docs").mkdir()
+        workspace.touch([root / "docs"])
+        before_root, before_pkg, before_docs = (workspace.generation(path) for path in (root, root / "pkg", root / "docs"))
+        assert None not in (before_root, before_pkg, before_docs)
+
+        target = root / "pkg" / "written.py"
+        target.write_text("x = 1\n")
+        workspace.record_written([target])
+
+        assert workspace.generation(root) != before_root
+        assert workspace.generation(root / "pkg") != before_pkg
+        assert workspace.generation(root / "docs") == before_docs
+        assert workspace.generation(root / ".venv") is None
+
+    def test_ignore_files_advance_every_generation(self, workspace: SearchWorkspace, root: Path) -> None:
+        """A changed .gitignore can alter results anywhere below its directory."""
+        before = workspace.generation(root / "pkg")
+        ignore_file = root / ".gitignore"
+        ignore_file.write_text("*.log\n")
+        workspace.record_written([ignore_file])
+
+        assert workspace.generation(root / "pkg") != before
+
+    def test_info_exclude_advances_every_generation(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Edits of .git/info/exclude, which the watcher does not see, also invalidate every result."""
+        before = workspace.generation(root / "pkg")
+        (root / ".git" / "info").mkdir(parents=True)
+        (root / ".git" / "info" / "exclude").write_text("*.log\n")
+
+        assert workspace.generation(root / "pkg") != before
+
+    def test_external_changes_advance_the_generation(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Watcher events invalidate results for the subtree they touch."""
+        before = workspace.generation(root / "pkg")
+        target = root / "pkg" / "external.py"
+
+        def changed() -> bool:
+            # Keep writing so a change made before the watcher thread took its baseline is not missed
+            target.write_text(f"y = {time.monotonic_ns()}\n")
+            return workspace.generation(root / "pkg") != before
+
+        assert _wait_until(changed)
+
+    def test_fuzzy_paths_follow_tool_writes(self, workspace: SearchWorkspace, root: Path) -> None:
+        """The path index is updated with the stat cache and scoped to the directory."""
+        target = root / "pkg" / "search_workspace.py"
+        target.write_text("x = 1\n")
+        workspace.record_written([target])
+
+        ranked = workspace.fuzzy_paths(root, "srchws", 5) or []
+        assert [match.path for match in ranked] == ["pkg/search_workspace.py"]
+        assert workspace.fuzzy_paths(root / "pkg", "core", 5) is not None
+        assert workspace.fuzzy_paths(root / ".venv", "site", 5) is None
+
+        workspace.record_removed([root / "pkg"])
+        assert workspace.fuzzy_paths(root, "srchws", 5) == []
+
+    def test_tree_follows_directories(self, workspace: SearchWorkspace, root: Path) -> None:
+        """Created and removed directories reach the tree, from the tools and the watcher."""
+        (root / "made").mkdir()
+        workspace.record_dirs([root / "made"])
+        entries = workspace.entries_under(root, recursive=False)
+        assert entries is not None
+        assert [(entry.path, entry.is_dir) for entry in entries] == [("pkg", True), ("made", True)]
+
+        (root / "external" / "deep").mkdir(parents=True)
+        assert _wait_until(lambda: [entry.path for entry in workspace.entries_under(root / "external") or []] == ["external/deep"])
+
+        shutil.rmtree(root / "external")
+        assert _wait_until(lambda: workspace.entries_under(root / "external") is None)
+        assert workspace.entries_under(root / ".venv") is None
@@ -0,0 +1,151 @@
+"""Tests for the shared scandir tree walker."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.tree_walker import FileFilter, GlobSet, compile_glob, relative_entry_path, walk_entries, walk_files
+
+
+class TestWalkEntries:
+    """Test walk_entries pruning and filtering."""
+
+    @pytest.fixture
+    def tree(self, tmp_path: Path) -> Iterator[Path]:
+        """Create a tree containing directories that should be pruned."""
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        (tmp_path / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+        (tmp_path / "src" / "main.py").write_text("print()\n")
+        (tmp_path / "README.md").write_text("# readme\n")
+        for pruned in (".git", "node_modules", "__pycache__", ".venv"):
+            (tmp_path / pruned / "nested").mkdir(parents=True)
+            (tmp_path / pruned / "nested" / "file.txt").write_text("pruned\n")
+        (tmp_path / "src" / "__pycache__").mkdir()
+        (tmp_path / "src" / "__pycache__" / "mod.cpython-312.pyc").write_bytes(b"\x00")
+        yield tmp_path
+
+    def _rel(self, root: Path, entries: Iterator) -> set[str]:
+        return {relative_entry_path(entry, str(root)) for entry in entries}
+
+    def test_prunes_default_directories(self, tree: Path) -> None:
+        """Test that VCS, dependency and cache directories are never entered."""
+        assert self._rel(tree, walk_files(tree)) == {"README.md", "src/main.py", "src/pkg/mod.py"}
+
+    def test_include_dirs_and_non_recursive(self, tree: Path) -> None:
+        """Test directory entries and single-level listings."""
+        assert self._rel(tree, walk_entries(tree, include_dirs=True)) == {"README.md", "src", "src/main.py", "src/pkg", "src/pkg/mod.py"}
+        assert self._rel(tree, walk_entries(tree, recursive=False, include_dirs=True)) == {"README.md", "src"}
+        assert self._rel(tree, walk_entries(tree, include_dirs=True, max_depth=2)) == {"README.md", "src", "src/main.py", "src/pkg"}
+
+    def test_custom_pruning_and_ignore(self, tree: Path) -> None:
+        """Test that pruned_dirs can be overridden and ignore prunes directories."""
+        walked = self._rel(tree, walk_files(tree, pruned_dirs=frozenset({".git"}), ignore=lambda entry: entry.name in {"pkg", "main.py"}))
+        assert walked == {"README.md", "node_modules/nested/file.txt", ".venv/nested/file.txt", "__pycache__/nested/file.txt"} | {
+            "src/__pycache__/mod.cpython-312.pyc"
+        }
+
+    def test_file_filter_uses_entry_stat_data(self, tree: Path) -> None:
+        """Test that size, mtime and extension conditions select files but never prune directories."""
+        os.utime(tree / "src" / "main.py", (1_000_000, 1_000_000))
+        by_extension = FileFilter.create(extensions=[".PY"])
+        assert self._rel(tree, walk_files(tree, file_filter=by_extension)) == {"src/main.py", "src/pkg/mod.py"}
+        assert self._rel(tree, walk_entries(tree, include_dirs=True, file_filter=FileFilter.create(min_size=9))) == {"README.md", "src", "src/pkg"}
+        assert self._rel(tree, walk_files(tree, file_filter=FileFilter.create(modified_before=2_000_000))) == {"src/main.py"}
+        assert self._rel(tree, walk_files(tree, file_filter=FileFilter.create(max_size=6, modified_after=2_000_000))) == {"src/pkg/mod.py"}
+        assert self._rel(tree, walk_files(tree, file_filter=by_extension, max_depth=2)) == {"src/main.py"}
+
+
+class TestFileFilter:
+    """Test FileFilter construction and name checks."""
+
+    def test_create(self) -> None:
+        """Test that empty conditions give no filter and invalid ranges raise."""
+        assert FileFilter.create() is None
+        assert FileFilter.create(extensions=["Py", ".md"]) == FileFilter(extensions=frozenset({"py", "md"}))
+        with pytest.raises(ValueError):
+            FileFilter.create(min_size=10, max_size=5)
+        with pytest.raises(ValueError):
+            FileFilter.create(modified_after=2.0, modified_before=1.0)
+
+    def test_extensions_follow_path_suffix_rules(self) -> None:
+        """Test that dotfiles have no extension and ``""`` selects extension-less files."""
+        no_extension = FileFilter(extensions=frozenset({""}))
+        assert no_extension.accepts_name("Makefile") and no_extension.accepts_name(".bashrc")
+        assert not no_extension.accepts_name("setup.py")
+        assert FileFilter(extensions=frozenset({"gz"})).accepts_name("logs.tar.GZ")
+
+
+class TestCompileGlob:
+    """Test glob translation against pathlib semantics."""
+
+    @pytest.mark.parametrize("pattern", ["*.py", "src/*.py", "**/pkg/*.py", "src/**", "m?in.*", "[mr]*", "*"])
+    def test_matches_rglob(self, tmp_path: Path, pattern: str) -> None:
+        """Test that recursive patterns select the same paths as Path.rglob."""
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        for rel in ("main.py", "readme.md", "src/main.py", "src/pkg/mod.py", "src/pkg/data.json"):
+            (tmp_path / rel).write_text("x")
+
+        matcher, dirs_only = compile_glob(pattern)
+        walked = {rel for rel in self._all(tmp_path) if matcher.fullmatch(rel) and (not dirs_only or (tmp_path / rel).is_dir())}
+        expected = {p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob(pattern)} - {"."}
+
+        assert walked == expected
+
+    def test_non_recursive_is_anchored(self) -> None:
+        """Test that non-recursive patterns only match at the top level."""
+        matcher, _dirs_only = compile_glob("*.py", recursive=False)
+        assert matcher.fullmatch("a.py")
+        assert not matcher.fullmatch("src/a.py")
+
+    def test_trailing_slash_matches_directories_only(self) -> None:
+        """Test that a trailing slash marks a directory-only pattern."""
+        assert compile_glob("src/")[1]
+
+    @staticmethod
+    def _all(root: Path) -> set[str]:
+        return {relative_entry_path(entry, str(root)) for entry in walk_entries(root, include_dirs=True)}
+
+
+class TestGlobSet:
+    """Test combined evaluation of several globs."""
+
+    def test_first_matching_pattern_wins(self) -> None:
+        """Each path is attributed to one pattern, respecting directory-only patterns."""
+        globs = GlobSet(["src/", "*.py", "**/pkg/*", "src"])
+        assert globs.match("src/pkg/mod.py", is_dir=False) == 1
+        assert globs.match("src/pkg/data.json", is_dir=False) == 2
+        assert globs.match("src", is_dir=True) == 0
+        assert globs.match("src", is_dir=False) == 3
+        assert globs.match("docs/index.md", is_dir=False) is None
+
+    def test_recursive_patterns_walk_everything(self) -> None:
+        """Patterns that may match at any depth need the whole tree."""
+        assert GlobSet(["src/*.py"]).walk_roots() == [("", None)]
+
+    def test_anchored_prefixes_prune_the_walk(self) -> None:
+        """Literal prefixes select subtrees and patterns without ``**`` bound the depth."""
+        globs = GlobSet(["src/pkg/*.py", "src/pkg/sub/*.txt", "docs/**/*.md", "node_modules/x/*.js"], recursive=False)
+        assert globs.walk_roots() == [("docs", None), ("src/pkg", 2)]
+        assert globs.walk_roots(use_prefixes=False) == [("", None)]
+        # A trailing ``**`` matches its parent directory, and ``..`` never leaves the walk root
+        assert GlobSet(["lib/**"], recursive=False).walk_roots() == [("", None)]
+        assert GlobSet(["../x/*.py"], recursive=False).walk_roots() == [("", 3)]
+        assert GlobSet(["a/b/*.py", "*.md"], recursive=False).walk_roots(use_prefixes=False) == [("", 3)]
+
+    def test_anchored_walk_matches_glob(self, tmp_path: Path) -> None:
+        """Walking only the selected subtrees finds what Path.glob finds."""
+        for rel in ("main.py", "src/main.py", "src/pkg/mod.py", "src/pkg/deep/x.py", "docs/a/b.md"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("x")
+        patterns = ["src/pkg/*.py", "docs/**/*.md", "*.py"]
+        globs = GlobSet(patterns, recursive=False)
+
+        found = set()
+        for subdir, max_depth in globs.walk_roots():
+            for entry in walk_entries(tmp_path / subdir, include_dirs=True, max_depth=max_depth):
+                rel = relative_entry_path(entry, str(tmp_path))
+                if globs.match(rel, entry.is_dir()) is not None:
+                    found.add(rel)
+
+        assert found == {p.relative_to(tmp_path).as_posix() for pattern in patterns for p in tmp_path.glob(pattern)}
@@ -0,0 +1,57 @@
+"""Tests for waiting on single-file changes."""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils import tree_watcher
+from files.backend.mcp.filesys.utils.tree_watcher import file_signature, wait_for_file_change
+
+
+@pytest.fixture(params=[False, True], ids=["inotify", "polling"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run each test with inotify (where available) and with stat polling."""
+    if request.param:
+        monkeypatch.setattr(tree_watcher._Inotify, "create", classmethod(lambda cls: None))
+
+
+class TestWaitForFileChange:
+    """Validate that waits end on appends and time out otherwise."""
+
+    def test_append_ends_the_wait(self, tmp_path: Path, backend: None) -> None:
+        """An append made while waiting wakes the waiter well before the timeout."""
+        path = tmp_path / "job.log"
+        path.write_text("started\n")
+        signature = file_signature(path)
+
+        def append() -> None:
+            time.sleep(0.1)
+            with path.open("a") as handle:
+                handle.write("done\n")
+
+        writer = threading.Thread(target=append)
+        writer.start()
+        started = time.monotonic()
+        wait_for_file_change(path, signature, timeout=5.0, poll_interval=0.02)
+        writer.join()
+        assert time.monotonic() - started < 4.0
+        assert file_signature(path) != signature
+
+    def test_changes_before_the_wait_return_at_once(self, tmp_path: Path, backend: None) -> None:
+        """A signature that is already stale does not wait."""
+        path = tmp_path / "job.log"
+        path.write_text("started\n")
+        signature = file_signature(path)
+        path.write_text("started\nmore\n")
+        started = time.monotonic()
+        wait_for_file_change(path, signature, timeout=5.0)
+        assert time.monotonic() - started < 1.0
+
+    def test_timeout(self, tmp_path: Path, backend: None) -> None:
+        """Without changes the wait ends after the timeout."""
+        path = tmp_path / "idle.log"
+        path.write_text("idle\n")
+        started = time.monotonic()
+        wait_for_file_change(path, file_signature(path), timeout=0.1, poll_interval=0.02)
+        assert 0.05 <= time.monotonic() - started < 2.0
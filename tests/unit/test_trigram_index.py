@@ -0,0 +1,163 @@
+"""Tests for the persistent trigram index and its use by FastFileSearcher."""
+
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from files.backend.mcp.filesys.utils.fast_search import FastFileSearcher
+from files.backend.mcp.filesys.utils.regex_literals import RequiredLiterals
+from files.backend.mcp.filesys.utils.trigram_index import TrigramIndex, evict_trigram_indexes
+
+
+def _literal_query(*literals: str) -> list[RequiredLiterals]:
+    return [RequiredLiterals((frozenset({literal}),)) for literal in literals]
+
+
+class TestTrigramIndex:
+    """Validate candidate narrowing, staleness and persistence."""
+
+    @pytest.fixture
+    def tree(self) -> Iterator[tuple[Path, Path]]:
+        """Create a source tree and a separate cache directory."""
+        with tempfile.TemporaryDirectory() as src, tempfile.TemporaryDirectory() as cache:
+            root = Path(src)
+            for i in range(20):
+                body = f"module {i}\n"
+                if i % 5 == 0:
+                    body += "def handle_request(): pass\n"
+                (root / f"mod_{i}.py").write_text(body)
+            (root / "blob.bin").write_bytes(b"\xff\xfe\x00needle")
+            yield root, Path(cache)
+
+    def test_candidates_are_narrowed(self, tree: tuple[Path, Path]) -> None:
+        """Only files containing every trigram of the literal are candidates."""
+        root, cache = tree
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+
+        candidates = index.candidate_ids(_literal_query("HANDLE_request"))
+        assert candidates is not None
+        assert len(candidates) == 4
+
+    def test_short_literals_cannot_narrow(self, tree: tuple[Path, Path]) -> None:
+        """Literals shorter than a trigram disable narrowing."""
+        root, cache = tree
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+        assert index.candidate_ids(_literal_query("de")) is None
+
+    def test_stale_and_opaque_entries_are_not_current(self, tree: tuple[Path, Path]) -> None:
+        """Modified files and undecodable files never resolve to an entry."""
+        root, cache = tree
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+
+        target = root / "mod_1.py"
+        stat = target.stat()
+        assert index.lookup(target, stat.st_size, stat.st_mtime_ns) is not None
+        target.write_text("rewritten with a different length\n")
+        os.utime(target, ns=(0, 0))
+        stat = target.stat()
+        assert index.lookup(target, stat.st_size, stat.st_mtime_ns) is None
+
+        blob = root / "blob.bin"
+        stat = blob.stat()
+        assert index.lookup(blob, stat.st_size, stat.st_mtime_ns) is None
+
+    def test_persistence_round_trip(self, tree: tuple[Path, Path]) -> None:
+        """A saved index reloads with the same entries and postings."""
+        root, cache = tree
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+        index.remove([root / "mod_0.py"])
+        index.save()
+
+        reloaded = TrigramIndex(root, cache)
+        assert reloaded.entry_count == index.entry_count
+        assert reloaded.candidate_ids(_literal_query("handle_request")) is not None
+        assert len(reloaded.candidate_ids(_literal_query("handle_request")) or ()) == 3
+
+    def test_eviction(self, tree: tuple[Path, Path]) -> None:
+        """Indexes of missing roots, old indexes and those beyond the limit are deleted."""
+        root, cache = tree
+        paths = []
+        for name in ("a", "b", "c", "gone"):
+            (root / name).mkdir()
+            (root / name / "mod.py").write_text("module\n")
+            index = TrigramIndex(root / name, cache)
+            index.update([root / name / "mod.py"])
+            index.save()
+            paths.append(index.index_path)
+        (root / "gone" / "mod.py").unlink()
+        (root / "gone").rmdir()
+        (cache / "trigrams-0000000000000000.npz").write_bytes(b"not an index")
+        for age, path in enumerate(paths[:3]):
+            os.utime(path, (0, 10_000 - age))
+
+        assert evict_trigram_indexes(cache, max_indexes=1, max_age=float("inf")) == 4
+        assert sorted(cache.glob("trigrams-*.npz")) == [paths[0]]
+        assert evict_trigram_indexes(cache, max_indexes=1, max_age=60) == 1
+        assert not list(cache.glob("trigrams-*.npz"))
+
+    @pytest.mark.asyncio
+    async def test_searcher_results_match_full_scan(self, tree: tuple[Path, Path]) -> None:
+        """Index-assisted searches return the same files as a full scan."""
+        root, cache = tree
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+        (root / "late.py").write_text("def handle_request(): return 1\n")
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            plain = await searcher.search_files(root, content_keywords=["handle_request"], max_results=100)
+            indexed = await searcher.search_files(root, content_keywords=["handle_request"], max_results=100, index=index)
+            regex_indexed = await searcher.search_files(
+                root,
+                content_keywords=[r"def\s+handle_\w+"],
+                regex_mode=True,
+                max_results=100,
+                index=index,
+            )
+        finally:
+            searcher.close()
+
+        assert sorted(indexed) == sorted(plain)
+        assert sorted(regex_indexed) == sorted(plain)
+        assert any(result.endswith("late.py") for result in indexed)
+
+    @pytest.mark.asyncio
+    async def test_case_folding_regexes_keep_non_ascii_matches(self, tree: tuple[Path, Path]) -> None:
+        """Case-insensitive regexes whose literals fold to non-ASCII text are not narrowed by the lower-cased index."""
+        root, cache = tree
+        (root / "units.txt").write_text("temperature in \u212aelvin\n")
+        (root / "plain.txt").write_text("temperature in kelvin\n")
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            for keyword in ("\u212aelvin", "kelvin"):
+                results = await searcher.search_files(root, content_keywords=[keyword], regex_mode=True, index=index, ignore_case=True)
+                assert sorted(Path(result).name for result in results) == ["plain.txt", "units.txt"]
+            literal = await searcher.search_files(root, content_keywords=["Kelvin"], index=index, ignore_case=True)
+            assert sorted(Path(result).name for result in literal) == ["plain.txt", "units.txt"]
+        finally:
+            searcher.close()
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_regexes_are_not_narrowed(self, tree: tuple[Path, Path]) -> None:
+        """Fuzzy patterns find approximate matches through the index as they do without it."""
+        root, cache = tree
+        (root / "server.py").write_text("def handle_reqest(): pass\n")
+        index = TrigramIndex(root, cache)
+        index.update(sorted(root.iterdir()))
+
+        searcher = FastFileSearcher(max_workers=2)
+        try:
+            results = await searcher.search_files(root, content_keywords=[r"(?:handle_request){e<=1}"], regex_mode=True, index=index)
+        finally:
+            searcher.close()
+
+        assert "server.py" in {Path(result).name for result in results}